@@ -0,0 +1,51 @@
+"""Memory Backend Benchmark
+
+Compares the memory backends on per-word reads and writes, bulk block
+copies and CPU.run of a small loop.
+
+$ python benchmarks/bench_backends.py
+"""
+
+from timeit import repeat
+
+from simplecpu.backends import BACKENDS
+from simplecpu.cpu import CPU
+from simplecpu.memory import Memory
+
+LOOP = [1, 0, 14, 27, 28, 25, 20, 3]  # loadv 0; copytox; push; pop; incx; jump 3
+CYCLES = 20_000
+
+
+def best(statement, number: int) -> float:
+    return min(repeat(statement, number=number, repeat=5)) / number
+
+
+def report(backend: str) -> None:
+    try:
+        memory = Memory(backend=backend)
+    except ImportError:
+        print(f"{backend:>8} unavailable")
+        return
+
+    words = range(memory.nwords)
+    block = memory.read_block(0, memory.nwords)
+
+    read = best(lambda: [memory.read(a) for a in words], 20) / memory.nwords
+    write = best(lambda: [memory.write(a, 1) for a in words], 20) / memory.nwords
+    bulk = best(lambda: memory.write_block(0, memory.read_block(0, len(block))), 200)
+
+    initializer = LOOP + [0] * (memory.nwords - len(LOOP))
+    program = Memory(initializer=initializer, backend=backend)
+    run = best(lambda: CPU(program).run(max_cycles=CYCLES), 1) / CYCLES
+
+    print(
+        f"{backend:>8} read {read * 1e9:7.1f} ns  write {write * 1e9:7.1f} ns  "
+        f"block {bulk * 1e6:6.2f} us  run {run * 1e6:6.3f} us/instruction"
+    )
+    memory.close()
+    program.close()
+
+
+if __name__ == "__main__":
+    for backend in BACKENDS:
+        report(backend)
@@ -0,0 +1,36 @@
+"""Opcode Decode Microbenchmark
+
+Compares the cost per decoded instruction of the original linear scan
+over the Opcode enum with the DECODE_TABLE lookup used by decode
+and Opcode.by_value.
+
+$ python benchmarks/bench_decode.py
+"""
+
+from timeit import repeat
+
+from simplecpu.instruction import Instruction
+from simplecpu.opcode import Opcode, decode
+
+VALUES = [opcode.value for opcode in Opcode]
+
+
+def linear_scan(value: int) -> Opcode:
+    """The decode Opcode.by_value used before DECODE_TABLE."""
+    for opcode in Opcode:
+        if opcode.value == value:
+            return opcode
+    raise ValueError(value)
+
+
+def report(label: str, statement: str, number: int = 2000) -> None:
+    best = min(repeat(statement, globals=globals(), number=number, repeat=5))
+    nsec = best / (number * len(VALUES)) * 1e9
+    print(f"{label:>24} {nsec:8.1f} ns/instruction")
+
+
+if __name__ == "__main__":
+    report("linear scan", "for v in VALUES: linear_scan(v)")
+    report("Opcode.by_value", "for v in VALUES: Opcode.by_value(v)")
+    report("decode", "for v in VALUES: decode(v)")
+    report("Instruction(value)", "for v in VALUES: Instruction(v)")
@@ -0,0 +1,65 @@
+"""Remote Memory Benchmark
+
+Compares CPU.run against an in-process Memory with CPU.run against a
+RemoteMemory server sending one message per access, and with batching,
+prefetch and write-combining enabled.
+
+$ python benchmarks/bench_remote.py
+"""
+
+from io import StringIO
+from time import perf_counter
+
+from simplecpu.cpu import CPU
+from simplecpu.loader import Loader
+from simplecpu.memory import Memory
+from simplecpu.remote import RemoteMemory
+
+CYCLES = 20_000
+
+LOOP = """
+1      // load 1
+0
+14     // copytox
+27     // push
+28     // pop
+25     // incx
+20     // jump 3
+3
+"""
+
+
+def load() -> Memory:
+    memory = Memory()
+    Loader(StringIO(LOOP)).initialize(memory)
+    return memory
+
+
+def local() -> None:
+    CPU(load()).run(max_cycles=CYCLES)
+
+
+def remote(**kwds):
+    def run() -> None:
+        memory = RemoteMemory.spawn(load(), **kwds)
+        CPU(memory).run(max_cycles=CYCLES)
+        memory.close()
+        return memory.stats
+
+    return run
+
+
+def report(label: str, run) -> None:
+    start = perf_counter()
+    stats = run()
+    elapsed = perf_counter() - start
+    print(f"{label:>24} {elapsed / CYCLES * 1e6:8.3f} us/instruction")
+    if stats is not None:
+        print(f"{'':>24} {stats}")
+
+
+if __name__ == "__main__":
+    report("in-process Memory", local)
+    report("naive RemoteMemory", remote(prefetch=0, combine=0, cache=False))
+    report("no prefetch", remote(prefetch=0, combine=64))
+    report("batched RemoteMemory", remote())
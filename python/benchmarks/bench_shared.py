@@ -0,0 +1,46 @@
+"""Shared Memory Benchmark
+
+Compares CPU.run against an in-process Memory with CPU.run against a
+SharedMemory image owned by a separate memory server process.
+
+$ python benchmarks/bench_shared.py
+"""
+
+from io import StringIO
+from time import perf_counter
+
+from simplecpu.cpu import CPU
+from simplecpu.loader import Loader
+from simplecpu.memory import Memory
+from simplecpu.shared import run_shared
+
+CYCLES = 200_000
+
+LOOP = """
+1      // load 1
+0
+14     // copytox
+25     // incx
+20     // jump 2
+2
+"""
+
+
+def load() -> Memory:
+    memory = Memory()
+    Loader(StringIO(LOOP)).initialize(memory)
+    return memory
+
+
+def report(label: str, run) -> None:
+    best = float("inf")
+    for _ in range(3):
+        start = perf_counter()
+        run()
+        best = min(best, perf_counter() - start)
+    print(f"{label:>24} {best / CYCLES * 1e6:8.3f} us/instruction")
+
+
+if __name__ == "__main__":
+    report("in-process Memory", lambda: CPU(load()).run(max_cycles=CYCLES))
+    report("SharedMemory server", lambda: run_shared(load(), max_cycles=CYCLES))
@@ -0,0 +1,71 @@
+"""Tracing Overhead Benchmark
+
+Compares the per-instruction cost of CPU.step and CPU.execute on a loop
+of loads, stores and stack operations with a timer interrupt, untraced
+and traced:
+
+    untraced   Trace.OFF and an untraced Memory, no logging calls
+    disabled   traced, with logging disabled for simplecpu
+    logged     traced, with every record written to a discarding sink
+
+The traced runs log instructions, interrupts and memory accesses but do
+not dump the CPU, see `CPU.build_tracing`.
+
+$ python benchmarks/bench_tracing.py
+"""
+
+from timeit import repeat
+
+from loguru import logger
+
+from simplecpu.constants import ProgramLoad, Trace
+from simplecpu.cpu import CPU
+from simplecpu.memory import Memory
+
+# loadv 0; copytox; loada 900; store 901; push; pop; incx; jump 3
+LOOP = [1, 0, 14, 2, 900, 7, 901, 27, 28, 25, 20, 3]
+IRETURN = 30
+CYCLES = 20_000
+TIMER_INTERVAL = 50
+
+
+def best(statement, number: int) -> float:
+    return min(repeat(statement, number=number, repeat=5)) / number
+
+
+def program(trace: bool) -> Memory:
+    memory = Memory(trace=trace)
+    memory.write_block(0, LOOP)
+    memory.write(ProgramLoad.TIMER.value, IRETURN)
+    return memory
+
+
+def steps(cpu: CPU) -> None:
+    for _ in range(CYCLES):
+        cpu.step()
+
+
+def report(name: str, trace: Trace) -> None:
+    def build() -> CPU:
+        memory = program(trace is not Trace.OFF)
+        return CPU(memory, timer_interval=TIMER_INTERVAL, trace=trace)
+
+    step = best(lambda: steps(build()), 1) / CYCLES
+    run = best(lambda: build().execute(max_cycles=CYCLES), 1) / CYCLES
+
+    print(
+        f"{name:>8} step {step * 1e6:6.3f} us  "
+        f"execute {run * 1e6:6.3f} us/instruction"
+    )
+
+
+if __name__ == "__main__":
+    logger.remove()
+
+    logger.disable("simplecpu")
+    report("untraced", Trace.OFF)
+    report("disabled", Trace.INSTRUCTIONS)
+
+    logger.enable("simplecpu")
+    logger.add(lambda message: None, level="TRACE")
+    report("logged", Trace.INSTRUCTIONS)
@@ -0,0 +1,121 @@
+"""Opcode Pair Profile
+
+Counts how often each pair of adjacent instructions executes across the
+sample programs in docs/*.s, the data the fused pairs in
+simplecpu.fusion are chosen from. A pair is counted when the second
+instruction follows the first in memory and the first is not a control
+transfer, the only pairs the predecoder can fuse. Pairs already fused
+are marked with *.
+
+Programs run with step() for at most --max-cycles instructions with the
+random number generator seeded, the timer is off unless --timer-interval
+is given. The run time of CPU.execute with and without fusion is reported
+for each program.
+
+$ python benchmarks/profile_pairs.py [--top 20] [docs/*.s ...]
+"""
+
+import argparse
+import contextlib
+import io
+import random
+from collections import Counter
+from pathlib import Path
+from timeit import repeat
+
+from loguru import logger
+
+from simplecpu import exceptions
+from simplecpu.cpu import CPU
+from simplecpu.fusion import FUSIONS
+from simplecpu.loader import Loader
+from simplecpu.memory import Memory
+from simplecpu.opcode import decode
+from simplecpu.predecode import Predecoder
+
+DOCS = Path(__file__).resolve().parents[2] / "docs"
+
+
+def load(path: Path) -> Memory:
+    memory = Memory()
+    with open(path) as fileobj:
+        Loader(fileobj).initialize(memory)
+    return memory
+
+
+def pairs(path: Path, timer_interval: int, max_cycles: int) -> Counter:
+    """Executed (first, second) opcode value pairs of the program at path."""
+    random.seed(0)
+    cpu = CPU(load(path), timer_interval=timer_interval)
+    counts = Counter()
+    previous = None
+    with contextlib.redirect_stdout(io.StringIO()):
+        try:
+            while cpu.cycles < max_cycles:
+                instruction = cpu.step()
+                if previous is not None and not previous.is_cti:
+                    npc = previous.address + previous.opcode.length
+                    if instruction.address == npc:
+                        counts[previous.opcode.value, instruction.opcode.value] += 1
+                previous = instruction
+        except (StopIteration, exceptions.BaseException):
+            pass
+    return counts
+
+
+def timing(path: Path, timer_interval: int, max_cycles: int, fusion: bool) -> float:
+    """Best seconds per instruction of CPU.execute on the program at path.
+
+    The program is run once to fill the predecoder, then timed from reset.
+    """
+    cpu = CPU(load(path), timer_interval=timer_interval)
+    cpu.predecoder = Predecoder(cpu, fusion=fusion)
+
+    def run() -> None:
+        random.seed(0)
+        cpu.reset()
+        cpu.timer_interval = timer_interval
+        cpu.execute(max_cycles=max_cycles)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        run()
+        best = min(repeat(run, number=1, repeat=5))
+    return best / max(cpu.cycles, 1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="*", type=Path)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--timer-interval", type=int, default=0)
+    parser.add_argument("--max-cycles", type=int, default=100_000)
+    args = parser.parse_args()
+
+    logger.disable("simplecpu")
+
+    paths = args.paths or sorted(DOCS.glob("*.s"))
+    total = Counter()
+    for path in paths:
+        total.update(pairs(path, args.timer_interval, args.max_cycles))
+
+    executed = sum(total.values())
+    print(f"{executed} adjacent pairs executed in {len(paths)} programs")
+    for (first, second), count in total.most_common(args.top):
+        fused = "*" if (first, second) in FUSIONS else " "
+        print(
+            f"{fused} {decode(first).name:>10} {decode(second).name:<10} {count:8d} "
+            f"{count / executed:6.1%}"
+        )
+
+    print()
+    for path in paths:
+        plain = timing(path, args.timer_interval, args.max_cycles, False)
+        fused = timing(path, args.timer_interval, args.max_cycles, True)
+        print(
+            f"{path.name:>12} unfused {plain * 1e6:6.3f} us  "
+            f"fused {fused * 1e6:6.3f} us/instruction"
+        )
+
+
+if __name__ == "__main__":
+    main()
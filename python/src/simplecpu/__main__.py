@@ -10,15 +10,27 @@ import typer
 
 from loguru import logger
 
-from .asm import Assembler
+from . import aot, exceptions
+from .backends import BACKENDS
+from .batch import read_manifest, run_batch
+from .constants import HaltReason
 from .cpu import CPU
-from .dis import Disassembler
 from .memory import Memory
 from .exceptions import ObjectFormatError
+from .tiered import TieredEngine
+from .translate import BlockEngine
+from .verify import verify
 
 
 cli = typer.Typer()
 
+ENGINES: dict[str, callable] = {
+    "predecode": lambda cpu: cpu,
+    "blocks": BlockEngine,
+    "tiered": TieredEngine,
+    "compiled": aot.CompiledEngine,
+}
+
 
 @dataclass
 class GlobalOptions:
@@ -56,25 +68,190 @@ def load_and_run(
         help="Duration in cycles between timer interrupts",
         show_default=True,
     ),
+    max_cycles: int = typer.Option(
+        None,
+        "--max-cycles",
+        "-c",
+        help="Stop after this many cycles, ignored with --debug",
+    ),
+    memory_backend: str = typer.Option(
+        Memory.default_backend,
+        "--memory-backend",
+        "-M",
+        help=f"Memory storage, one of: {', '.join(BACKENDS)}",
+        show_default=True,
+    ),
+    engine: str = typer.Option(
+        None,
+        "--engine",
+        "-e",
+        help=(
+            f"Execution engine, one of: {', '.join(ENGINES)}, ignored with --debug "
+            "[default: compiled if the image was compiled, otherwise predecode]"
+        ),
+    ),
 ) -> None:
     """CPU Simulator"""
 
+    if engine is not None and engine not in ENGINES:
+        typer.secho(f"Unknown engine: {engine}", fg="red")
+        raise typer.Exit(code=1)
+
     try:
-        memory = Memory.from_file(path)
+        memory = Memory.from_file(path, backend=memory_backend)
     except ObjectFormatError:
+        from .asm import Assembler
+
         memory = Assembler.from_file(path).memory
+    except ValueError as error:
+        typer.secho(error, fg="red")
+        raise typer.Exit(code=1) from None
+
+    if engine is None:
+        engine = "compiled" if aot.module_path(memory).exists() else "predecode"
 
     try:
         cpu = CPU(memory, timer_interval=timer_interval, debug=ctx.obj.debug)
-    except Exception as error:
-        print(error)
+        if ctx.obj.debug:
+            cpu.start()
+            return
+        result = ENGINES[engine](cpu).execute(max_cycles=max_cycles)
+    except (ValueError, exceptions.BaseException) as error:
+        typer.secho(error, fg="red")
         raise typer.Exit(code=1) from None
+    finally:
+        memory.close()
+
+    if result.reason == HaltReason.FAULT:
+        typer.secho(f"{result.error()} at {result.pc:08d}", fg="red")
+        raise typer.Exit(code=1)
+
+
+@cli.command(name="batch")
+def batch_run(
+    ctx: typer.Context,
+    paths: list[Path] = typer.Argument(None),
+    manifest: Path = typer.Option(
+        None,
+        "--manifest",
+        "-m",
+        help="File listing program paths, one per line",
+    ),
+    workers: int = typer.Option(
+        None,
+        "--workers",
+        "-w",
+        help="Number of worker processes [default: number of CPUs]",
+    ),
+    timer_interval: int = typer.Option(
+        100,
+        "--timer-interval",
+        "-t",
+        help="Duration in cycles between timer interrupts",
+        show_default=True,
+    ),
+    max_cycles: int = typer.Option(
+        None,
+        "--max-cycles",
+        "-c",
+        help="Stop each program after this many cycles",
+    ),
+    timeout: float = typer.Option(
+        None,
+        "--timeout",
+        help="Stop each program after this many seconds",
+    ),
+    verify: bool = typer.Option(
+        False,
+        "--verify",
+        help="Reject programs certain to fault without running them",
+    ),
+) -> None:
+    """Batch Runner"""
+
+    paths = list(paths or [])
+
+    if manifest:
+        try:
+            paths.extend(read_manifest(manifest))
+        except FileNotFoundError as error:
+            typer.secho(f"{error.strerror}: '{error.filename}'", fg="red")
+            raise typer.Exit(code=1)
+
+    results = run_batch(
+        paths,
+        workers=workers,
+        timer_interval=timer_interval,
+        max_cycles=max_cycles,
+        timeout=timeout,
+        verify=verify,
+    )
+
+    for result in results:
+        print(result.to_json(), flush=True)
+
+
+@cli.command(name="verify")
+def verify_program(
+    ctx: typer.Context,
+    path: Path,
+    timer_interval: int = typer.Option(
+        100,
+        "--timer-interval",
+        "-t",
+        help="Duration in cycles between timer interrupts, 0 skips the TIMER handler",
+        show_default=True,
+    ),
+) -> None:
+    """Static Address Verifier"""
 
     try:
-        cpu.start()
-    except Exception as error:
-        typer.secho(error, fg="red")
-        raise typer.Exit(code=1) from None
+        memory = Memory.from_file(path)
+    except ObjectFormatError:
+        from .asm import Assembler
+
+        memory = Assembler.from_file(path).memory
+    except FileNotFoundError as error:
+        typer.secho(f"{error.strerror}: '{error.filename}'", fg="red")
+        raise typer.Exit(code=1)
+
+    verification = verify(memory, timer=timer_interval > 0)
+
+    for finding in verification.findings:
+        print(finding)
+
+    print(
+        f"{len(verification.reachable)} instructions reachable, "
+        f"{len(verification.faults)} certain faults"
+    )
+
+    if verification.faults:
+        raise typer.Exit(code=1)
+
+
+@cli.command(name="compile")
+def compile_program(
+    ctx: typer.Context,
+    path: Path,
+    cache: Path = typer.Option(
+        None,
+        "--cache",
+        help="Directory for compiled modules [default: $SIMPLECPU_CACHE or ~/.cache/simplecpu]",
+    ),
+) -> None:
+    """Ahead-of-time Translator"""
+
+    try:
+        memory = Memory.from_file(path)
+    except ObjectFormatError:
+        from .asm import Assembler
+
+        memory = Assembler.from_file(path).memory
+    except FileNotFoundError as error:
+        typer.secho(f"{error.strerror}: '{error.filename}'", fg="red")
+        raise typer.Exit(code=1)
+
+    print(aot.compile_image(memory, cache))
 
 
 @cli.command(name="asm")
@@ -85,6 +262,8 @@ def assemble_source(
 ) -> None:
     """Assembler"""
 
+    from .asm import Assembler
+
     dest = dest or source.with_suffix(".o").relative_to(source.parent)
 
     try:
@@ -102,6 +281,8 @@ def disassemble_source(
 ) -> None:
     """Disassembler"""
 
+    from .dis import Disassembler
+
     try:
         disassembler = Disassembler(objectpath)
         print(disassembler)
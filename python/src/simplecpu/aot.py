@@ -0,0 +1,178 @@
+"""Ahead-of-time Translation
+
+`compile_image` translates every basic block reachable in a memory image
+with the block translator and writes them to a Python module named for
+a hash of the image, in the cache directory:
+
+    $SIMPLECPU_CACHE, or ~/.cache/simplecpu
+
+The module is byte compiled when it is written, so loading it for a
+later run of the same image costs an unmarshal instead of translating
+and compiling each block again. `CompiledEngine` runs an image with the
+blocks of its module and translates any others, eg. a block split at a
+timer interrupt or one overwritten at run time, as `BlockEngine` does.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import importlib.util
+import os
+import py_compile
+from pathlib import Path
+from types import ModuleType
+
+from loguru import logger
+
+from .constants import Mode, ProgramLoad
+from .cpu import CPU
+from .exceptions import *
+from .memory import Memory
+from .opcode import Opcode
+from .translate import Block, BlockEngine, BlockTranslator
+from .verify import Verifier
+
+# Changes whenever generated modules change, it is part of the hash.
+FORMAT: int = 1
+
+HEADER: str = '''"""Ahead-of-time translation of a SimpleCPU memory image.
+
+Generated by `simplecpu compile`, do not edit.
+"""
+'''
+
+
+def digest(memory: Memory) -> str:
+    """A hash of the contents of memory and the module format."""
+    words = memory.read_block(0, memory.nwords)
+    data = FORMAT.to_bytes(4, "little") + words.tobytes()
+    return hashlib.sha256(data).hexdigest()
+
+
+def cache_dir() -> Path:
+    """The directory holding compiled modules."""
+    try:
+        return Path(os.environ["SIMPLECPU_CACHE"])
+    except KeyError:
+        return Path.home() / ".cache" / "simplecpu"
+
+
+def module_path(memory: Memory, cache: Path = None) -> Path:
+    """The path of the compiled module for memory."""
+    return Path(cache or cache_dir()) / f"image_{digest(memory)[:32]}.py"
+
+
+def leaders(memory: Memory) -> list[tuple[int, Mode]]:
+    """The address and mode of each reachable basic block in memory.
+
+    Blocks start at each entry point and at every address a control
+    transfer instruction may continue at.
+    """
+    verifier = Verifier(memory)
+    found = set(verifier.entries())
+    for address, mode in verifier.verify().reachable.items():
+        try:
+            decoded = verifier.fetch(address, mode)
+        except InvalidOpcodeError:
+            continue
+        opcode, operand = decoded
+        if not opcode.is_cti:
+            continue
+        for successor in verifier.successors(address, opcode, operand):
+            found.add((successor, mode))
+        if opcode is Opcode.INTERRUPT:
+            found.add((ProgramLoad.INTERRUPT.value, Mode.SYSTEM))
+    return sorted(found)
+
+
+def generate(memory: Memory) -> str:
+    """The source of the compiled module for memory."""
+    cpu = CPU(Memory(memory.nwords, memory.read_block(0, memory.nwords)))
+    translator = BlockTranslator(cpu)
+
+    table = []
+    functions = []
+    for address, mode in leaders(memory):
+        cpu.mode = mode
+        try:
+            name, source, count, length = translator.generate(address, mode)
+        except (InvalidOpcodeError, MemoryRangeError, SegmentationFault):
+            continue
+        table.append(f"    ({address}, {mode.value}, {count}, {length}, {name!r}),")
+        functions.append(source)
+
+    lines = [
+        HEADER,
+        f"DIGEST = {digest(memory)!r}",
+        f"NWORDS = {memory.nwords}",
+        "",
+        "# (address, mode, instruction count, length, function) of each block",
+        "BLOCKS = [",
+        *table,
+        "]",
+        "",
+        "",
+        f"def build({', '.join(translator.namespace)}):",
+        '    """The functions named in BLOCKS using the given globals."""',
+    ]
+    for source in functions:
+        lines.append("")
+        lines.extend(f"    {line}" if line else line for line in source.splitlines())
+    lines.append("")
+    lines.append("    return locals()")
+    return "\n".join(lines) + "\n"
+
+
+def compile_image(memory: Memory, cache: Path = None) -> Path:
+    """Translate memory to a byte compiled module and return its path."""
+    path = module_path(memory, cache)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    temporary = path.with_suffix(f".{os.getpid()}.tmp")
+    temporary.write_text(generate(memory))
+    temporary.replace(path)
+    py_compile.compile(str(path), doraise=True)
+
+    logger.debug(f"compiled {path}")
+    return path
+
+
+def load(memory: Memory, cache: Path = None) -> ModuleType | None:
+    """The compiled module for memory, None if it has not been compiled."""
+    path = module_path(memory, cache)
+    if not path.exists():
+        return None
+
+    spec = importlib.util.spec_from_file_location(f"simplecpu_{path.stem}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    if module.DIGEST != digest(memory):
+        return None
+    return module
+
+
+class CompiledEngine(BlockEngine):
+    """Execute a program with the blocks of its compiled module."""
+
+    def __init__(self, cpu: CPU, module: ModuleType = None) -> None:
+        """Run cpu with the blocks of module, by default the module for its memory.
+
+        Raises:
+        - ValueError if there is no module or it is for another memory size.
+        """
+        super().__init__(cpu)
+        if module is None:
+            module = load(cpu.memory)
+        if module is None:
+            raise ValueError("Image not compiled, see simplecpu compile")
+        if module.NWORDS != cpu.memory.nwords:
+            raise ValueError(
+                f"Module mismatch: {module.NWORDS} != {cpu.memory.nwords}"
+            )
+
+        functions = module.build(**self.translator.namespace)
+        for address, mode, count, length, name in module.BLOCKS:
+            mode = Mode(mode)
+            block = Block(address, mode, count, length, functions[name], "")
+            self.insert((address, mode, None), block)
@@ -0,0 +1,139 @@
+"""Memory Backends
+
+A backend owns the storage behind a Memory and exports it as `words`,
+a sequence of ints supporting the buffer protocol with format 'i' so
+Memory and the engines can index it and take zero-copy views of it
+without knowing where it lives.
+
+- array: an array('i'), the default and fastest to index
+- numpy: a NumPy int32 array, for vectorized analysis of the image
+- mmap: an anonymous or file mapping, zero pages cost nothing until touched
+- shared: a multiprocessing shared memory block other processes can attach
+"""
+
+from __future__ import annotations
+
+import mmap
+from array import array
+from multiprocessing import shared_memory
+from typing import Protocol
+
+WORD_SIZE: int = array("i").itemsize
+
+
+class Backend(Protocol):
+    name: str
+    words: array | memoryview
+
+    def close(self) -> None: ...
+
+
+class ArrayBackend:
+    name: str = "array"
+
+    def __init__(self, nwords: int, initializer: list[int] = None) -> None:
+        self.words = array("i", initializer or bytes(nwords * WORD_SIZE))
+
+    def close(self) -> None:
+        """Release the storage, the words are not usable afterwards."""
+        pass
+
+
+class NumPyBackend:
+    name: str = "numpy"
+
+    def __init__(self, nwords: int, initializer: list[int] = None) -> None:
+        """Requires the optional numpy dependency."""
+        import numpy as np
+
+        if initializer:
+            self.array = np.array(initializer, dtype=np.int32)
+        else:
+            self.array = np.zeros(nwords, dtype=np.int32)
+        self.words = memoryview(self.array).cast("B").cast("i")
+
+    def close(self) -> None:
+        """Release the storage, the words are not usable afterwards."""
+        self.words.release()
+
+
+class MmapBackend:
+    name: str = "mmap"
+
+    def __init__(
+        self,
+        nwords: int,
+        initializer: list[int] = None,
+        mapping: mmap.mmap = None,
+        offset: int = 0,
+    ) -> None:
+        """Words in mapping starting at offset bytes, or in a new anonymous mapping."""
+        if mapping is None:
+            mapping = mmap.mmap(-1, nwords * WORD_SIZE)
+        self.mapping = mapping
+        self.words = memoryview(mapping)[offset : offset + nwords * WORD_SIZE].cast("i")
+        if initializer:
+            self.words[:] = array("i", initializer)
+
+    def close(self) -> None:
+        """Release the storage, the words are not usable afterwards."""
+        self.words.release()
+        self.mapping.close()
+
+
+class SharedBackend:
+    name: str = "shared"
+
+    def __init__(
+        self, nwords: int, initializer: list[int] = None, block: str = None
+    ) -> None:
+        """Create a shared block for nwords, or attach to the block called block."""
+        if block is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=nwords * WORD_SIZE)
+            self.owner = True
+        else:
+            self.shm = _attach(block)
+            self.owner = False
+        self.words = self.shm.buf[: nwords * WORD_SIZE].cast("i")
+        if initializer:
+            self.words[:] = array("i", initializer)
+
+    def __del__(self) -> None:
+        try:
+            self.close()
+        except (AttributeError, BufferError):
+            pass
+
+    @property
+    def block(self) -> str:
+        """The name other processes use to attach to this block."""
+        return self.shm.name
+
+    def close(self) -> None:
+        """Detach from the shared block, the owner also destroys it."""
+        if self.shm.buf is None:
+            return
+        if self.owner:
+            self.owner = False
+            self.shm.unlink()
+        self.words.release()
+        self.shm.close()
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attach to an existing shared block without tracking it.
+
+    Only the creating process unlinks the block. Before Python 3.13 an
+    attached block is always tracked, which is harmless when the owner
+    is in the same process tree and so shares the resource tracker.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+BACKENDS: dict[str, type] = {
+    backend.name: backend
+    for backend in (ArrayBackend, NumPyBackend, MmapBackend, SharedBackend)
+}
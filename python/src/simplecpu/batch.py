@@ -0,0 +1,185 @@
+"""Batch Execution
+
+Runs many programs in a pool of worker processes and reports a
+JobResult for each as it completes.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from .constants import HaltReason
+from .cpu import CPU
+from .exceptions import ObjectFormatError
+from .memory import Memory
+from .verify import verify as verify_memory
+
+CHUNK_CYCLES: int = 10_000
+
+
+@dataclass
+class JobResult:
+    path: str
+    status: str
+    exit_code: int
+    cycles: int = 0
+    output: str = ""
+    exception: str = None
+    message: str = None
+
+    def to_json(self) -> str:
+        """A single line of JSON describing this result."""
+        return json.dumps(asdict(self))
+
+
+def load_program(path: str | Path) -> Memory:
+    """Load an object file, or assemble path if it is not an object file.
+
+    Object files are mapped copy-on-write so workers running the same
+    file share its pages until they write to them.
+    """
+    try:
+        return Memory.from_file(path, mapped=True)
+    except ObjectFormatError:
+        from .asm import Assembler
+
+        return Assembler.from_file(path).memory
+
+
+def read_manifest(path: str | Path) -> list[Path]:
+    """Program paths listed one per line in path.
+
+    Blank lines and lines starting with # are ignored, relative paths are
+    relative to the directory holding the manifest.
+    """
+    path = Path(path)
+    paths = []
+    for line in path.read_text().splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        paths.append(path.parent / line)
+    return paths
+
+
+def run_job(
+    path: str | Path,
+    timer_interval: int = 0,
+    max_cycles: int = None,
+    timeout: float = None,
+    verify: bool = False,
+) -> JobResult:
+    """Run the program at path to completion and describe the outcome.
+
+    The status is "end" if the program executed END, "cycles" if it used
+    max_cycles, "timeout" if it ran for more than timeout seconds and
+    "fault" if it faulted or could not be loaded.
+
+    If verify is True the program is verified first and is "rejected"
+    without running if it is certain to fault, see `verify.verify`.
+
+    The program's memory is closed before returning, releasing its
+    mapping.
+    """
+    path = str(path)
+    output = io.StringIO()
+    memory = cpu = None
+
+    deadline = None if timeout is None else time.monotonic() + timeout
+    chunk = CHUNK_CYCLES if deadline else max_cycles
+
+    try:
+        with contextlib.redirect_stdout(output):
+            memory = load_program(path)
+            if verify:
+                faults = verify_memory(memory, timer=timer_interval > 0).faults
+                if faults:
+                    return JobResult(
+                        path,
+                        "rejected",
+                        1,
+                        exception=faults[0].fault.__name__,
+                        message=str(faults[0]),
+                    )
+            cpu = CPU(memory, timer_interval=timer_interval)
+            while True:
+                budget = chunk
+                if max_cycles is not None:
+                    budget = min(chunk, max_cycles - cpu.cycles)
+                result = cpu.execute(max_cycles=budget)
+                if result.reason == HaltReason.END:
+                    status, exit_code = "end", 0
+                    break
+                if result.reason == HaltReason.FAULT:
+                    return JobResult(
+                        path,
+                        "fault",
+                        1,
+                        cycles=result.cycles,
+                        output=output.getvalue(),
+                        exception=result.fault,
+                        message=str(result.error()),
+                    )
+                if max_cycles is not None and cpu.cycles >= max_cycles:
+                    status, exit_code = "cycles", 1
+                    break
+                if deadline is not None and time.monotonic() >= deadline:
+                    status, exit_code = "timeout", 1
+                    break
+    except Exception as error:
+        return JobResult(
+            path,
+            "fault",
+            1,
+            cycles=cpu.cycles if cpu else 0,
+            output=output.getvalue(),
+            exception=error.__class__.__name__,
+            message=str(error),
+        )
+    finally:
+        if memory is not None:
+            memory.close()
+
+    return JobResult(path, status, exit_code, cpu.cycles, output.getvalue())
+
+
+def run_batch(
+    paths: Iterable[str | Path],
+    workers: int = None,
+    timer_interval: int = 0,
+    max_cycles: int = None,
+    timeout: float = None,
+    verify: bool = False,
+) -> Iterator[JobResult]:
+    """Run every program in paths on a pool of workers.
+
+    Results are yielded in completion order. Workers defaults to the
+    number of CPUs. If a worker dies the pool is broken and every job
+    that had not finished is reported as a "fault".
+    """
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(
+                run_job, path, timer_interval, max_cycles, timeout, verify
+            ): str(path)
+            for path in paths
+        }
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except BrokenProcessPool as error:
+                yield JobResult(
+                    futures[future],
+                    "fault",
+                    1,
+                    exception=error.__class__.__name__,
+                    message=str(error),
+                )
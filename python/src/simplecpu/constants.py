@@ -40,6 +40,23 @@ class StackBase(int, Enum):
         raise ValueError(f"Unknown mode {mode}")
 
 
+class Trace(int, Enum):
+    OFF: int = 0
+    INSTRUCTIONS: int = 1
+    REGISTERS: int = 2
+    FULL: int = 3
+
+
+class HaltReason(int, Enum):
+    END: int = 0
+    CYCLES: int = 1
+    FAULT: int = 2
+
+
 NWORDS: int = StackBase.for_mode(Mode.SYSTEM).value + 1
 
 MAGIC: int = int.from_bytes(b"%ejo")
+
+MAGIC_V2: int = int.from_bytes(b"%ej2")
+
+SNAPSHOT_MAGIC: int = int.from_bytes(b"%ejs")
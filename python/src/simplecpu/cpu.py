@@ -5,13 +5,19 @@ from __future__ import annotations
 
 import functools
 import random
+from typing import Callable, NamedTuple
 
 from loguru import logger
 
-from .constants import Mode, ProgramLoad, StackBase
+from . import exceptions
+from .constants import HaltReason, Mode, ProgramLoad, StackBase, Trace
 from .exceptions import *
 from .instruction import Instruction
-from .memory import Memory
+from .memory import Memory, traced_read, traced_write
+from .opcode import DECODE_TABLE, ILLEGAL, Opcode, decode
+from .predecode import Predecoder
+from .scheduler import Event, Scheduler
+from .snapshot import Snapshot
 
 
 logger.level("CONSOLE", no=10, color="<black>")
@@ -29,18 +35,87 @@ logger.stack = functools.partial(logger.log, "STACK")
 logger.timer = functools.partial(logger.log, "TIMER")
 
 
+class RunResult(NamedTuple):
+    """Why an engine stopped, the PC and cycle count when it did.
+
+    If the reason is FAULT, fault is the name of the exception class in
+    `exceptions` describing it and detail is its message.
+    """
+
+    reason: HaltReason
+    cycles: int
+    pc: int = None
+    fault: str = None
+    detail: str = None
+
+    @classmethod
+    def faulted(cls, error: exceptions.BaseException, pc: int, cycles: int) -> RunResult:
+        """The result of a run stopped by error at pc."""
+        return cls(HaltReason.FAULT, cycles, pc, error.name, " ".join(error.args))
+
+    def error(self) -> exceptions.BaseException | None:
+        """An exception describing the fault, None if there was none."""
+        if self.fault is None:
+            return None
+        return getattr(exceptions, self.fault)(self.detail)
+
+    def raise_fault(self) -> RunResult:
+        """Return this result, or raise the exception describing its fault.
+
+        Raises:
+        - InvalidOpcodeError
+        - InvalidOperandError
+        - MachineCheck
+        - MemoryRangeError
+        - SegmentationFault
+        - StackUnderflowError
+        """
+        error = self.error()
+        if error is not None:
+            raise error
+        return self
+
+
+class Context(NamedTuple):
+    """Memory access for one mode with that mode's protection built in.
+
+    The CPU switches contexts when its mode changes so loads, stores and
+    pops do not check the mode on every access.
+    """
+
+    mode: Mode
+    stack_base: int
+    fetch_stop: int
+    load: Callable[[int], int]
+    store: Callable[[int, int], None]
+
+
 class CPU:
     def __init__(
-        self, memory: Memory = None, timer_interval: int = 0, debug: bool = False
+        self,
+        memory: Memory = None,
+        timer_interval: int = 0,
+        debug: bool = False,
+        trace: Trace = None,
     ) -> None:
         self.memory = memory or Memory()
+        self.scheduler = Scheduler()
         self.timer_interval = timer_interval
         self.debug: bool = debug
+        if trace is None:
+            trace = Trace.FULL if debug else Trace.OFF
+        self.trace_level = Trace(trace)
+        self.trace = getattr(self, f"_trace_{self.trace_level.name.lower()}")
+        self.build_tracing()
         self.interrupts_enabled: bool = True
+        self.predecoder = Predecoder(self)
+        self.build_contexts()
+        self.build_dispatch()
         self.reset()
 
     def reset(self) -> None:
         self.mode = Mode.USER
+        self.halted: bool = False
         self.ir: int = 0
         self.pc: int = ProgramLoad.for_mode(self.mode).value
         self.sp: int = StackBase.for_mode(self.mode).value
@@ -53,8 +128,81 @@ class CPU:
     def __str__(self) -> str:
         return self.dump(stack=True)
 
-    def dump(self) -> str:
-        """The state of the CPU."""
+    def snapshot(self) -> Snapshot:
+        """Capture the registers, timer state and a copy of memory."""
+        words = self.memory.read_block(0, self.memory.nwords)
+        return Snapshot(
+            self.pc,
+            self.sp,
+            self.ir,
+            self.ac,
+            self.x,
+            self.y,
+            self.mode,
+            self.interrupts_enabled,
+            self.cycles,
+            self.operand,
+            self.timer_interval,
+            words,
+        )
+
+    def restore(self, snapshot: Snapshot) -> None:
+        """Return the CPU and memory to the state captured in snapshot.
+
+        Raises:
+        - ValueError if the snapshot memory is not the size of this memory.
+        """
+        self.memory.load(snapshot.words)
+        self.pc = snapshot.pc
+        self.sp = snapshot.sp
+        self.ir = snapshot.ir
+        self.ac = snapshot.ac
+        self.x = snapshot.x
+        self.y = snapshot.y
+        self.mode = snapshot.mode
+        self.interrupts_enabled = snapshot.interrupts_enabled
+        self.cycles = snapshot.cycles
+        self.operand = snapshot.operand
+        self.timer_interval = snapshot.timer_interval
+
+    def build_tracing(self) -> None:
+        """Choose traced or untraced methods for the trace level.
+
+        Untraced, the default for Trace.OFF, runs the class's methods which
+        make no logging calls. Otherwise `_step`, `interrupt`, `ireturn`
+        and `put` are replaced on this instance by methods logging what
+        they do. At Trace.FULL `build_contexts` also logs this CPU's memory
+        reads and writes, the Memory itself is left as it is, and every
+        step decodes the instruction again so its fetch is logged too.
+        Contexts and dispatch must be built after.
+        """
+        if self.trace_level is Trace.OFF:
+            return
+
+        self._step = self._step_traced
+        self.interrupt = self._interrupt_traced
+        self.ireturn = self._ireturn_traced
+        self.put = self._put_traced
+
+    def _trace_off(self, instruction: Instruction) -> None:
+        """Trace nothing."""
+
+    def _trace_instructions(self, instruction: Instruction) -> None:
+        """Log the instruction."""
+        logger.instruction(f"{instruction!s}")
+
+    def _trace_registers(self, instruction: Instruction) -> None:
+        """Log the instruction, registers and stack."""
+        logger.instruction(f"{instruction!s}")
+        self.dump(memory=False)
+
+    def _trace_full(self, instruction: Instruction) -> None:
+        """Log the instruction, registers, stack and memory."""
+        logger.instruction(f"{instruction!s}")
+        self.dump()
+
+    def dump(self, memory: bool = True) -> None:
+        """Log the state of the CPU: registers, the stack and optionally memory."""
 
         registers = []
 
@@ -80,36 +228,153 @@ class CPU:
             logger.registers(register)
 
         for sp in range(self.sp, base.value):
-            value = self._load(sp)
+            value = self._read(sp)
             logger.stack(f"[stack {sp:08}] [{value:08}]")
 
+        if not memory:
+            return
+
         for line in str(self.memory).splitlines():
             logger.memory(line)
 
+    @property
+    def timer_interval(self) -> int:
+        """Cycles between timer interrupts, zero disables the timer."""
+        return self._timer_interval
+
+    @timer_interval.setter
+    def timer_interval(self, interval: int) -> None:
+        self._timer_interval = interval
+        if interval:
+            self.scheduler.schedule(Event("timer", self.timer, period=interval))
+        else:
+            self.scheduler.cancel("timer")
+
     @property
     def fire_timer(self) -> bool:
         """Return True if the timer_interrupt should be taken."""
+        timer = self.scheduler.events.get("timer")
+        return timer is not None and timer.due(self.cycles)
+
+    def timer(self) -> None:
+        """Take a timer interrupt.
 
-        return all(
-            [
-                self.cycles
-                and self.timer_interval
-                and self.cycles % self.timer_interval == 0
-            ]
+        The timer is always counting, if interrupts are disabled the
+        interrupt is not taken and PC is incremented.
+        """
+        self.interrupt(ProgramLoad.TIMER)
+
+    def build_dispatch(self) -> None:
+        """Build the table of microcode methods indexed by opcode value.
+
+        Values without an opcode dispatch to `invalid`. Call again after
+        replacing a microcode method on an instance.
+
+        Raises:
+        - MachineCheck if no method is found for an opcode.
+        """
+        dispatch = []
+        for opcode in DECODE_TABLE:
+            name = "invalid" if opcode is ILLEGAL else opcode.name
+            try:
+                dispatch.append(getattr(self, name))
+            except AttributeError:
+                raise MachineCheck(f"Missing microcode for {name}") from None
+        self.dispatch: list[callable] = dispatch
+
+        # Opcode values still dispatching to this class's own microcode,
+        # only those are verified or fused by the predecoder.
+        self.stock: frozenset[int] = frozenset(
+            opcode.value
+            for opcode in Opcode
+            if getattr(dispatch[opcode.value], "__func__", None)
+            is getattr(CPU, opcode.name)
         )
 
+        # LOADA and STORE of an address in user_space cannot fault in any
+        # mode, the predecoder dispatches those to microcode that does not
+        # check the address again, unless _load or _store are overridden.
+        self.verified: dict[int, callable] = {
+            opcode.value: method
+            for opcode, method in (
+                (Opcode.LOADA, self.loada_verified),
+                (Opcode.STORE, self.store_verified),
+            )
+            if opcode.value in self.stock and self.direct_access
+        }
+
+        self.predecoder.clear()
+
     @property
     def microcode(self) -> callable:
         """The method that implements the instruction in the IR register.
 
         Raises:
-        - MachineCheck if no method is found for the opcode in IR.
+        - InvalidOpcodeError if IR does not hold an opcode.
         """
-        instruction = Instruction(self.ir, self.pc)
+        return self.dispatch[decode(self.ir).value]
+
+    @property
+    def mode(self) -> Mode:
+        """The current mode, setting it switches the execution context."""
+        return self._mode
+
+    @mode.setter
+    def mode(self, mode: Mode) -> None:
+        context = self.contexts[mode]
+        self._mode = context.mode
+        self.load_word = context.load
+        self.store_word = context.store
+        if self.direct_access:
+            self._load = context.load
+            self._store = context.store
+        self.stack_base = context.stack_base
+        self.fetch_stop = context.fetch_stop
+
+    def build_contexts(self) -> None:
+        """Build the USER and SYSTEM execution contexts.
+
+        In USER mode loads and stores outside user_space raise
+        SegmentationFault, in SYSTEM mode they go straight to memory.
+        Call again after replacing memory.
+        """
+        read = self.memory.read
+        write = self.memory.write
+        if self.trace_level is Trace.FULL and not self.memory.traced:
+            read = traced_read(read)
+            write = traced_write(write)
+        self._read = read
+        self._write = write
+
+        # Without a subclass override _load and _store are the context's
+        # own callables, installed on the instance by the mode setter.
+        self.direct_access: bool = (
+            type(self)._load is CPU._load and type(self)._store is CPU._store
+        )
+
+        start, stop = self.user_space.start, self.user_space.stop
+
+        def load(address: int) -> int:
+            if not start <= address < stop:
+                raise SegmentationFault(f"load from {address}")
+            return read(address)
+
+        def store(address: int, value: int) -> None:
+            if not start <= address < stop:
+                raise SegmentationFault(f"store to {address}")
+            write(address, value)
+
+        self.contexts: dict[Mode, Context] = {
+            Mode.USER: Context(Mode.USER, StackBase.USER.value, stop, load, store),
+            Mode.SYSTEM: Context(
+                Mode.SYSTEM, StackBase.SYSTEM.value, self.memory.nwords, read, write
+            ),
+        }
+
         try:
-            return getattr(self, instruction.name)
+            self.mode = self._mode
         except AttributeError:
-            raise MachineCheck(f"Missing microcode for {instruction.name}") from None
+            pass
 
     @property
     def user_space(self) -> range:
@@ -127,9 +392,7 @@ class CPU:
         Raises:
         - SegmentationFault if mode is USER and address is out of bounds.
         """
-        if self.mode is Mode.USER and address not in self.user_space:
-            raise SegmentationFault(f"load from {address}")
-        return self.memory.read(address)
+        return self.load_word(address)
 
     def _store(self, address: int, value: int) -> None:
         """Store an integer value to Memory at address.
@@ -137,9 +400,7 @@ class CPU:
         Raises:
         - SegmentationFault if mode is USER and address is out of bounds.
         """
-        if self.mode is Mode.USER and address not in self.user_space:
-            raise SegmentationFault(f"store to {address}")
-        self.memory.write(address, value)
+        self.store_word(address, value)
 
     def _push(self, value: int) -> None:
         """Push the value onto the current stack.
@@ -160,9 +421,7 @@ class CPU:
         Check for system mode stack underflow
         Return value
         """
-        stackbase = StackBase.for_mode(self.mode)
-
-        if self.sp >= stackbase:
+        if self.sp >= self.stack_base:
             raise StackUnderflowError(self.sp, self.mode)
 
         value = self._load(self.sp)
@@ -178,15 +437,37 @@ class CPU:
         return self.step()
 
     def step(self) -> Instruction:
+        """Execute one instruction at PC, raising StopIteration after END.
+
+        See `_step`.
+
+        Raises:
+        - InvalidOpcodeError
+        - InvalidOperandError
+        - MachineCheck
+        - MemoryRangeError
+        - SegmentationFault
+        - StopIteration
+        """
+        instruction = self._step()
+        if self.halted:
+            self.halted = False
+            raise StopIteration()
+        return instruction
+
+    def _step(self) -> Instruction:
         """Execute one instruction at PC
 
-        If the interrupt timer fires switch to SYSTEM mode
+        Take any scheduled events, if the timer fires switch to SYSTEM mode
 
-        Load the instruction at PC into IR
-        Load the operand if the instruction has one
+        Fetch the predecoded instruction at PC
+        Load the instruction into IR and its operand if it has one
         Execute the microcode for the instruction
         Increment cycles to "retire" the instruction
 
+        The instruction is traced at any level but Trace.OFF, see
+        `build_tracing`. END leaves PC on the END and sets halted instead of raising.
+
         Raises:
         - InvalidOpcodeError
         - InvalidOperandError
@@ -197,30 +478,51 @@ class CPU:
 
         self.operand = None
 
-        if self.fire_timer:
-            self.interrupt(ProgramLoad.TIMER)
+        self.scheduler.poll(self.cycles)
 
-        self.ir = self._load(self.pc)
+        entry = self.predecoder.fetch(self.pc)
 
-        instruction = Instruction(self.ir, self.pc)
+        self.ir = entry.opcode.value
+        self.operand = entry.operand
 
-        if instruction.has_operand:
-            self.operand = self._load(self.pc + 1)
-            instruction.operand = self.operand
+        instruction = Instruction(entry.opcode, self.pc, entry.operand)
 
-        logger.instruction(f"{instruction!s}")
+        entry.handler()
+        self.cycles += 1
 
-        self.dump()
+        if not entry.is_cti:
+            self.pc += entry.length
 
-        try:
-            self.microcode()
-            self.cycles += 1
-        except StopIteration:
-            self.cycles += 1
-            raise
+        return instruction
+
+    def _step_traced(self) -> Instruction:
+        """`_step`, tracing the instruction before it executes.
+
+        At Trace.FULL the predecoded entry is not used, the instruction
+        is decoded again so the words fetched are logged every step.
+        """
+
+        self.operand = None
+
+        self.scheduler.poll(self.cycles)
+
+        if self.trace_level is Trace.FULL:
+            entry = self.predecoder.decode(self.pc)
+        else:
+            entry = self.predecoder.fetch(self.pc)
+
+        self.ir = entry.opcode.value
+        self.operand = entry.operand
+
+        instruction = Instruction(entry.opcode, self.pc, entry.operand)
+
+        self.trace(instruction)
+
+        entry.handler()
+        self.cycles += 1
 
-        if not instruction.is_cti:
-            self.pc += 2 if instruction.has_operand else 1
+        if not entry.is_cti:
+            self.pc += entry.length
 
         return instruction
 
@@ -237,6 +539,100 @@ class CPU:
         for instruction in self:
             pass
 
+    def run(self, max_cycles: int = None) -> RunResult:
+        """Execute from the current PC until END or max_cycles instructions retire.
+
+        See `execute`, faults are raised instead of returned.
+
+        Raises:
+        - InvalidOpcodeError
+        - InvalidOperandError
+        - MachineCheck
+        - MemoryRangeError
+        - SegmentationFault
+        - StackUnderflowError
+        """
+        return self.execute(max_cycles).raise_fault()
+
+    def execute(self, max_cycles: int = None) -> RunResult:
+        """Execute from the current PC until END, a fault or max_cycles instructions retire.
+
+        A fast alternative to `start` for throughput; instructions are not
+        logged, the CPU is not dumped and no Instruction is built, `step`
+        remains the observable path. Registers are not reset. Fused pairs
+        run as one dispatch when both retire before the next event.
+
+        Faults are returned as a FAULT result, the CPU is left as `step`
+        leaves it when it raises.
+        """
+        entries = self.predecoder.entries
+        fetch = self.predecoder.fetch
+        nentries = len(entries)
+        scheduler = self.scheduler
+
+        cycles = self.cycles
+        stop = None if max_cycles is None else cycles + max_cycles
+        self.halted = False
+
+        try:
+            while cycles != stop:
+                self.cycles = cycles
+                scheduler.poll(cycles)
+                fetch_stop = self.fetch_stop
+
+                batch = stop
+                countdown = scheduler.countdown(cycles)
+                if countdown is not None:
+                    if stop is None or cycles + countdown < stop:
+                        batch = cycles + countdown
+
+                while cycles != batch:
+                    pc = self.pc
+                    entry = entries[pc] if 0 <= pc < nentries else None
+                    if entry is None:
+                        entry = fetch(pc, True)
+                    elif pc + entry.length > fetch_stop:
+                        entry = fetch(pc, True)
+
+                    self.ir = entry.opcode.value
+                    self.operand = entry.operand
+
+                    fused = entry.fused
+                    if (
+                        fused is not None
+                        and cycles + 1 != batch
+                        and pc + fused.length <= fetch_stop
+                    ):
+                        entry = fused
+                        try:
+                            entry.handler()
+                        except Exception:
+                            # The first instruction retired if IR moved on.
+                            if self.ir == entry.opcode.value:
+                                cycles += 1
+                            raise
+                        cycles += 2
+                    else:
+                        entry.handler()
+                        cycles += 1
+
+                    if entry.is_cti:
+                        if self.halted:
+                            break
+                        fetch_stop = self.fetch_stop
+                    else:
+                        self.pc = pc + entry.length
+
+                if self.halted:
+                    self.halted = False
+                    return RunResult(HaltReason.END, cycles, self.pc)
+        except exceptions.BaseException as error:
+            return RunResult.faulted(error, self.pc, cycles)
+        finally:
+            self.cycles = cycles
+
+        return RunResult(HaltReason.CYCLES, cycles, self.pc)
+
     def invalid(self) -> None:
         """Raises InvalidOpcodeError."""
         raise InvalidOpcodeError(f"{self.pc:08d}: {self.ir:08d}")
@@ -249,6 +645,10 @@ class CPU:
         """Load the value at address into the AC register."""
         self.ac = self._load(self.operand)
 
+    def loada_verified(self) -> None:
+        """LOADA of an address verified to be accessible in every mode."""
+        self.ac = self._read(self.operand)
+
     def loadi(self) -> None:
         """Load the value from address at address into the AC register."""
         address = self._load(self.operand)
@@ -270,6 +670,10 @@ class CPU:
         """Store the value in the AC register at address."""
         self._store(self.operand, self.ac)
 
+    def store_verified(self) -> None:
+        """STORE to an address verified to be accessible in every mode."""
+        self._write(self.operand, self.ac)
+
     def get(self) -> None:
         """Store a random integer from 1 to 100 into the AC register."""
         self.ac = random.randint(1, 100)
@@ -284,8 +688,6 @@ class CPU:
         - InvalidOperandError for port not in [1,2]
         """
 
-        logger.console(f"[{self.pc:08}] put {self.ac} -> port {self.operand} ")
-
         if self.debug:
             return
 
@@ -297,7 +699,7 @@ class CPU:
             print(chr(self.ac), end="")
             return
 
-        raise InvalidOperandError(f"unknown {port=}")
+        raise InvalidOperandError(f"unknown port={self.operand}")
 
     def addx(self) -> None:
         """Add X register into AC register."""
@@ -412,14 +814,12 @@ class CPU:
         if program_load == ProgramLoad.INTERRUPT:
             u_pc += 1
 
-        self.sp = StackBase.for_mode(self.mode).value
+        self.sp = self.stack_base
         self._push(u_sp)
         self._push(u_pc)
 
         self.pc = program_load.value
 
-        logger.timer(f"C {self.pc=:08} {self.sp=:08} <- {u_pc=:08} {u_sp=:08}")
-
     def ireturn(self) -> None:
         """Return from a system call.
 
@@ -428,18 +828,46 @@ class CPU:
         Enable interrupts
         Switch mode to USER
         """
-        s_pc = self.pc
-        s_sp = self.sp
-
         self.pc = self._pop()
         self.sp = self._pop()
         self.interrupts_enabled = True
         self.mode = Mode.USER
+
+    def _put_traced(self) -> None:
+        """`put`, logging the value and port."""
+        logger.console(f"[{self.pc:08}] put {self.ac} -> port {self.operand} ")
+        type(self).put(self)
+
+    def _interrupt_traced(
+        self, program_load: ProgramLoad = ProgramLoad.INTERRUPT
+    ) -> None:
+        """`interrupt`, logging the switch to SYSTEM mode if it is taken."""
+        u_pc = self.pc
+        u_sp = self.sp
+        taken = self.interrupts_enabled
+
+        type(self).interrupt(self, program_load)
+
+        if not taken:
+            return
+
+        if program_load == ProgramLoad.INTERRUPT:
+            u_pc += 1
+
+        logger.timer(f"C {self.pc=:08} {self.sp=:08} <- {u_pc=:08} {u_sp=:08}")
+
+    def _ireturn_traced(self) -> None:
+        """`ireturn`, logging the switch back to USER mode."""
+        s_pc = self.pc
+        s_sp = self.sp
+
+        type(self).ireturn(self)
+
         logger.timer(f"R {self.pc=:08} {self.sp=:08} <- {s_pc=:08} {s_sp=:08}")
 
     def end(self) -> None:
         """Stop executing instructions.
 
-        Raises StopIteration
+        Sets halted, `step` raises StopIteration and the engines return.
         """
-        raise StopIteration()
+        self.halted = True
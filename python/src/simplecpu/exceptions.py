@@ -50,6 +50,12 @@ class SegmentationFault(BaseException):
     pass
 
 
+class SourceFormatError(BaseException):
+    """Malformed program source."""
+
+    pass
+
+
 class StackUnderflowError(BaseException):
     """Popping the bottom of the stack."""
 
@@ -63,5 +69,6 @@ __all__ = [
     "MemoryRangeError",
     "ObjectFormatError",
     "SegmentationFault",
+    "SourceFormatError",
     "StackUnderflowError",
 ]
@@ -0,0 +1,138 @@
+"""Superinstruction Fusion
+
+A handful of instruction pairs make up most of what the sample programs
+execute. When the predecoder decodes the first instruction of one of
+these pairs it also builds a fused handler running both, which
+`CPU.execute` dispatches once instead of twice:
+
+    LOADV n; PUSH        push a constant
+    LOADV n; COPYTOX     initialize the X register, usually to 0
+    LOADV c; PUT port    print a constant
+    INCX; JUMP address   close a loop counting X up
+    COPYFROMX; JUMPNE    close a loop counting X down
+    POP; RET             return a value from a subroutine
+
+A fused handler leaves the CPU exactly as running the pair separately
+would, including when the second instruction faults: PC, IR and the
+operand are those of the second instruction once the first retires.
+`CPU.execute` only dispatches a fused handler when both instructions retire
+before the next scheduled event, so cycles and timer interrupts are
+unchanged. The pairs were chosen with benchmarks/profile_pairs.py.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Callable
+
+from .opcode import Opcode
+
+if TYPE_CHECKING:
+    from .cpu import CPU
+    from .predecode import Predecoded
+
+# The most words a fused pair spans, two instructions with operands.
+MAX_SPAN: int = 4
+
+
+def loadv_push(cpu: CPU, first: Predecoded, second: Predecoded, npc: int) -> Callable:
+    value = first.operand
+    push = cpu._push
+    ir = second.opcode.value
+
+    def handler() -> None:
+        cpu.ac = value
+        cpu.pc = npc
+        cpu.ir = ir
+        cpu.operand = None
+        push(value)
+
+    return handler
+
+
+def loadv_copytox(
+    cpu: CPU, first: Predecoded, second: Predecoded, npc: int
+) -> Callable:
+    value = first.operand
+    ir = second.opcode.value
+
+    def handler() -> None:
+        cpu.ac = value
+        cpu.x = value
+        cpu.pc = npc
+        cpu.ir = ir
+        cpu.operand = None
+
+    return handler
+
+
+def loadv_put(cpu: CPU, first: Predecoded, second: Predecoded, npc: int) -> Callable:
+    value = first.operand
+    port = second.operand
+    put = cpu.put
+    ir = second.opcode.value
+
+    def handler() -> None:
+        cpu.ac = value
+        cpu.pc = npc
+        cpu.ir = ir
+        cpu.operand = port
+        put()
+
+    return handler
+
+
+def incx_jump(cpu: CPU, first: Predecoded, second: Predecoded, npc: int) -> Callable:
+    address = second.operand
+    ir = second.opcode.value
+
+    def handler() -> None:
+        cpu.x += 1
+        cpu.ir = ir
+        cpu.operand = address
+        cpu.pc = address
+
+    return handler
+
+
+def copyfromx_jumpne(
+    cpu: CPU, first: Predecoded, second: Predecoded, npc: int
+) -> Callable:
+    address = second.operand
+    fallthrough = npc + second.length
+    ir = second.opcode.value
+
+    def handler() -> None:
+        x = cpu.ac = cpu.x
+        cpu.ir = ir
+        cpu.operand = address
+        cpu.pc = address if x != 0 else fallthrough
+
+    return handler
+
+
+def pop_ret(cpu: CPU, first: Predecoded, second: Predecoded, npc: int) -> Callable:
+    pop = cpu._pop
+    ir = second.opcode.value
+
+    def handler() -> None:
+        cpu.ac = pop()
+        cpu.pc = npc
+        cpu.ir = ir
+        cpu.operand = None
+        cpu.pc = pop()
+
+    return handler
+
+
+# Fused handler factories indexed by the opcode values of the pair.
+FUSIONS: dict[tuple[int, int], Callable] = {
+    (Opcode.LOADV.value, Opcode.PUSH.value): loadv_push,
+    (Opcode.LOADV.value, Opcode.COPYTOX.value): loadv_copytox,
+    (Opcode.LOADV.value, Opcode.PUT.value): loadv_put,
+    (Opcode.INCX.value, Opcode.JUMP.value): incx_jump,
+    (Opcode.COPYFROMX.value, Opcode.JUMPNE.value): copyfromx_jumpne,
+    (Opcode.POP.value, Opcode.RET.value): pop_ret,
+}
+
+# Opcode values that start a fused pair.
+LEADERS: frozenset[int] = frozenset(first for first, _ in FUSIONS)
@@ -5,7 +5,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 
-from .opcode import Opcode
+from .opcode import Opcode, decode
 
 
 @dataclass
@@ -17,7 +17,7 @@ class Instruction:
     def __post_init__(self) -> None:
 
         if isinstance(self.opcode, int):
-            self.opcode = Opcode.by_value(self.opcode)
+            self.opcode = decode(self.opcode)
 
     def __str__(self) -> str:
         words = []
@@ -1,37 +1,80 @@
 """
 """
 
-
+import re
+from array import array
 from io import TextIOWrapper
 from pathlib import Path
 
 from loguru import logger
 
 from .constants import ProgramLoad
+from .exceptions import SourceFormatError
 from .memory import Memory
 
+# A line is blank, a comment, a value or a .address. Anything following
+# the integer of the last two is a comment, whether or not it begins
+# with //.
+LINE = re.compile(r"\s*(?:(\.)?([-+]?\d+).*|//.*)?")
+
 
 class Loader:
     def __init__(self, fileobj: TextIOWrapper, debug: bool = False) -> None:
         self.fileobj = fileobj
 
     def initialize(self, memory: Memory) -> None:
+        """Load each line of the program source into memory.
+
+        Values are collected into one array per `.address` segment and
+        copied into memory in bulk.
 
-        address = ProgramLoad.USER.value
+        Raises:
+        - SourceFormatError for malformed lines or segments that do not
+          fit in memory, reporting the line number.
+        """
+        base = ProgramLoad.USER.value
+        start = 1
+        segment = array("i")
 
-        for line, text in enumerate(self.fileobj.readlines()):
-            logger.debug(f"[{line=:05} {address=:08}] {text=}")
-            text = text.strip()
-            if not text:
+        for lineno, text in enumerate(self.fileobj, 1):
+            match = LINE.fullmatch(text.rstrip("\r\n"))
+            if match is None:
+                raise SourceFormatError(f"line {lineno}: {text.strip()!r}")
+
+            directive, value = match.groups()
+            if value is None:
                 continue
 
-            if text.startswith("."):
-                address = int(text.lstrip("."))
+            if directive:
+                self.copy(memory, base, segment, start)
+                base, start, segment = int(value), lineno + 1, array("i")
                 continue
 
             try:
-                values = text.split()
-                memory.write(address, int(values[0]))
-            except Exception as error:
-                logger.debug(f"{text=} {error}")
-            address += 1
+                segment.append(int(value))
+            except OverflowError:
+                raise SourceFormatError(
+                    f"line {lineno}: {value} does not fit in a word"
+                ) from None
+
+        self.copy(memory, base, segment, start)
+
+    def copy(self, memory: Memory, base: int, segment: array, lineno: int) -> None:
+        """Copy segment into memory at base.
+
+        Raises:
+        - SourceFormatError if segment does not fit in memory.
+        """
+        if not segment:
+            return
+
+        end = base + len(segment)
+        if base < 0 or end > memory.nwords:
+            raise SourceFormatError(
+                f"line {lineno}: segment {base}..{end - 1} "
+                f"outside memory 0..{memory.nwords - 1}"
+            )
+
+        logger.debug(f"[{lineno=:05} {base=:08}] {len(segment)} words")
+
+        memory.write_block(base, segment)
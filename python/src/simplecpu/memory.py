@@ -4,16 +4,21 @@
 from __future__ import annotations
 
 import functools
+import mmap
 
 from array import array
+from itertools import compress
 
 from pathlib import Path
 from struct import unpack
+from typing import Callable
 
 from loguru import logger
 
-from .constants import NWORDS, ProgramLoad, MAGIC
+from .constants import NWORDS, ProgramLoad, MAGIC, MAGIC_V2
 from .exceptions import MemoryRangeError, ObjectFormatError
+from .backends import BACKENDS, WORD_SIZE, ArrayBackend, Backend, MmapBackend
+from .objfile import dumps, read_header, read_segments
 
 logger.level("READ", no=9, color="<cyan>")
 logger.level("WRITE", no=9, color="<magenta>")
@@ -22,30 +27,126 @@ logger.read = functools.partial(logger.log, "READ")
 logger.write = functools.partial(logger.log, "WRITE")
 
 
+def traced_read(read: Callable[[int], int]) -> Callable[[int], int]:
+    """A read function calling read and logging the address and value."""
+
+    def read_traced(address: int) -> int:
+        value = read(address)
+        logger.read(f"{address=} {value=}")
+        return value
+
+    return read_traced
+
+
+def traced_write(write: Callable[[int, int], None]) -> Callable[[int, int], None]:
+    """A write function logging the address and value and calling write."""
+
+    def write_traced(address: int, value: int) -> None:
+        logger.write(f"{address=} {value=}")
+        write(address, value)
+
+    return write_traced
+
+
 class Memory:
     @classmethod
-    def from_file(cls, path: str | Path) -> Memory:
-        """Read a memory image from a file and return an initalized Memory."""
-        buf = Path(path).read_bytes()
-        magic = int.from_bytes(buf[:4])
-        return cls.from_bytes(magic, buf[4:])
+    def from_file(
+        cls, path: str | Path, mapped: bool = False, backend: str = None
+    ) -> Memory:
+        """Read a memory image from a file and return an initalized Memory.
+
+        Version 1 and version 2 object files are detected by their magic.
+
+        If mapped is True, version 1 files are mapped copy-on-write instead
+        of read and `words` is a view of the mapping following the MAGIC
+        header. Pages are only read when touched and writes are private to
+        this Memory, the file is never modified.
+
+        Otherwise the memory is held by backend, see `Memory`.
+
+        Raises:
+        - ObjectFormatError
+        - ValueError if mapped is True and a backend is given.
+        """
+        if mapped and backend is not None:
+            raise ValueError(f"Mapped memory does not take a backend: {backend}")
+
+        with open(path, "rb") as file:
+            magic = int.from_bytes(file.read(4))
+            if magic == MAGIC_V2:
+                file.seek(0)
+                header = read_header(file)
+                memory = cls(header.nwords, backend=backend)
+                read_segments(file, header, memory.words)
+                return memory
+            if not mapped:
+                return cls.from_bytes(magic, file.read(), backend=backend)
+        return cls.from_mapping(path)
+
+    @classmethod
+    def from_mapping(cls, path: str | Path) -> Memory:
+        """Map a memory image file copy-on-write and return a Memory using it.
+
+        Raises:
+        - ObjectFormatError
+        """
+        with open(path, "rb") as file:
+            magic = int.from_bytes(file.read(4))
+            if magic != MAGIC:
+                raise ObjectFormatError(f"Bad magic: {magic} != {MAGIC}")
+            mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+
+        nwords, partial = divmod(len(mapping) - 4, WORD_SIZE)
+        if partial:
+            mapping.close()
+            raise ObjectFormatError(f"Truncated object: {partial} byte partial word")
+        return cls(nwords, backend=MmapBackend(nwords, mapping=mapping, offset=4))
 
     @classmethod
-    def from_bytes(cls, magic: int, buffer: bytes) -> Memory:
-        """Create a Memory object loaded with the contents of the bytes buffer."""
+    def from_bytes(cls, magic: int, buffer: bytes, backend: str = None) -> Memory:
+        """Create a Memory object loaded with the contents of the bytes buffer.
+
+        Raises:
+        - ObjectFormatError
+        """
 
         if magic != MAGIC:
             raise ObjectFormatError(f"Bad magic: {magic} != {MAGIC}")
 
+        partial = len(buffer) % WORD_SIZE
+        if partial:
+            raise ObjectFormatError(f"Truncated object: {partial} byte partial word")
+
         data = array("i")
         data.frombytes(buffer)
 
-        return cls(len(data), initializer=data.tolist())
+        return cls(len(data), initializer=data, backend=backend)
+
+    default_backend: str = ArrayBackend.name
+
+    def __init__(
+        self,
+        nwords: int = NWORDS,
+        initializer: list[int] = None,
+        backend: str | Backend = None,
+        trace: bool = False,
+    ) -> None:
+        """Memory of nwords integers, optionally initialized from initializer.
+
+        The words are held by backend, the name of one of BACKENDS or a
+        backend instance of nwords. It defaults to `default_backend`.
 
-    def __init__(self, nwords: int = NWORDS, initializer: list[int] = None) -> None:
-        """ """
+        If trace is True every read and write is logged, see `set_trace`.
+
+        Raises:
+        - ValueError
+        """
         self.nwords = nwords
         self.initializer = initializer
+        self._backend = backend or self.default_backend
+
+        if isinstance(self._backend, str) and self._backend not in BACKENDS:
+            raise ValueError(f"Unknown memory backend: {self._backend}")
 
         if self.nwords <= 0:
             raise ValueError(
@@ -57,6 +158,13 @@ class Memory:
                 f"Initializer mismatch: {self.nwords} != {len(self.initializer)}"
             )
 
+        if self.initializer and not isinstance(self._backend, str):
+            self._backend.words[:] = array("i", self.initializer)
+
+        self.watchers: list[Callable[[int], None]] = []
+        self.watched = bytearray(self.nwords)
+        self.set_trace(trace)
+
         logger.debug(repr(self))
 
     def __repr__(self) -> str:
@@ -85,19 +193,104 @@ class Memory:
         return len(self.words)
 
     @property
-    def words(self) -> array:
-        """An array of integers."""
+    def backend(self) -> Backend:
+        """The backend holding the words of this memory, created on first use."""
+        if not isinstance(self._backend, str):
+            return self._backend
+        self._backend = BACKENDS[self._backend](self.nwords, self.initializer)
+        return self._backend
+
+    @property
+    def words(self) -> array | memoryview:
+        """The integers held by the backend."""
         try:
             return self._words
         except AttributeError:
             pass
-        self._words = array("i", self.initializer or [0] * self.nwords)
+        self._words = self.backend.words
         return self._words
 
+    def close(self) -> None:
+        """Release the backend, the memory is not usable afterwards."""
+        if not isinstance(self._backend, str):
+            self._backend.close()
+
     @property
     def bounds(self) -> range:
         """Returns a range object describing the bounds of this memory."""
-        return range(ProgramLoad.USER, ProgramLoad.USER + self.nwords)
+        try:
+            return self._bounds
+        except AttributeError:
+            pass
+        self._bounds = range(ProgramLoad.USER, ProgramLoad.USER + self.nwords)
+        return self._bounds
+
+    def check_block(self, address: int, nwords: int) -> None:
+        """Check the nwords starting at address are all in bounds.
+
+        Raises:
+        - MemoryRangeError
+        """
+        if address < 0 or nwords < 0 or address + nwords > self.nwords:
+            outofbounds = MemoryRangeError(
+                f"{address}..{address + nwords - 1} not in {self.bounds}"
+            )
+            logger.error(str(outofbounds))
+            raise outofbounds
+
+    def view(self, address: int, nwords: int) -> memoryview:
+        """A memoryview of the nwords starting at address, without copying.
+
+        Stores through the view bypass the watchers, see `watch`. Views
+        must be released before the memory is closed.
+
+        Raises:
+        - MemoryRangeError
+        """
+        self.check_block(address, nwords)
+        return memoryview(self.words)[address : address + nwords]
+
+    def read_block(self, address: int, nwords: int) -> array:
+        """A copy of the nwords starting at address.
+
+        Raises:
+        - MemoryRangeError
+        """
+        self.check_block(address, nwords)
+        block = self.words[address : address + nwords]
+        if isinstance(block, array):
+            return block
+        return array("i", block.tobytes())
+
+    def write_block(self, address: int, data: array | list[int]) -> None:
+        """Write the words in data to memory starting at address.
+
+        Raises:
+        - MemoryRangeError
+        """
+        nwords = len(data)
+        self.check_block(address, nwords)
+        if not isinstance(data, array):
+            data = array("i", data)
+        self.words[address : address + nwords] = data
+        self.invalidate_block(address, nwords)
+
+    def fill(self, address: int, nwords: int, value: int) -> None:
+        """Write value to the nwords starting at address.
+
+        Raises:
+        - MemoryRangeError
+        """
+        self.check_block(address, nwords)
+        self.write_block(address, array("i", [value]) * nwords)
+
+    def copy(self, source: int, destination: int, nwords: int) -> None:
+        """Copy the nwords at source to destination, the blocks may overlap.
+
+        Raises:
+        - MemoryRangeError
+        """
+        self.write_block(destination, self.read_block(source, nwords))
 
     def dump(self) -> str:
         """Return a string representation of data held by this memory."""
@@ -122,11 +315,7 @@ class Memory:
             logger.error(str(outofbounds))
             raise outofbounds
 
-        value = self.words[address]
-
-        logger.read(f"{address=} {value=}")
-
-        return value
+        return self.words[address]
 
     def write(self, address: int, value: int) -> None:
         """Write an integer value to the given address.
@@ -134,8 +323,6 @@ class Memory:
         Raises:
         - MemoryRangeError
         """
-        logger.write(f"{address=} {value=}")
-
         if address not in self.bounds:
             outofbounds = MemoryRangeError(f"{address} not in {self.bounds}")
             logger.error(str(outofbounds))
@@ -143,6 +330,77 @@ class Memory:
 
         self.words[address] = value
 
-    def save(self, path: str | Path) -> None:
-        """Save the contents of memory to the specified path."""
-        Path(path).write_bytes(bytes(self))
+        if self.watched[address]:
+            self.invalidate(address)
+
+    def set_trace(self, traced: bool) -> None:
+        """Log every read and write if traced is True.
+
+        Traced methods replace `read` and `write` on this instance, so an
+        untraced memory makes no logging calls. Callers that keep a bound
+        read or write, eg. `CPU.build_contexts`, must fetch it again.
+        """
+        self.traced = traced
+        if traced:
+            self.read = traced_read(type(self).read.__get__(self))
+            self.write = traced_write(type(self).write.__get__(self))
+        else:
+            self.__dict__.pop("read", None)
+            self.__dict__.pop("write", None)
+
+    def watch(self, callback: Callable[[int], None]) -> None:
+        """Call callback with the address whenever a watched address is written.
+
+        Addresses are watched with `mark`. Writes made directly to `words`
+        bypass the watchers, callers doing so must call `invalidate`.
+        """
+        self.watchers.append(callback)
+
+    def mark(self, address: int) -> None:
+        """Watch address for writes, eg. because it was decoded and cached."""
+        self.watched[address] = 1
+
+    def invalidate(self, address: int) -> None:
+        """Clear the watch on address and notify all the watchers."""
+        self.watched[address] = 0
+        for callback in self.watchers:
+            callback(address)
+
+    def load(self, words: array) -> None:
+        """Replace the contents of memory with words in a single copy.
+
+        Every watched address is invalidated.
+
+        Raises:
+        - ValueError if words is not the same size as this memory.
+        """
+        if len(words) != self.nwords:
+            raise ValueError(f"Size mismatch: {self.nwords} != {len(words)}")
+
+        self.write_block(0, words)
+
+    def invalidate_block(self, address: int, nwords: int) -> None:
+        """Invalidate every watched address among the nwords at address."""
+        end = address + nwords
+        watched = self.watched[address:end]
+        if any(watched):
+            for address in list(compress(range(address, end), watched)):
+                self.invalidate(address)
+
+    def save(self, path: str | Path, version: int = 1, compress: bool = False) -> None:
+        """Save the contents of memory to the specified path.
+
+        Version 2 object files hold only the non-zero segments of memory
+        and are zlib compressed if compress is True.
+
+        Raises:
+        - ValueError for an unknown version.
+        """
+        match version:
+            case 1:
+                data = bytes(self)
+            case 2:
+                data = dumps(self.words, compress=compress)
+            case _:
+                raise ValueError(f"Unknown object file version: {version}")
+        Path(path).write_bytes(data)
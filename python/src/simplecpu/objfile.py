@@ -0,0 +1,188 @@
+"""Object File Format v2
+
+Version 1 object files are MAGIC followed by every word of memory in
+native byte order. Version 2 files store only the segments of memory
+holding non-zero words, in little-endian byte order:
+
+    header   MAGIC_V2, version, flags, entry, nwords, nsegments
+    table    (base, length) for each segment
+    data     length words for each segment, in table order
+
+If the COMPRESSED flag is set, everything after the header is a single
+zlib stream. Segments are read and copied into memory one at a time,
+the file is never held in memory as a whole.
+"""
+
+from __future__ import annotations
+
+import sys
+import zlib
+from array import array
+from struct import Struct
+from typing import BinaryIO, MutableSequence, NamedTuple, Sequence
+
+from .constants import MAGIC_V2, ProgramLoad
+from .exceptions import ObjectFormatError
+
+HEADER = Struct("<4sHHIII")
+SEGMENT = Struct("<II")
+
+VERSION: int = 2
+COMPRESSED: int = 1 << 0
+
+MIN_GAP: int = 4
+CHUNK_SIZE: int = 64 * 1024
+WORD_SIZE: int = array("i").itemsize
+
+
+class ObjectHeader(NamedTuple):
+    version: int
+    flags: int
+    entry: int
+    nwords: int
+    nsegments: int
+
+
+def segments(words: Sequence[int], gap: int = MIN_GAP) -> list[tuple[int, int]]:
+    """The (base, length) of each run of non-zero words in words.
+
+    Runs separated by fewer than gap zero words are merged, a segment
+    table entry costs as much as two words.
+    """
+    found = []
+    start = end = None
+    for address, word in enumerate(words):
+        if word:
+            if start is None:
+                start = address
+            end = address + 1
+        elif start is not None and address - end + 1 >= gap:
+            found.append((start, end - start))
+            start = None
+    if start is not None:
+        found.append((start, end - start))
+    return found
+
+
+def dumps(
+    words: Sequence[int],
+    entry: int = ProgramLoad.USER.value,
+    compress: bool = False,
+) -> bytes:
+    """Encode words as a version 2 object file."""
+    table = segments(words)
+    body = [SEGMENT.pack(base, length) for base, length in table]
+    for base, length in table:
+        data = array("i", words[base : base + length])
+        if sys.byteorder != "little":
+            data.byteswap()
+        body.append(data.tobytes())
+    body = b"".join(body)
+
+    flags = 0
+    if compress:
+        flags |= COMPRESSED
+        body = zlib.compress(body)
+
+    magic = MAGIC_V2.to_bytes(4)
+    return HEADER.pack(magic, VERSION, flags, entry, len(words), len(table)) + body
+
+
+class Stream:
+    """Reads exact sizes from a file object, inflating it if compressed."""
+
+    def __init__(self, fileobj: BinaryIO, compressed: bool) -> None:
+        self.fileobj = fileobj
+        self.inflater = zlib.decompressobj() if compressed else None
+        self.buffer = b""
+
+    def read(self, size: int) -> bytes:
+        """Exactly size bytes from the stream.
+
+        Raises:
+        - ObjectFormatError if the stream ends first or is corrupt.
+        """
+        if self.inflater is None:
+            data = self.fileobj.read(size)
+        else:
+            try:
+                while len(self.buffer) < size and not self.inflater.eof:
+                    chunk = self.inflater.unconsumed_tail or self.fileobj.read(
+                        CHUNK_SIZE
+                    )
+                    if not chunk:
+                        break
+                    self.buffer += self.inflater.decompress(chunk, CHUNK_SIZE)
+            except zlib.error as error:
+                raise ObjectFormatError(f"Corrupt object: {error}") from None
+            data, self.buffer = self.buffer[:size], self.buffer[size:]
+
+        if len(data) != size:
+            raise ObjectFormatError(f"Truncated object: {len(data)} < {size} bytes")
+        return data
+
+    def finish(self) -> None:
+        """Check a compressed stream ended with a valid checksum.
+
+        Raises:
+        - ObjectFormatError
+        """
+        if self.inflater is None:
+            return
+        if not self.inflater.eof:
+            try:
+                self.inflater.decompress(self.fileobj.read())
+            except zlib.error as error:
+                raise ObjectFormatError(f"Corrupt object: {error}") from None
+        if not self.inflater.eof:
+            raise ObjectFormatError("Truncated object: incomplete zlib stream")
+
+
+def read_header(fileobj: BinaryIO) -> ObjectHeader:
+    """Read the header of a version 2 object file.
+
+    Raises:
+    - ObjectFormatError
+    """
+    buffer = fileobj.read(HEADER.size)
+    if len(buffer) != HEADER.size:
+        raise ObjectFormatError(f"Truncated header: {len(buffer)} bytes")
+
+    magic, *fields = HEADER.unpack(buffer)
+    if magic != MAGIC_V2.to_bytes(4):
+        raise ObjectFormatError(f"Bad magic: {magic} != {MAGIC_V2.to_bytes(4)}")
+
+    header = ObjectHeader(*fields)
+    if header.version != VERSION:
+        raise ObjectFormatError(f"Unsupported version: {header.version}")
+    if header.nwords <= 0:
+        raise ObjectFormatError(f"Non-positive memory size: {header.nwords}")
+    return header
+
+
+def read_segments(
+    fileobj: BinaryIO, header: ObjectHeader, words: MutableSequence[int]
+) -> None:
+    """Copy each segment following the header in fileobj into words.
+
+    Raises:
+    - ObjectFormatError
+    """
+    stream = Stream(fileobj, bool(header.flags & COMPRESSED))
+
+    table = [
+        SEGMENT.unpack(stream.read(SEGMENT.size)) for _ in range(header.nsegments)
+    ]
+
+    for base, length in table:
+        if base + length > header.nwords:
+            raise ObjectFormatError(
+                f"Segment {base}+{length} exceeds {header.nwords} words"
+            )
+        data = array("i")
+        data.frombytes(stream.read(length * WORD_SIZE))
+        if sys.byteorder != "little":
+            data.byteswap()
+        words[base : base + length] = data
+
+    stream.finish()
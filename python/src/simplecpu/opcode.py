@@ -45,14 +45,15 @@ class Opcode(Enum):
 
     @classmethod
     def by_value(cls, value: int) -> Opcode:
-        # this is a hack to get around the broken enum
-        # eg. Opcode(1) fails since it expects a tuple
+        """Return the Opcode with the given value.
 
-        for opcode in cls:
-            if opcode.value == value:
-                return opcode
+        Opcode(1) fails since the enum expects a tuple, so values are
+        looked up in DECODE_TABLE instead.
 
-        raise InvalidOpcodeError(value) from None
+        Raises:
+        - InvalidOpcodeError
+        """
+        return decode(value)
 
     def __init__(
         self,
@@ -68,6 +69,7 @@ class Opcode(Enum):
         self.description = description
         self.operand_name = operand_name
         self.has_operand = operand_name is not None
+        self.length = 2 if self.has_operand else 1
 
     def __str__(self) -> str:
         if self.has_operand:
@@ -78,3 +80,29 @@ class Opcode(Enum):
         if isinstance(other, int):
             return self.value == other
         return super().__eq__(other)
+
+
+ILLEGAL = None
+
+# Opcodes indexed by value, unassigned values hold ILLEGAL.
+DECODE_TABLE: tuple[Opcode | None, ...] = tuple(
+    {opcode.value: opcode for opcode in Opcode}.get(value, ILLEGAL)
+    for value in range(max(opcode.value for opcode in Opcode) + 1)
+)
+
+
+def decode(value: int) -> Opcode:
+    """Return the Opcode with the given value from DECODE_TABLE.
+
+    Prefer this to Opcode.by_value in hot paths, attribute lookups on
+    the Opcode enum class are expensive.
+
+    Raises:
+    - InvalidOpcodeError
+    """
+    if 0 <= value < len(DECODE_TABLE):
+        opcode = DECODE_TABLE[value]
+        if opcode is not ILLEGAL:
+            return opcode
+
+    raise InvalidOpcodeError(value)
@@ -0,0 +1,264 @@
+"""Copy-on-write Paged Memory
+
+PagedMemory splits its words into fixed size pages which are shared
+between a memory and the memories forked from it. A shared page is
+copied the first time one of its sharers writes to it, so forking a
+memory costs a list of page references and a program that only
+touches its stack and a little data only ever owns a few pages.
+"""
+
+from __future__ import annotations
+
+from array import array
+
+from loguru import logger
+
+from .constants import NWORDS
+from .exceptions import MemoryRangeError
+from .memory import Memory
+
+PAGE_SHIFT: int = 6
+PAGE_SIZE: int = 1 << PAGE_SHIFT
+PAGE_MASK: int = PAGE_SIZE - 1
+
+
+class Page:
+    """PAGE_SIZE words shared by refs page table entries."""
+
+    __slots__ = ("words", "refs")
+
+    def __init__(self, words: array, refs: int = 1) -> None:
+        self.words = words
+        self.refs = refs
+
+
+class PagedWords:
+    """The words of a PagedMemory, indexed like an array.
+
+    Stores through PagedWords copy shared pages like `PagedMemory.write`
+    but do not notify watchers.
+    """
+
+    def __init__(self, memory: PagedMemory) -> None:
+        self.memory = memory
+
+    def __len__(self) -> int:
+        return self.memory.nwords
+
+    def __iter__(self):
+        return iter(self.flatten())
+
+    def __eq__(self, other) -> bool:
+        return self.flatten() == other
+
+    def __getitem__(self, index: int | slice) -> int | array:
+        if isinstance(index, slice):
+            return self.flatten()[index]
+        address = self.address(index)
+        return self.memory.pages[address >> PAGE_SHIFT].words[address & PAGE_MASK]
+
+    def __setitem__(self, index: int | slice, value) -> None:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.memory.nwords)
+            if step == 1 and len(value) == stop - start:
+                self.memory.store_block(start, value)
+                return
+            words = self.flatten()
+            words[index] = value
+            self.memory.paginate(words)
+            return
+        self.memory.store(self.address(index), value)
+
+    def address(self, index: int) -> int:
+        """Index as a non-negative address.
+
+        Raises:
+        - IndexError
+        """
+        nwords = self.memory.nwords
+        if index < 0:
+            index += nwords
+        if not 0 <= index < nwords:
+            raise IndexError("array index out of range")
+        return index
+
+    def flatten(self) -> array:
+        """A copy of all the words in a single array."""
+        words = array("i")
+        for page in self.memory.pages:
+            words.extend(page.words)
+        del words[self.memory.nwords :]
+        return words
+
+    def tobytes(self) -> bytes:
+        return self.flatten().tobytes()
+
+
+class PagedMemory(Memory):
+    def __init__(
+        self, nwords: int = NWORDS, initializer: list[int] = None, backend: str = None
+    ) -> None:
+        """Paged memory of nwords integers, optionally initialized from initializer.
+
+        Pages are always arrays, backend is accepted for compatibility
+        with Memory and must be None.
+
+        Raises:
+        - ValueError
+        """
+        if backend is not None:
+            raise ValueError(f"{self.__class__.__name__} does not take a backend")
+        super().__init__(nwords, initializer)
+        self.pages: list[Page] = []
+        if self.initializer:
+            self.paginate(array("i", self.initializer))
+        else:
+            self.paginate(None)
+
+    def __del__(self) -> None:
+        self.release()
+
+    @property
+    def words(self) -> PagedWords:
+        """The words of this memory indexed like an array."""
+        return PagedWords(self)
+
+    @property
+    def npages(self) -> int:
+        """The number of pages needed to hold nwords."""
+        return (self.nwords + PAGE_MASK) >> PAGE_SHIFT
+
+    @property
+    def shared(self) -> int:
+        """The number of pages this memory shares with another."""
+        return sum(page.refs > 1 for page in self.pages)
+
+    def paginate(self, words: array | None) -> None:
+        """Replace all pages with the contents of words, or zeros if None."""
+        self.release()
+        if words is None:
+            zero = Page(array("i", [0] * PAGE_SIZE), self.npages)
+            self.pages = [zero] * self.npages
+            return
+        words.extend([0] * (self.npages * PAGE_SIZE - len(words)))
+        self.pages = [
+            Page(words[base : base + PAGE_SIZE])
+            for base in range(0, len(words), PAGE_SIZE)
+        ]
+
+    def release(self) -> None:
+        """Drop this memory's references to its pages."""
+        for page in getattr(self, "pages", ()):
+            page.refs -= 1
+        self.pages = []
+
+    def fork(self) -> PagedMemory:
+        """A new memory sharing every page with this one.
+
+        The new memory has no watchers and nothing marked.
+        """
+        child = self.__class__.__new__(self.__class__)
+        Memory.__init__(child, self.nwords)
+        child.pages = list(self.pages)
+        for page in child.pages:
+            page.refs += 1
+        return child
+
+    def own(self, index: int) -> Page:
+        """The page at index, copied first if it is shared."""
+        page = self.pages[index]
+        if page.refs > 1:
+            page.refs -= 1
+            page = self.pages[index] = Page(array("i", page.words))
+        return page
+
+    def store(self, address: int, value: int) -> None:
+        """Store value at address, copying the page first if it is shared."""
+        self.own(address >> PAGE_SHIFT).words[address & PAGE_MASK] = value
+
+    def store_block(self, address: int, data: array) -> None:
+        """Store data starting at address, copying only the pages it covers."""
+        if not isinstance(data, array):
+            data = array("i", data)
+        offset = 0
+        while offset < len(data):
+            start = (address + offset) & PAGE_MASK
+            count = min(PAGE_SIZE - start, len(data) - offset)
+            page = self.own((address + offset) >> PAGE_SHIFT)
+            page.words[start : start + count] = data[offset : offset + count]
+            offset += count
+
+    def view(self, address: int, nwords: int) -> memoryview:
+        """A memoryview of the nwords starting at address, without copying.
+
+        The words must lie in a single page, which is copied first if it
+        is shared so stores through the view stay private to this memory.
+        Stores through the view bypass the watchers, see `watch`.
+
+        Raises:
+        - MemoryRangeError
+        - TypeError if the words span more than one page.
+        """
+        self.check_block(address, nwords)
+        start = address & PAGE_MASK
+        if start + nwords > PAGE_SIZE:
+            last = address + nwords - 1
+            raise TypeError(f"{address}..{last} spans more than one page")
+        page = self.own(address >> PAGE_SHIFT)
+        return memoryview(page.words)[start : start + nwords]
+
+    def read_block(self, address: int, nwords: int) -> array:
+        """A copy of the nwords starting at address, read from the pages they cover.
+
+        Raises:
+        - MemoryRangeError
+        """
+        self.check_block(address, nwords)
+        block = array("i")
+        end = address + nwords
+        while address < end:
+            start = address & PAGE_MASK
+            count = min(PAGE_SIZE - start, end - address)
+            block.extend(self.pages[address >> PAGE_SHIFT].words[start : start + count])
+            address += count
+        return block
+
+    def write_block(self, address: int, data: array | list[int]) -> None:
+        """Write the words in data to memory starting at address.
+
+        Raises:
+        - MemoryRangeError
+        """
+        self.check_block(address, len(data))
+        self.store_block(address, data)
+        self.invalidate_block(address, len(data))
+
+    def read(self, address: int) -> int:
+        """Read an integer at the given address and return it to the caller.
+
+        Raises:
+        - MemoryRangeError
+        """
+        if address not in self.bounds:
+            outofbounds = MemoryRangeError(f"{address} not in {self.bounds}")
+            logger.error(str(outofbounds))
+            raise outofbounds
+
+        return self.pages[address >> PAGE_SHIFT].words[address & PAGE_MASK]
+
+    def write(self, address: int, value: int) -> None:
+        """Write an integer value to the given address.
+
+        Raises:
+        - MemoryRangeError
+        """
+        if address not in self.bounds:
+            outofbounds = MemoryRangeError(f"{address} not in {self.bounds}")
+            logger.error(str(outofbounds))
+            raise outofbounds
+
+        self.store(address, value)
+
+        if self.watched[address]:
+            self.invalidate(address)
+
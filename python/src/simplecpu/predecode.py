@@ -0,0 +1,162 @@
+"""Predecoded Instruction Cache
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Callable, NamedTuple
+
+from .fusion import FUSIONS, LEADERS, MAX_SPAN
+from .opcode import Opcode, decode
+
+if TYPE_CHECKING:
+    from .cpu import CPU
+
+
+class Predecoded(NamedTuple):
+    """An instruction decoded once and ready to execute.
+
+    is_cti is True if the handler sets PC itself, for END it leaves PC
+    on the END. If the instruction starts a fused pair, fused is an
+    entry for the pair whose handler runs both, see `fusion`.
+    """
+
+    opcode: Opcode
+    handler: Callable[[], None]
+    operand: int | None
+    length: int
+    is_cti: bool
+    fused: Predecoded | None = None
+
+
+class Predecoder:
+    """A cache of decoded instructions indexed by address.
+
+    Entries are built the first time an address is fetched and are
+    dropped when the memory they were decoded from is written, so
+    self-modifying programs see their changes.
+    """
+
+    def __init__(self, cpu: CPU, fusion: bool = True) -> None:
+        """Cache instructions for cpu, fusing common pairs if fusion is True."""
+        self.cpu = cpu
+        self.fusion = fusion
+        self.entries: list[Predecoded | None] = [None] * cpu.memory.nwords
+        cpu.memory.watch(self.invalidate)
+
+    def fetch(self, address: int, fuse: bool = False) -> Predecoded:
+        """Return the decoded instruction at address.
+
+        If fuse is True and the instruction is not cached, a pair it
+        starts is fused, see `decode`.
+
+        Raises:
+        - InvalidOpcodeError
+        - MemoryRangeError
+        - SegmentationFault
+        """
+        if 0 <= address < len(self.entries):
+            entry = self.entries[address]
+            if entry is not None and address + entry.length <= self.cpu.fetch_stop:
+                return entry
+        return self.decode(address, fuse)
+
+    def decode(self, address: int, fuse: bool = False) -> Predecoded:
+        """Decode the instruction at address and cache it.
+
+        The instruction and operand are fetched with CPU._load so faults
+        are identical to an uncached fetch. Instructions whose constant
+        address is in user_space dispatch to `CPU.verified` microcode.
+
+        Fusing reads the following instruction, so only `CPU.execute` asks
+        for it and single steps fetch no more than they execute.
+
+        Raises:
+        - InvalidOpcodeError
+        - MemoryRangeError
+        - SegmentationFault
+        """
+        cpu = self.cpu
+        # IR holds the word fetched even if decoding it or loading its
+        # operand faults, as it did before instructions were predecoded.
+        cpu.ir = cpu._load(address)
+        opcode = decode(cpu.ir)
+
+        handler = cpu.dispatch[opcode.value]
+        operand = None
+        if opcode.has_operand:
+            operand = cpu._load(address + 1)
+            if operand in cpu.user_space:
+                handler = cpu.verified.get(opcode.value, handler)
+
+        entry = Predecoded(
+            opcode,
+            handler,
+            operand,
+            opcode.length,
+            opcode.is_cti or opcode is Opcode.END,
+        )
+
+        span = entry.length
+        if fuse and self.fusion and opcode.value in LEADERS:
+            fused = self.fuse(address, entry)
+            if fused is not None:
+                entry = entry._replace(fused=fused)
+                span = fused.length
+
+        self.entries[address] = entry
+        for offset in range(span):
+            cpu.memory.mark(address + offset)
+
+        return entry
+
+    def fuse(self, address: int, first: Predecoded) -> Predecoded | None:
+        """An entry running first and the instruction after it as one, if they fuse.
+
+        Pairs are only fused if both instructions can be fetched in the
+        current mode and neither's microcode was replaced.
+        """
+        cpu = self.cpu
+        npc = address + first.length
+        if npc >= cpu.fetch_stop:
+            return None
+
+        value = cpu.memory.read(npc)
+        factory = FUSIONS.get((first.opcode.value, value))
+        if factory is None or first.opcode.value not in cpu.stock:
+            return None
+        if value not in cpu.stock:
+            return None
+
+        opcode = decode(value)
+        operand = None
+        if opcode.has_operand:
+            if npc + 1 >= cpu.fetch_stop:
+                return None
+            operand = cpu.memory.read(npc + 1)
+
+        second = Predecoded(
+            opcode, cpu.dispatch[value], operand, opcode.length, opcode.is_cti
+        )
+        return Predecoded(
+            opcode,
+            factory(cpu, first, second, npc),
+            operand,
+            first.length + second.length,
+            opcode.is_cti,
+        )
+
+    def invalidate(self, address: int) -> None:
+        """Drop any entries decoded from address, including fused pairs."""
+        entries = self.entries
+        entries[address] = None
+        for start in range(max(0, address - MAX_SPAN + 1), address):
+            entry = entries[start]
+            if entry is None:
+                continue
+            span = entry.length if entry.fused is None else entry.fused.length
+            if start + span > address:
+                entries[start] = None
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        self.entries = [None] * len(self.entries)
@@ -0,0 +1,354 @@
+"""Remote Memory
+
+A message based Memory for the separate process design in the project
+description. The memory server owns a Memory and answers batches of
+requests sent over a pipe or a Unix socket, RemoteMemory is the client
+side and can be handed to `CPU(memory=...)` in place of a Memory.
+
+Each message is a list of requests:
+
+- ("read", address, count) replies with up to count words from address
+- ("write", address, value) stores value, no reply
+- ("block", address, words) stores an array of words, no reply
+- ("image",) replies with the bytes of the whole image
+- ("info",) replies with the number of words
+
+The server replies with a list of the results of the requests that
+have one, a batch of writes gets no reply. ("close",) on its own
+stops the server. A request that fails is skipped and the exception
+is sent instead of the next reply, the client raises it.
+
+RemoteMemory checks bounds and values itself so the server never
+faults, caches the words it has read, reads prefetch words past the
+requested address on a miss and combines writes until a read misses or
+combine writes are pending. With a prefetch of at least one the opcode
+and operand of an instruction arrive in a single round trip.
+
+Only the client may write the image while it is connected, there is
+no cache coherence between clients.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+from array import array
+from dataclasses import dataclass
+from multiprocessing.connection import Client, Connection, Listener
+from multiprocessing.synchronize import Event
+
+from loguru import logger
+
+from .exceptions import MemoryRangeError
+from .memory import Memory
+
+
+@dataclass
+class RemoteStats:
+    round_trips: int = 0
+    messages: int = 0
+    reads: int = 0
+    writes: int = 0
+    hits: int = 0
+
+
+def serve(memory: Memory, connection: Connection) -> None:
+    """Answer requests for memory arriving on connection until closed."""
+
+    words = memory.words
+    nwords = memory.nwords
+    error = None
+
+    while True:
+        try:
+            batch = connection.recv()
+        except EOFError:
+            break
+
+        if batch[0][0] == "close":
+            break
+
+        replies = []
+        for request in batch:
+            try:
+                match request:
+                    case ("write", address, value):
+                        memory.write(address, value)
+                    case ("block", address, data):
+                        memory.write_block(address, data)
+                    case ("read", address, count):
+                        replies.append(words[address : min(address + count, nwords)])
+                    case ("image",):
+                        replies.append(words.tobytes())
+                    case ("info",):
+                        replies.append(nwords)
+                    case _:
+                        logger.error(f"unknown memory request {request!r}")
+            except Exception as exception:
+                logger.error(f"memory request {request!r} failed: {exception}")
+                error = error or exception
+        if replies:
+            connection.send(error or replies)
+            error = None
+
+    connection.close()
+
+
+def serve_unix(memory: Memory, address: str, ready: Event = None) -> None:
+    """Serve memory to a single client connecting to the Unix socket address.
+
+    The optional ready event is set once clients can connect.
+    """
+    with Listener(address, family="AF_UNIX") as listener:
+        if ready is not None:
+            ready.set()
+        with listener.accept() as connection:
+            serve(memory, connection)
+
+
+class RemoteWords:
+    """The words of a RemoteMemory, indexed like an array.
+
+    Single words go through the cache and write combining like `read`
+    and `write`, slices copy the whole image. Stores through RemoteWords
+    do not notify watchers.
+    """
+
+    def __init__(self, memory: RemoteMemory) -> None:
+        self.memory = memory
+
+    def __len__(self) -> int:
+        return self.memory.nwords
+
+    def __iter__(self):
+        return iter(self.memory.image())
+
+    def __eq__(self, other) -> bool:
+        return self.memory.image() == other
+
+    def __getitem__(self, index: int | slice) -> int | array:
+        if isinstance(index, slice):
+            return self.memory.image()[index]
+        return self.memory.fetch(self.address(index))
+
+    def __setitem__(self, index: int | slice, value) -> None:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.memory.nwords)
+            if step == 1 and len(value) == stop - start:
+                self.memory.store_block(start, array("i", value))
+                return
+            words = self.memory.image()
+            words[index] = value
+            self.memory.store_block(0, words)
+            return
+        self.memory.store(self.address(index), value)
+
+    def address(self, index: int) -> int:
+        """Index as a non-negative address.
+
+        Raises:
+        - IndexError
+        """
+        nwords = self.memory.nwords
+        if index < 0:
+            index += nwords
+        if not 0 <= index < nwords:
+            raise IndexError("array index out of range")
+        return index
+
+    def tobytes(self) -> bytes:
+        return self.memory.image().tobytes()
+
+
+class RemoteMemory(Memory):
+    @classmethod
+    def spawn(cls, memory: Memory, **kwds) -> RemoteMemory:
+        """Start a server process for memory and return a client connected to it."""
+        connection, server_connection = multiprocessing.Pipe()
+        server = multiprocessing.Process(
+            target=serve, args=(memory, server_connection), daemon=True
+        )
+        server.start()
+        server_connection.close()
+        remote = cls(connection, **kwds)
+        remote.server = server
+        return remote
+
+    @classmethod
+    def connect(cls, address: str, **kwds) -> RemoteMemory:
+        """Return a client for the server listening on the Unix socket address."""
+        return cls(Client(address, family="AF_UNIX"), **kwds)
+
+    def __init__(
+        self,
+        connection: Connection,
+        prefetch: int = 15,
+        combine: int = 64,
+        cache: bool = True,
+    ) -> None:
+        """A Memory held by the server at the other end of connection.
+
+        A read that misses the cache fetches prefetch more words after
+        the address. Up to combine writes are held before being sent.
+        Setting prefetch and combine to zero and cache to False sends
+        one message per access.
+        """
+        self.connection = connection
+        self.prefetch = prefetch
+        self.combine = combine
+        self.cache: dict[int, int] | None = {} if cache else None
+        self.pending: list[tuple] = []
+        self.stats = RemoteStats()
+        self.server = None
+
+        super().__init__(self.request([("info",)])[0])
+
+    def __len__(self) -> int:
+        return self.nwords
+
+    @property
+    def words(self) -> RemoteWords:
+        """The words held by the server, indexed like an array."""
+        return RemoteWords(self)
+
+    def image(self) -> array:
+        """A copy of the words held by the server."""
+        words = array("i")
+        words.frombytes(self.request([("image",)])[0])
+        return words
+
+    def request(self, batch: list[tuple]) -> list:
+        """Send pending writes followed by batch and return the replies.
+
+        Raises:
+        - Exception raised by the server for any request since the last reply.
+        """
+        self.stats.round_trips += 1
+        self.stats.messages += 1
+        self.connection.send(self.pending + batch)
+        self.pending = []
+        replies = self.connection.recv()
+        if isinstance(replies, Exception):
+            raise replies
+        return replies
+
+    def flush(self) -> None:
+        """Send any pending writes."""
+        if self.pending:
+            self.stats.messages += 1
+            self.connection.send(self.pending)
+            self.pending = []
+
+    def close(self) -> None:
+        """Flush pending writes, stop the server and close the connection."""
+        self.flush()
+        self.connection.send([("close",)])
+        self.connection.close()
+        if self.server:
+            self.server.join()
+
+    def read(self, address: int) -> int:
+        """Read an integer at the given address and return it to the caller.
+
+        Raises:
+        - MemoryRangeError
+        """
+        if address not in self.bounds:
+            outofbounds = MemoryRangeError(f"{address} not in {self.bounds}")
+            logger.error(str(outofbounds))
+            raise outofbounds
+
+        return self.fetch(address)
+
+    def fetch(self, address: int) -> int:
+        """The word at address, from the cache or the server."""
+        self.stats.reads += 1
+
+        cache = self.cache
+        if cache is not None:
+            try:
+                value = cache[address]
+                self.stats.hits += 1
+                return value
+            except KeyError:
+                pass
+
+        values = self.request([("read", address, self.prefetch + 1)])[0]
+
+        if cache is not None:
+            for offset, word in enumerate(values):
+                cache[address + offset] = word
+
+        return values[0]
+
+    def store(self, address: int, value: int) -> None:
+        """Store value at address, without checking bounds or notifying watchers.
+
+        Raises:
+        - OverflowError if value does not fit in a word, like Memory.
+        """
+        array("i", [value])
+        self.stats.writes += 1
+
+        if self.cache is not None:
+            self.cache[address] = value
+
+        self.pending.append(("write", address, value))
+        if len(self.pending) > self.combine:
+            self.flush()
+
+    def store_block(self, address: int, data: array) -> None:
+        """Store data at address, without checking bounds or notifying watchers."""
+        if self.cache is not None:
+            for offset, word in enumerate(data):
+                self.cache[address + offset] = word
+        self.pending.append(("block", address, data))
+        self.flush()
+
+    def view(self, address: int, nwords: int) -> memoryview:
+        """Not supported, the words are held by the server.
+
+        Raises:
+        - TypeError
+        """
+        raise TypeError(f"{self.__class__.__name__} has no local buffer")
+
+    def read_block(self, address: int, nwords: int) -> array:
+        """A copy of the nwords starting at address.
+
+        Raises:
+        - MemoryRangeError
+        """
+        self.check_block(address, nwords)
+        block = self.request([("read", address, nwords)])[0]
+        if self.cache is not None:
+            for offset, word in enumerate(block):
+                self.cache[address + offset] = word
+        return block
+
+    def write_block(self, address: int, data: array | list[int]) -> None:
+        """Write the words in data to memory starting at address.
+
+        Raises:
+        - MemoryRangeError
+        """
+        self.check_block(address, len(data))
+        if not isinstance(data, array):
+            data = array("i", data)
+        self.store_block(address, data)
+        self.invalidate_block(address, len(data))
+
+    def write(self, address: int, value: int) -> None:
+        """Write an integer value to the given address.
+
+        Raises:
+        - MemoryRangeError
+        """
+        if address not in self.bounds:
+            outofbounds = MemoryRangeError(f"{address} not in {self.bounds}")
+            logger.error(str(outofbounds))
+            raise outofbounds
+
+        self.store(address, value)
+
+        if self.watched[address]:
+            self.invalidate(address)
@@ -0,0 +1,71 @@
+"""Cycle Event Scheduler
+"""
+
+from __future__ import annotations
+
+from typing import Callable, NamedTuple
+
+
+class Event(NamedTuple):
+    """An action taken before the instruction at a given cycle count.
+
+    Periodic events fire every period cycles, never at cycle zero.
+    Other events fire once when the cycle count reaches deadline.
+    """
+
+    name: str
+    action: Callable[[], None]
+    period: int = 0
+    deadline: int = 0
+
+    def due(self, cycles: int) -> bool:
+        """True if the event fires before the instruction at cycles."""
+        if self.period:
+            return bool(cycles) and not cycles % self.period
+        return cycles >= self.deadline
+
+    def countdown(self, cycles: int) -> int:
+        """Cycles that retire before the event is next due."""
+        if self.period:
+            return self.period - cycles % self.period
+        return max(self.deadline - cycles, 1)
+
+
+class Scheduler:
+    """Events scheduled by cycle count.
+
+    Engines `poll` before an instruction and may then retire `countdown`
+    instructions without checking for events again.
+    """
+
+    def __init__(self) -> None:
+        self.events: dict[str, Event] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self.events)
+
+    def schedule(self, event: Event) -> None:
+        """Add event, replacing any event with the same name."""
+        self.events[event.name] = event
+
+    def cancel(self, name: str) -> None:
+        """Remove the event named name if it is scheduled."""
+        self.events.pop(name, None)
+
+    def poll(self, cycles: int) -> None:
+        """Fire the events due before the instruction at cycles.
+
+        Events fire in the order they were scheduled, one-shot events are
+        removed once fired.
+        """
+        for event in list(self.events.values()):
+            if event.due(cycles):
+                if not event.period:
+                    self.cancel(event.name)
+                event.action()
+
+    def countdown(self, cycles: int) -> int | None:
+        """Cycles until the next event is due, None if nothing is scheduled."""
+        if not self.events:
+            return None
+        return min(event.countdown(cycles) for event in self.events.values())
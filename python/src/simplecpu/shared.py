@@ -0,0 +1,108 @@
+"""Shared Memory
+
+The project description has the CPU and Memory running as separate
+processes. SharedMemory keeps its words in a multiprocessing shared
+memory block so a memory server process can own the image while a CPU
+in another process reads and writes it directly, without pickling or
+pipes.
+
+Decode caches are per process, only the process running the CPU should
+write the image while it runs.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+from array import array
+from multiprocessing import resource_tracker
+from multiprocessing.connection import Connection
+
+from loguru import logger
+
+from .backends import SharedBackend
+from .constants import NWORDS
+from .cpu import CPU, RunResult
+from .memory import Memory
+
+
+class SharedMemory(Memory):
+    default_backend: str = SharedBackend.name
+
+    @classmethod
+    def attach(cls, name: str, nwords: int = NWORDS) -> SharedMemory:
+        """Return a SharedMemory using the existing shared block called name."""
+        return cls(nwords, name=name)
+
+    def __init__(
+        self, nwords: int = NWORDS, initializer: list[int] = None, name: str = None
+    ) -> None:
+        """Create a shared block for nwords, or attach to the block called name."""
+        super().__init__(nwords, initializer, SharedBackend(nwords, block=name))
+
+    @property
+    def name(self) -> str:
+        """The name other processes use to attach to this memory."""
+        return self.backend.block
+
+    @property
+    def owner(self) -> bool:
+        """True if this memory created the shared block and destroys it on close."""
+        return self.backend.owner
+
+
+def memory_server(image: bytes, nwords: int, connection: Connection) -> None:
+    """Own a shared memory image until the CPU is done with it.
+
+    Sends the name of the shared block, then waits for the CPU to send
+    anything back before destroying the block.
+    """
+    initializer = array("i")
+    initializer.frombytes(image)
+    memory = SharedMemory(nwords, initializer=initializer)
+    logger.debug(f"memory server {memory.name} {memory.nwords=}")
+    try:
+        connection.send(memory.name)
+        connection.recv()
+    finally:
+        memory.close()
+
+
+def run_shared(
+    memory: Memory, timer_interval: int = 0, max_cycles: int = None
+) -> RunResult:
+    """Run the program in memory with the memory in a separate server process.
+
+    Raises:
+    - EOFError if the server exits before sending the shared block.
+    - InvalidOpcodeError
+    - InvalidOperandError
+    - MachineCheck
+    - MemoryRangeError
+    - SegmentationFault
+    - StackUnderflowError
+    """
+    # Start the resource tracker here so the server shares it.
+    resource_tracker.ensure_running()
+
+    connection, server_connection = multiprocessing.Pipe()
+    server = multiprocessing.Process(
+        target=memory_server,
+        args=(memory.words.tobytes(), memory.nwords, server_connection),
+    )
+    server.start()
+    # Only the server holds its end, so recv sees EOF if the server dies.
+    server_connection.close()
+    try:
+        shared = SharedMemory.attach(connection.recv(), memory.nwords)
+        try:
+            cpu = CPU(shared, timer_interval=timer_interval)
+            return cpu.run(max_cycles=max_cycles)
+        finally:
+            shared.close()
+    finally:
+        try:
+            connection.send(None)
+        except OSError:
+            pass
+        connection.close()
+        server.join()
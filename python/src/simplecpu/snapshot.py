@@ -0,0 +1,118 @@
+"""CPU Snapshots
+
+A Snapshot holds the registers, timer state and a copy of the memory
+image of a CPU so it can be restored later, eg. to warm start many
+runs from the state after a shared initialization prefix.
+
+The binary form is laid out like a memory image file: a four byte
+SNAPSHOT_MAGIC, the registers as 64-bit integers and then the words
+of memory exactly as `Memory.__bytes__` writes them after MAGIC.
+"""
+
+from __future__ import annotations
+
+from array import array
+from pathlib import Path
+from typing import NamedTuple
+
+from .constants import SNAPSHOT_MAGIC, Mode
+from .exceptions import ObjectFormatError
+
+OPERAND: int = 1 << 0
+INTERRUPTS_ENABLED: int = 1 << 1
+
+NREGISTERS: int = 11
+REGISTER_SIZE: int = array("q").itemsize
+
+
+class Snapshot(NamedTuple):
+    pc: int
+    sp: int
+    ir: int
+    ac: int
+    x: int
+    y: int
+    mode: Mode
+    interrupts_enabled: bool
+    cycles: int
+    operand: int | None
+    timer_interval: int
+    words: array
+
+    @classmethod
+    def from_file(cls, path: str | Path) -> Snapshot:
+        """Read a snapshot saved with `save`.
+
+        Raises:
+        - ObjectFormatError
+        """
+        return cls.from_bytes(Path(path).read_bytes())
+
+    @classmethod
+    def from_bytes(cls, buffer: bytes) -> Snapshot:
+        """Decode the binary form of a snapshot.
+
+        Raises:
+        - ObjectFormatError
+        """
+        magic = int.from_bytes(buffer[:4])
+        if magic != SNAPSHOT_MAGIC:
+            raise ObjectFormatError(f"Bad magic: {magic} != {SNAPSHOT_MAGIC}")
+
+        end = 4 + NREGISTERS * REGISTER_SIZE
+        registers = array("q")
+        words = array("i")
+        try:
+            registers.frombytes(buffer[4:end])
+            words.frombytes(buffer[end:])
+        except ValueError as error:
+            raise ObjectFormatError(f"Truncated snapshot: {error}") from None
+
+        if len(registers) != NREGISTERS or not words:
+            raise ObjectFormatError(f"Truncated snapshot: {len(buffer)} bytes")
+
+        pc, sp, ir, ac, x, y, mode, flags, cycles, operand, interval = registers
+
+        return cls(
+            pc,
+            sp,
+            ir,
+            ac,
+            x,
+            y,
+            Mode(mode),
+            bool(flags & INTERRUPTS_ENABLED),
+            cycles,
+            operand if flags & OPERAND else None,
+            interval,
+            words,
+        )
+
+    def __bytes__(self) -> bytes:
+        """SNAPSHOT_MAGIC followed by the registers and the memory image."""
+        flags = (OPERAND if self.operand is not None else 0) | (
+            INTERRUPTS_ENABLED if self.interrupts_enabled else 0
+        )
+        registers = array(
+            "q",
+            [
+                self.pc,
+                self.sp,
+                self.ir,
+                self.ac,
+                self.x,
+                self.y,
+                self.mode.value,
+                flags,
+                self.cycles,
+                self.operand or 0,
+                self.timer_interval,
+            ],
+        )
+        return (
+            SNAPSHOT_MAGIC.to_bytes(4) + registers.tobytes() + self.words.tobytes()
+        )
+
+    def save(self, path: str | Path) -> None:
+        """Save the binary form of this snapshot to path."""
+        Path(path).write_bytes(bytes(self))
@@ -0,0 +1,140 @@
+"""Tiered Execution
+
+Programs start in the `CPU.step` interpreter, which counts how often
+each backward JUMP, JUMPEQ or JUMPNE is taken to its target. When a
+target has been reached threshold times the loop it heads, from the
+target to the branch closing it, is promoted to the block tier and runs
+as translated blocks, see `translate`.
+
+Short programs never pay for translation, long running loops are
+translated once they prove hot. Writing to the code of a promoted loop
+demotes it back to the interpreter and restarts its count.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import NamedTuple
+
+from .constants import HaltReason, Mode
+from .cpu import CPU, RunResult
+from .opcode import Opcode
+from .translate import BlockEngine
+
+HOT_THRESHOLD: int = 50
+
+BACK_EDGES: tuple[Opcode, ...] = (Opcode.JUMP, Opcode.JUMPEQ, Opcode.JUMPNE)
+
+
+class TierEvent(NamedTuple):
+    """A loop promoted to the block tier or demoted back to the interpreter."""
+
+    kind: str
+    region: range
+    mode: Mode
+    cycles: int
+
+
+@dataclass
+class TierStats:
+    interpreted: int = 0
+    translated: int = 0
+    promotions: int = 0
+    demotions: int = 0
+    events: list[TierEvent] = field(default_factory=list)
+
+
+class TieredEngine(BlockEngine):
+    """Interpret a program and translate its hot loops.
+
+    The back edge counters are kept in `counters` indexed by target
+    address and mode, tier changes are recorded in `stats`.
+    """
+
+    def __init__(self, cpu: CPU, threshold: int = HOT_THRESHOLD) -> None:
+        super().__init__(cpu)
+        self.threshold = threshold
+        self.counters: dict[tuple[int, Mode], int] = {}
+        self.regions: dict[tuple[int, Mode], range] = {}
+        self.hot: dict[Mode, bytearray] = {
+            mode: bytearray(cpu.memory.nwords) for mode in Mode
+        }
+        self.stats = TierStats()
+
+    def promote(self, address: int, mode: Mode, end: int) -> None:
+        """Run the loop from address up to end in mode as translated blocks."""
+        region = range(address, end)
+        self.regions[address, mode] = region
+        self.hot[mode][address:end] = b"\x01" * len(region)
+        self.stats.promotions += 1
+        self.stats.events.append(
+            TierEvent("promote", region, mode, self.cpu.cycles)
+        )
+
+    def demote(self, address: int, mode: Mode) -> None:
+        """Return the loop at address in mode to the interpreter."""
+        region = self.regions.pop((address, mode))
+        self.counters.pop((address, mode), None)
+        hot = self.hot[mode]
+        hot[region.start : region.stop] = bytes(len(region))
+        for (_, other), remaining in self.regions.items():
+            if other is mode:
+                hot[remaining.start : remaining.stop] = b"\x01" * len(remaining)
+        self.stats.demotions += 1
+        self.stats.events.append(TierEvent("demote", region, mode, self.cpu.cycles))
+
+    def invalidate(self, address: int) -> None:
+        """Drop all blocks translated from address and demote loops containing it."""
+        super().invalidate(address)
+        for key, region in list(self.regions.items()):
+            if address in region:
+                self.demote(*key)
+
+    def _execute(self, max_cycles: int = None) -> RunResult:
+        cpu = self.cpu
+        scheduler = cpu.scheduler
+        stats = self.stats
+        hot = self.hot
+        nwords = cpu.memory.nwords
+        stop = None if max_cycles is None else cpu.cycles + max_cycles
+        cpu.halted = False
+
+        while cpu.cycles != stop:
+            pc = cpu.pc
+            mode = cpu.mode
+
+            if 0 <= pc < nwords and hot[mode][pc]:
+                # Events are polled once per instruction, step polls for
+                # itself so only the block tier polls here.
+                scheduler.poll(cpu.cycles)
+
+                budget = scheduler.countdown(cpu.cycles)
+                if stop is not None and (budget is None or stop - cpu.cycles < budget):
+                    budget = stop - cpu.cycles
+
+                cycles = cpu.cycles
+                halted = self.lookup(cpu.pc, cpu.mode, budget).function(cpu)
+                stats.translated += cpu.cycles - cycles
+                if halted:
+                    return RunResult(HaltReason.END, cpu.cycles, cpu.pc)
+                continue
+
+            instruction = cpu._step()
+            stats.interpreted += 1
+            if cpu.halted:
+                cpu.halted = False
+                return RunResult(HaltReason.END, cpu.cycles, cpu.pc)
+
+            target = instruction.operand
+            if (
+                instruction.opcode in BACK_EDGES
+                and cpu.pc == target
+                and target <= instruction.address
+            ):
+                key = (target, cpu.mode)
+                count = self.counters.get(key, 0) + 1
+                self.counters[key] = count
+                if count >= self.threshold and key not in self.regions:
+                    self.promote(target, cpu.mode, instruction.address + 2)
+
+        return RunResult(HaltReason.CYCLES, cpu.cycles, cpu.pc)
@@ -0,0 +1,416 @@
+"""Basic Block Translator
+
+Straight-line runs of instructions ending in a control transfer are
+translated into a single Python function which keeps the AC, X, Y and
+SP registers in locals and writes them back to the CPU when the block
+exits. Faults are raised by the CPU microcode after the registers are
+written back, so a faulting block leaves the CPU in the same state the
+`CPU.step` interpreter would.
+
+Constant addresses are checked when the block is translated, a load or
+store of an address the block's mode can access is emitted without a
+run time check.
+"""
+
+from __future__ import annotations
+
+import random
+from typing import Callable, NamedTuple
+
+from loguru import logger
+
+from . import exceptions
+from .constants import HaltReason, Mode, StackBase
+from .cpu import CPU, RunResult
+from .exceptions import *
+from .opcode import Opcode, decode
+
+MAX_BLOCK_INSTRUCTIONS: int = 256
+
+
+class Block(NamedTuple):
+    """A translated basic block."""
+
+    address: int
+    mode: Mode
+    count: int
+    length: int
+    function: Callable[[CPU], bool]
+    source: str
+
+
+def _sync(cpu, ac, x, y, sp, pc, cycles, ir, operand) -> None:
+    """Write block locals back to the CPU."""
+    cpu.ac = ac
+    cpu.x = x
+    cpu.y = y
+    cpu.sp = sp
+    cpu.pc = pc
+    cpu.cycles = cycles
+    cpu.ir = ir
+    cpu.operand = operand
+
+
+class BlockTranslator:
+    """Translates the basic block at an address into a Python function."""
+
+    def __init__(self, cpu: CPU) -> None:
+        self.cpu = cpu
+        memory = cpu.memory
+        self.namespace = {
+            "_sync": _sync,
+            "invalidate": memory.invalidate,
+            "marks": memory.watched,
+            "randint": random.randint,
+            "words": memory.words,
+        }
+
+    def bounds(self, mode: Mode) -> tuple[int, int]:
+        """The lowest and highest addresses accessible in mode."""
+        hi = self.cpu.memory.nwords - 1
+        if mode is Mode.USER:
+            return self.cpu.user_space.start, min(hi, self.cpu.user_space.stop - 1)
+        return 0, hi
+
+    def decode(self, address: int, mode: Mode, first: bool) -> tuple | None:
+        """Decode the instruction at address for inclusion in a block.
+
+        The first instruction of a block is fetched exactly as the
+        interpreter would, raising any fetch fault. Later instructions
+        that cannot be fetched end the block before them instead, the
+        fault is then raised when execution reaches that address.
+        """
+        if first:
+            entry = self.cpu.predecoder.fetch(address)
+            return entry.opcode, entry.operand
+
+        lo, hi = self.bounds(mode)
+        if not lo <= address <= hi:
+            return None
+        try:
+            opcode = decode(self.cpu.memory.words[address])
+        except InvalidOpcodeError:
+            return None
+        if not opcode.has_operand:
+            return opcode, None
+        if address + 1 > hi:
+            return None
+        return opcode, self.cpu.memory.words[address + 1]
+
+    def translate(self, address: int, mode: Mode, limit: int = None) -> Block:
+        """Translate the block at address for mode.
+
+        The block ends after a control transfer instruction, END or
+        INVALID, before an instruction that cannot be fetched, or after
+        limit instructions.
+
+        Raises:
+        - InvalidOpcodeError
+        - MachineCheck
+        - MemoryRangeError
+        - SegmentationFault
+        """
+        name, source, count, length = self.generate(address, mode, limit)
+
+        namespace = dict(self.namespace)
+        exec(compile(source, f"<{name}>", "exec"), namespace)
+
+        logger.debug(f"translated {name} {count=} words={length}")
+
+        return Block(address, mode, count, length, namespace[name], source)
+
+    def generate(
+        self, address: int, mode: Mode, limit: int = None
+    ) -> tuple[str, str, int, int]:
+        """The name, source, instruction count and length of the block at address.
+
+        The source defines a function called name using the globals in
+        `namespace`, see `translate`.
+
+        Raises:
+        - InvalidOpcodeError
+        - MachineCheck
+        - MemoryRangeError
+        - SegmentationFault
+        """
+        limit = min(limit or MAX_BLOCK_INSTRUCTIONS, MAX_BLOCK_INSTRUCTIONS)
+        lo, hi = self.bounds(mode)
+        base = StackBase.for_mode(mode).value
+
+        name = f"block_{address:08d}_{mode.name.lower()}"
+        lines = [
+            f"def {name}(cpu):",
+            "    ac = cpu.ac",
+            "    x = cpu.x",
+            "    y = cpu.y",
+            "    sp = cpu.sp",
+            "    cycles = cpu.cycles",
+        ]
+
+        pc = address
+        count = 0
+        terminated = False
+
+        while count < limit:
+            decoded = self.decode(pc, mode, first=count == 0)
+            if decoded is None:
+                break
+            opcode, operand = decoded
+            npc = pc + opcode.length
+            body = self.emit(opcode, operand, pc, npc, count, lo, hi, base)
+            lines.append(f"    # {pc:08d} {opcode.name} {operand}")
+            lines.extend(f"    {line}" for line in body)
+            pc = npc
+            count += 1
+            if opcode.is_cti or opcode in (Opcode.END, Opcode.INVALID):
+                terminated = True
+                break
+
+        if not terminated:
+            lines.append(
+                f"    _sync(cpu, ac, x, y, sp, {pc}, cycles + {count}, "
+                f"{opcode.value}, {operand})"
+            )
+            lines.append("    return False")
+
+        return name, "\n".join(lines) + "\n", count, pc - address
+
+    def emit(
+        self,
+        opcode: Opcode,
+        operand: int | None,
+        pc: int,
+        npc: int,
+        index: int,
+        lo: int,
+        hi: int,
+        base: int,
+    ) -> list[str]:
+        """Python source lines implementing one instruction."""
+
+        ir = opcode.value
+
+        def sync(pc_expr, retired: int) -> str:
+            return (
+                f"_sync(cpu, ac, x, y, sp, {pc_expr}, cycles + {retired}, "
+                f"{ir}, {operand})"
+            )
+
+        def load(target: str, address: str | int) -> list[str]:
+            if isinstance(address, int) and lo <= address <= hi:
+                return [f"{target} = words[{address}]"]
+            return [
+                f"a = {address}",
+                f"if not {lo} <= a <= {hi}:",
+                f"    {sync(pc, index)}",
+                "    cpu._load(a)",
+                f"{target} = words[a]",
+            ]
+
+        def store(address: str | int, value: str, exit_pc) -> list[str]:
+            check = [
+                f"if not {lo} <= a <= {hi}:",
+                f"    {sync(pc, index)}",
+                f"    cpu._store(a, {value})",
+            ]
+            if isinstance(address, int) and lo <= address <= hi:
+                check = []
+            return [
+                f"a = {address}",
+                *check,
+                f"words[a] = {value}",
+                "if marks[a]:",
+                f"    {sync(exit_pc, index + 1)}",
+                "    invalidate(a)",
+                "    return False",
+            ]
+
+        def pop(target: str) -> list[str]:
+            return [
+                f"if sp >= {base}:",
+                f"    {sync(pc, index)}",
+                "    cpu._pop()",
+                *load(target, "sp"),
+                "sp += 1",
+            ]
+
+        def leave(pc_expr) -> list[str]:
+            return [sync(pc_expr, index + 1), "return False"]
+
+        def handler(name: str) -> list[str]:
+            return [
+                sync(pc, index),
+                f"cpu.{name}()",
+                "cpu.cycles += 1",
+                "return False",
+            ]
+
+        match opcode:
+            case Opcode.INVALID:
+                return [sync(pc, index), "cpu.invalid()", "return False"]
+            case Opcode.LOADV:
+                return [f"ac = {operand}"]
+            case Opcode.LOADA:
+                return load("ac", operand)
+            case Opcode.LOADI:
+                return load("a", operand) + load("ac", "a")
+            case Opcode.LOADX:
+                return load("ac", f"{operand} + x")
+            case Opcode.LOADY:
+                return load("ac", f"{operand} + y")
+            case Opcode.LOADSPX:
+                return load("ac", "sp + x")
+            case Opcode.STORE:
+                return store(operand, "ac", npc)
+            case Opcode.GET:
+                return ["ac = randint(1, 100)"]
+            case Opcode.PUT:
+                return [sync(pc, index), "cpu.put()"]
+            case Opcode.ADDX:
+                return ["ac += x"]
+            case Opcode.ADDY:
+                return ["ac += y"]
+            case Opcode.SUBX:
+                return ["ac -= x"]
+            case Opcode.SUBY:
+                return ["ac -= y"]
+            case Opcode.COPYTOX:
+                return ["x = ac"]
+            case Opcode.COPYFROMX:
+                return ["ac = x"]
+            case Opcode.COPYTOY:
+                return ["y = ac"]
+            case Opcode.COPYFROMY:
+                return ["ac = y"]
+            case Opcode.COPYTOSP:
+                return ["sp = ac"]
+            case Opcode.COPYFROMSP:
+                return ["ac = sp"]
+            case Opcode.JUMP:
+                return leave(operand)
+            case Opcode.JUMPEQ:
+                return leave(f"{operand} if ac == 0 else {npc}")
+            case Opcode.JUMPNE:
+                return leave(f"{operand} if ac != 0 else {npc}")
+            case Opcode.CALL:
+                return ["sp -= 1", *store("sp", npc, operand), *leave(operand)]
+            case Opcode.RET:
+                return pop("r") + leave("r")
+            case Opcode.INCX:
+                return ["x += 1"]
+            case Opcode.DECX:
+                return ["x -= 1"]
+            case Opcode.PUSH:
+                return ["sp -= 1", *store("sp", "ac", npc)]
+            case Opcode.POP:
+                return pop("ac")
+            case Opcode.INTERRUPT:
+                return handler("interrupt")
+            case Opcode.IRETURN:
+                return handler("ireturn")
+            case Opcode.END:
+                return [sync(pc, index + 1), "return True"]
+
+        raise MachineCheck(f"Missing translation for {opcode.name}")
+
+
+class BlockEngine:
+    """Execute a program one translated basic block at a time.
+
+    Blocks are cached by entry address and mode and are dropped when
+    any word they were translated from is written. Blocks are split at
+    the next scheduled event so timer interrupts are taken at the same
+    cycle as the interpreter takes them: a block longer than the cycles
+    left runs a prefix of a power of two instructions, so an address has
+    at most one cached prefix per power of two whatever the budgets.
+    """
+
+    def __init__(self, cpu: CPU) -> None:
+        self.cpu = cpu
+        self.translator = BlockTranslator(cpu)
+        self.blocks: dict[tuple[int, Mode, int | None], Block] = {}
+        self.covers: dict[int, set[tuple[int, Mode, int | None]]] = {}
+        cpu.memory.watch(self.invalidate)
+
+    def lookup(self, address: int, mode: Mode, budget: int = None) -> Block:
+        """Return the block at address in mode executing at most budget instructions.
+
+        Budget is at least one if given.
+
+        Raises:
+        - InvalidOpcodeError
+        - MachineCheck
+        - MemoryRangeError
+        - SegmentationFault
+        """
+        key = (address, mode, None)
+        try:
+            block = self.blocks[key]
+        except KeyError:
+            block = self.insert(key, self.translator.translate(address, mode))
+
+        if budget is None or block.count <= budget:
+            return block
+
+        # The largest power of two not above budget, the engine looks up
+        # the rest of the block once the prefix has run.
+        limit = 1 << (budget.bit_length() - 1)
+        key = (address, mode, limit)
+        try:
+            return self.blocks[key]
+        except KeyError:
+            pass
+        return self.insert(key, self.translator.translate(address, mode, limit))
+
+    def insert(self, key: tuple[int, Mode, int | None], block: Block) -> Block:
+        """Cache block under key and watch the words it was translated from."""
+        self.blocks[key] = block
+        for address in range(block.address, block.address + block.length):
+            self.covers.setdefault(address, set()).add(key)
+            self.cpu.memory.mark(address)
+        return block
+
+    def invalidate(self, address: int) -> None:
+        """Drop all blocks translated from address."""
+        for key in self.covers.pop(address, ()):
+            self.blocks.pop(key, None)
+
+    def run(self, max_cycles: int = None) -> RunResult:
+        """Execute from the current PC until END or max_cycles instructions retire.
+
+        See `execute`, faults are raised instead of returned.
+
+        Raises:
+        - InvalidOpcodeError
+        - InvalidOperandError
+        - MachineCheck
+        - MemoryRangeError
+        - SegmentationFault
+        - StackUnderflowError
+        """
+        return self.execute(max_cycles).raise_fault()
+
+    def execute(self, max_cycles: int = None) -> RunResult:
+        """Execute from the current PC until END, a fault or max_cycles instructions retire."""
+        cpu = self.cpu
+        try:
+            return self._execute(max_cycles)
+        except exceptions.BaseException as error:
+            return RunResult.faulted(error, cpu.pc, cpu.cycles)
+
+    def _execute(self, max_cycles: int = None) -> RunResult:
+        cpu = self.cpu
+        scheduler = cpu.scheduler
+        stop = None if max_cycles is None else cpu.cycles + max_cycles
+
+        while cpu.cycles != stop:
+            scheduler.poll(cpu.cycles)
+
+            budget = scheduler.countdown(cpu.cycles)
+            if stop is not None and (budget is None or stop - cpu.cycles < budget):
+                budget = stop - cpu.cycles
+
+            if self.lookup(cpu.pc, cpu.mode, budget).function(cpu):
+                return RunResult(HaltReason.END, cpu.cycles, cpu.pc)
+
+        return RunResult(HaltReason.CYCLES, cpu.cycles, cpu.pc)
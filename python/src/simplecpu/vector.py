@@ -0,0 +1,424 @@
+"""Lockstep Vector Engine
+
+Runs many copies of one program image in lockstep with NumPy. Each lane
+has its own registers, memory, timer interval and GET random stream.
+Every step fetches one instruction in every running lane, groups the
+lanes by opcode and executes each group with vectorized microcode named
+after the CPU microcode it mirrors. Lanes that fault or END stop while
+the others continue.
+
+Requires the optional numpy dependency.
+"""
+
+from __future__ import annotations
+
+import builtins
+import random
+from typing import NamedTuple
+
+import numpy as np
+
+from . import exceptions
+from .constants import HaltReason, Mode, ProgramLoad, StackBase
+from .exceptions import *
+from .memory import Memory
+from .opcode import DECODE_TABLE, ILLEGAL, Opcode
+
+
+class LaneResult(NamedTuple):
+    """The outcome of one lane, like the `RunResult` of `CPU.execute`.
+
+    If the reason is FAULT, fault is the name of the exception class the
+    CPU would have raised and detail is its message.
+    """
+
+    reason: HaltReason
+    cycles: int
+    pc: int
+    fault: str | None
+    detail: str | None
+    output: str
+
+    def error(self) -> Exception | None:
+        """An exception describing the fault, None if there was none."""
+        if self.fault is None:
+            return None
+        cls = getattr(exceptions, self.fault, None) or getattr(builtins, self.fault)
+        return cls(self.detail)
+
+
+class VectorCPU:
+    def __init__(
+        self,
+        memory: Memory,
+        lanes: int,
+        timer_interval: int | list[int] = 0,
+        seeds: list[int] = None,
+    ) -> None:
+        """Create lanes copies of the CPU, each with a copy of memory.
+
+        timer_interval is either shared by all lanes or one per lane.
+        Lane n draws GET values from random.Random(seeds[n]), seeds
+        default to the lane number.
+        """
+        if lanes <= 0:
+            raise ValueError(f"Non-positive lane count is not supported: {lanes}")
+
+        self.lanes = lanes
+        self.nwords = memory.nwords
+        self.image = np.array(memory.words, dtype=np.int32)
+        self.timer_interval = np.broadcast_to(
+            np.asarray(timer_interval, dtype=np.int64), (lanes,)
+        ).copy()
+        self.seeds = list(range(lanes)) if seeds is None else list(seeds)
+
+        if len(self.seeds) != lanes:
+            raise ValueError(f"Seeds mismatch: {lanes} != {len(self.seeds)}")
+
+        self.user_hi = min(StackBase.USER.value, self.nwords - 1)
+        self.legal = np.array([opcode is not ILLEGAL for opcode in DECODE_TABLE])
+        self.microcode = [
+            getattr(self, "invalid" if opcode is ILLEGAL else opcode.name)
+            for opcode in DECODE_TABLE
+        ]
+        self.reset()
+
+    def reset(self) -> None:
+        """Reset registers, memory, output and random streams of every lane."""
+        n = self.lanes
+        self.words = np.tile(self.image, (n, 1))
+        self.mode = np.full(n, Mode.USER.value, dtype=np.int64)
+        self.ir = np.zeros(n, dtype=np.int64)
+        self.pc = np.full(n, ProgramLoad.USER.value, dtype=np.int64)
+        self.sp = np.full(n, StackBase.USER.value, dtype=np.int64)
+        self.ac = np.zeros(n, dtype=np.int64)
+        self.x = np.zeros(n, dtype=np.int64)
+        self.y = np.zeros(n, dtype=np.int64)
+        self.operand = np.zeros(n, dtype=np.int64)
+        self.cycles = np.zeros(n, dtype=np.int64)
+        self.interrupts_enabled = np.ones(n, dtype=bool)
+        self.halted = np.zeros(n, dtype=bool)
+        self.reasons: list[HaltReason | None] = [None] * n
+        self.faults: list[Exception | None] = [None] * n
+        self.output: list[list[str]] = [[] for _ in range(n)]
+        self.random = [random.Random(seed) for seed in self.seeds]
+
+    def results(self) -> list[LaneResult]:
+        """The outcome of every lane."""
+        results = []
+        for lane, fault in enumerate(self.faults):
+            name = detail = None
+            if fault is not None:
+                name = type(fault).__name__
+                detail = " ".join(str(arg) for arg in fault.args)
+            results.append(
+                LaneResult(
+                    self.reasons[lane],
+                    int(self.cycles[lane]),
+                    int(self.pc[lane]),
+                    name,
+                    detail,
+                    "".join(self.output[lane]),
+                )
+            )
+        return results
+
+    def run(self, max_cycles: int = None) -> list[LaneResult]:
+        """Step until every lane halts or max_cycles steps are taken.
+
+        Lanes still running when max_cycles is reached halt with
+        HaltReason.CYCLES.
+        """
+        steps = 0
+        while not self.halted.all() and steps != max_cycles:
+            self.step()
+            steps += 1
+
+        for lane in np.flatnonzero(~self.halted):
+            self.halted[lane] = True
+            self.reasons[lane] = HaltReason.CYCLES
+
+        return self.results()
+
+    def step(self) -> None:
+        """Execute one instruction in every running lane."""
+
+        lanes = np.flatnonzero(~self.halted)
+
+        interval = self.timer_interval[lanes]
+        cycles = self.cycles[lanes]
+        due = (interval > 0) & (cycles > 0)
+        due[due] = cycles[due] % interval[due] == 0
+        if due.any():
+            self._interrupt(lanes[due], ProgramLoad.TIMER)
+            lanes = lanes[~self.halted[lanes]]
+
+        lanes, ir = self._load(lanes, self.pc[lanes])
+
+        # IR holds the word fetched even if it does not decode, like CPU.
+        self.ir[lanes] = ir
+
+        legal = (ir >= 0) & (ir < len(DECODE_TABLE))
+        legal[legal] = self.legal[ir[legal]]
+        for lane, value in zip(lanes[~legal], ir[~legal]):
+            self._fault(lane, InvalidOpcodeError(value))
+        lanes, ir = lanes[legal], ir[legal]
+
+        self.operand[lanes] = 0
+
+        for value in np.unique(ir):
+            opcode = DECODE_TABLE[value]
+            group = lanes[ir == value]
+
+            if opcode.has_operand:
+                group, operand = self._load(group, self.pc[group] + 1)
+                self.operand[group] = operand
+
+            retired = self.microcode[value](group)
+
+            self.cycles[retired] += 1
+            if not opcode.is_cti and opcode is not Opcode.END:
+                self.pc[retired] += opcode.length
+
+    def _fault(self, lane: int, error: Exception) -> None:
+        """Halt lane with error."""
+        self.halted[lane] = True
+        self.reasons[lane] = HaltReason.FAULT
+        self.faults[lane] = error
+
+    def _access(
+        self, lanes: np.ndarray, addresses: np.ndarray, kind: str
+    ) -> np.ndarray:
+        """Mask of lanes which may access addresses, the others are faulted."""
+        user = self.mode[lanes] == Mode.USER.value
+        hi = np.where(user, self.user_hi, self.nwords - 1)
+        ok = (addresses >= 0) & (addresses <= hi)
+
+        for lane, address, is_user in zip(lanes[~ok], addresses[~ok], user[~ok]):
+            if is_user and not 0 <= address <= StackBase.USER.value:
+                self._fault(lane, SegmentationFault(f"{kind} {address}"))
+            else:
+                bounds = range(ProgramLoad.USER.value, self.nwords)
+                self._fault(lane, MemoryRangeError(f"{address} not in {bounds}"))
+
+        return ok
+
+    def _load(self, lanes: np.ndarray, addresses: np.ndarray) -> tuple:
+        """Lanes that loaded from addresses and the values they loaded."""
+        ok = self._access(lanes, addresses, "load from")
+        lanes = lanes[ok]
+        return lanes, self.words[lanes, addresses[ok]].astype(np.int64)
+
+    def _store(
+        self, lanes: np.ndarray, addresses: np.ndarray, values: np.ndarray
+    ) -> np.ndarray:
+        """Lanes that stored values to addresses."""
+        ok = self._access(lanes, addresses, "store to")
+        info = np.iinfo(np.int32)
+        fits = (values >= info.min) & (values <= info.max)
+        for lane in lanes[ok & ~fits]:
+            self._fault(lane, OverflowError("signed integer out of range"))
+        ok &= fits
+        lanes = lanes[ok]
+        self.words[lanes, addresses[ok]] = values[ok]
+        return lanes
+
+    def _push(self, lanes: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """Lanes that pushed values onto their stack."""
+        self.sp[lanes] -= 1
+        return self._store(lanes, self.sp[lanes], values)
+
+    def _pop(self, lanes: np.ndarray) -> tuple:
+        """Lanes that popped a value from their stack and the values popped."""
+        mode = self.mode[lanes]
+        sp = self.sp[lanes]
+        base = np.where(mode == Mode.USER.value, StackBase.USER, StackBase.SYSTEM)
+        under = sp >= base
+        for lane, value, m in zip(lanes[under], sp[under], mode[under]):
+            self._fault(lane, StackUnderflowError(value, Mode(int(m))))
+        lanes, values = self._load(lanes[~under], sp[~under])
+        self.sp[lanes] += 1
+        return lanes, values
+
+    def _interrupt(self, lanes: np.ndarray, program_load: ProgramLoad) -> np.ndarray:
+        """Lanes that took an interrupt to program_load, see CPU.interrupt."""
+        enabled = self.interrupts_enabled[lanes]
+        disabled = lanes[~enabled]
+        self.pc[disabled] += 1
+        lanes = lanes[enabled]
+
+        self.mode[lanes] = Mode.SYSTEM.value
+        self.interrupts_enabled[lanes] = False
+
+        u_sp = self.sp[lanes]
+        u_pc = self.pc[lanes]
+        if program_load == ProgramLoad.INTERRUPT:
+            u_pc = u_pc + 1
+
+        self.sp[lanes] = StackBase.SYSTEM.value
+        pushed = self._push(lanes, u_sp)
+        u_pc = u_pc[np.isin(lanes, pushed)]
+        pushed = self._push(pushed, u_pc)
+        self.pc[pushed] = program_load.value
+
+        return np.union1d(pushed, disabled)
+
+    def invalid(self, lanes: np.ndarray) -> np.ndarray:
+        for lane in lanes:
+            message = f"{self.pc[lane]:08d}: {self.ir[lane]:08d}"
+            self._fault(lane, InvalidOpcodeError(message))
+        return lanes[:0]
+
+    def loadv(self, lanes: np.ndarray) -> np.ndarray:
+        self.ac[lanes] = self.operand[lanes]
+        return lanes
+
+    def loada(self, lanes: np.ndarray) -> np.ndarray:
+        lanes, values = self._load(lanes, self.operand[lanes])
+        self.ac[lanes] = values
+        return lanes
+
+    def loadi(self, lanes: np.ndarray) -> np.ndarray:
+        lanes, addresses = self._load(lanes, self.operand[lanes])
+        lanes, values = self._load(lanes, addresses)
+        self.ac[lanes] = values
+        return lanes
+
+    def loadx(self, lanes: np.ndarray) -> np.ndarray:
+        lanes, values = self._load(lanes, self.operand[lanes] + self.x[lanes])
+        self.ac[lanes] = values
+        return lanes
+
+    def loady(self, lanes: np.ndarray) -> np.ndarray:
+        lanes, values = self._load(lanes, self.operand[lanes] + self.y[lanes])
+        self.ac[lanes] = values
+        return lanes
+
+    def loadspx(self, lanes: np.ndarray) -> np.ndarray:
+        lanes, values = self._load(lanes, self.sp[lanes] + self.x[lanes])
+        self.ac[lanes] = values
+        return lanes
+
+    def store(self, lanes: np.ndarray) -> np.ndarray:
+        return self._store(lanes, self.operand[lanes], self.ac[lanes])
+
+    def get(self, lanes: np.ndarray) -> np.ndarray:
+        for lane in lanes:
+            self.ac[lane] = self.random[lane].randint(1, 100)
+        return lanes
+
+    def put(self, lanes: np.ndarray) -> np.ndarray:
+        retired = []
+        for lane in lanes:
+            port = self.operand[lane]
+            ac = int(self.ac[lane])
+            try:
+                if port == 1:
+                    self.output[lane].append(str(ac))
+                elif port == 2:
+                    self.output[lane].append(chr(ac))
+                else:
+                    raise InvalidOperandError(f"unknown port={port}")
+            except (InvalidOperandError, OverflowError, ValueError) as error:
+                self._fault(lane, error)
+                continue
+            retired.append(lane)
+        return np.array(retired, dtype=lanes.dtype)
+
+    def addx(self, lanes: np.ndarray) -> np.ndarray:
+        self.ac[lanes] += self.x[lanes]
+        return lanes
+
+    def addy(self, lanes: np.ndarray) -> np.ndarray:
+        self.ac[lanes] += self.y[lanes]
+        return lanes
+
+    def subx(self, lanes: np.ndarray) -> np.ndarray:
+        self.ac[lanes] -= self.x[lanes]
+        return lanes
+
+    def suby(self, lanes: np.ndarray) -> np.ndarray:
+        self.ac[lanes] -= self.y[lanes]
+        return lanes
+
+    def copytox(self, lanes: np.ndarray) -> np.ndarray:
+        self.x[lanes] = self.ac[lanes]
+        return lanes
+
+    def copyfromx(self, lanes: np.ndarray) -> np.ndarray:
+        self.ac[lanes] = self.x[lanes]
+        return lanes
+
+    def copytoy(self, lanes: np.ndarray) -> np.ndarray:
+        self.y[lanes] = self.ac[lanes]
+        return lanes
+
+    def copyfromy(self, lanes: np.ndarray) -> np.ndarray:
+        self.ac[lanes] = self.y[lanes]
+        return lanes
+
+    def copytosp(self, lanes: np.ndarray) -> np.ndarray:
+        self.sp[lanes] = self.ac[lanes]
+        return lanes
+
+    def copyfromsp(self, lanes: np.ndarray) -> np.ndarray:
+        self.ac[lanes] = self.sp[lanes]
+        return lanes
+
+    def jump(self, lanes: np.ndarray) -> np.ndarray:
+        self.pc[lanes] = self.operand[lanes]
+        return lanes
+
+    def jumpeq(self, lanes: np.ndarray) -> np.ndarray:
+        taken = self.ac[lanes] == 0
+        self.pc[lanes] = np.where(taken, self.operand[lanes], self.pc[lanes] + 2)
+        return lanes
+
+    def jumpne(self, lanes: np.ndarray) -> np.ndarray:
+        taken = self.ac[lanes] != 0
+        self.pc[lanes] = np.where(taken, self.operand[lanes], self.pc[lanes] + 2)
+        return lanes
+
+    def call(self, lanes: np.ndarray) -> np.ndarray:
+        lanes = self._push(lanes, self.pc[lanes] + 2)
+        self.pc[lanes] = self.operand[lanes]
+        return lanes
+
+    def ret(self, lanes: np.ndarray) -> np.ndarray:
+        lanes, values = self._pop(lanes)
+        self.pc[lanes] = values
+        return lanes
+
+    def incx(self, lanes: np.ndarray) -> np.ndarray:
+        self.x[lanes] += 1
+        return lanes
+
+    def decx(self, lanes: np.ndarray) -> np.ndarray:
+        self.x[lanes] -= 1
+        return lanes
+
+    def push(self, lanes: np.ndarray) -> np.ndarray:
+        return self._push(lanes, self.ac[lanes])
+
+    def pop(self, lanes: np.ndarray) -> np.ndarray:
+        lanes, values = self._pop(lanes)
+        self.ac[lanes] = values
+        return lanes
+
+    def interrupt(self, lanes: np.ndarray) -> np.ndarray:
+        return self._interrupt(lanes, ProgramLoad.INTERRUPT)
+
+    def ireturn(self, lanes: np.ndarray) -> np.ndarray:
+        lanes, values = self._pop(lanes)
+        self.pc[lanes] = values
+        lanes, values = self._pop(lanes)
+        self.sp[lanes] = values
+        self.interrupts_enabled[lanes] = True
+        self.mode[lanes] = Mode.USER.value
+        return lanes
+
+    def end(self, lanes: np.ndarray) -> np.ndarray:
+        self.halted[lanes] = True
+        for lane in lanes:
+            self.reasons[lane] = HaltReason.END
+        return lanes
@@ -0,0 +1,317 @@
+"""Static Address Verifier
+
+LOADA, STORE, JUMP, JUMPEQ, JUMPNE and CALL take a constant address as
+their operand, so whether they can fault on it is known before the
+program runs. The verifier walks the code reachable from each entry
+point in the mode that entry runs in and checks every constant address
+against that mode's address space, an instruction whose address is
+never accessible is a Finding.
+
+The verifier only reports. The engines make the same decision for each
+instruction as they decode it, the predecoder dispatches LOADA and
+STORE of a user_space address to microcode that does not check it and
+the translator emits unchecked accesses for constant addresses in
+bounds, so instructions rewritten at run time are decided again.
+
+A Finding is certain if the program cannot avoid it: it lies on the
+straight-line path from the USER entry, following JUMP and returning
+from INTERRUPT, before any conditional branch or CALL. The path also
+ends at anything that may change the code ahead of it: a STORE or PUSH
+writing a word of reachable code, an INTERRUPT handler or a TIMER
+handler that is not certain to return without doing so. Certain
+findings let a batch reject a program without running it.
+"""
+
+from __future__ import annotations
+
+from typing import NamedTuple
+
+from .constants import Mode, ProgramLoad, StackBase
+from .exceptions import *
+from .memory import Memory
+from .opcode import Opcode, decode
+
+ADDRESSED: tuple[Opcode, ...] = (
+    Opcode.LOADA,
+    Opcode.STORE,
+    Opcode.JUMP,
+    Opcode.JUMPEQ,
+    Opcode.JUMPNE,
+    Opcode.CALL,
+)
+
+# Instructions that fault every time they execute if their operand is bad,
+# a bad conditional branch only faults when it is taken.
+UNAVOIDABLE: tuple[Opcode, ...] = (
+    Opcode.LOADA,
+    Opcode.STORE,
+    Opcode.JUMP,
+    Opcode.CALL,
+    Opcode.INVALID,
+)
+
+USER_SPACE: range = range(ProgramLoad.USER.value, StackBase.USER.value + 1)
+
+
+class Finding(NamedTuple):
+    """An instruction that faults whenever it is executed."""
+
+    address: int
+    mode: Mode
+    opcode: Opcode
+    operand: int | None
+    fault: type[Exception]
+    message: str
+    certain: bool
+
+    def __str__(self) -> str:
+        kind = "fault" if self.certain else "possible fault"
+        operand = "" if self.operand is None else f" {self.operand}"
+        return (
+            f"{self.address:08d} {self.mode.name} {self.opcode.name}{operand}: "
+            f"{kind} {self.fault.__name__}: {self.message}"
+        )
+
+
+class Verification(NamedTuple):
+    """The outcome of verifying a memory image."""
+
+    reachable: dict[int, Mode]
+    findings: list[Finding]
+
+    @property
+    def faults(self) -> list[Finding]:
+        """Findings every run of the program reaches."""
+        return [finding for finding in self.findings if finding.certain]
+
+
+class Verifier:
+    """Checks the constant addresses in the code reachable in a memory image."""
+
+    def __init__(
+        self, memory: Memory, user_space: range = USER_SPACE, timer: bool = True
+    ) -> None:
+        """Verify memory, including the TIMER handler if timer is True."""
+        self.memory = memory
+        self.user_space = user_space
+        self.timer = timer
+
+    def space(self, mode: Mode) -> range:
+        """The addresses accessible in mode."""
+        nwords = self.memory.nwords
+        if mode is Mode.USER:
+            return range(self.user_space.start, min(self.user_space.stop, nwords))
+        return range(0, nwords)
+
+    def fetch(self, address: int, mode: Mode) -> tuple[Opcode, int | None] | None:
+        """The instruction at address, None if it cannot be fetched in mode.
+
+        Raises:
+        - InvalidOpcodeError
+        """
+        space = self.space(mode)
+        if address not in space:
+            return None
+        opcode = decode(self.memory.words[address])
+        if not opcode.has_operand:
+            return opcode, None
+        if address + 1 not in space:
+            return None
+        return opcode, self.memory.words[address + 1]
+
+    def check(
+        self, address: int, mode: Mode, opcode: Opcode, operand: int | None
+    ) -> Finding | None:
+        """A Finding if the instruction at address faults whenever it executes."""
+        if opcode is Opcode.INVALID:
+            message = f"{address:08d}: {self.memory.words[address]:08d}"
+            return Finding(
+                address, mode, opcode, operand, InvalidOpcodeError, message, False
+            )
+        if opcode not in ADDRESSED or operand in self.space(mode):
+            return None
+        if mode is Mode.SYSTEM:
+            message = f"{operand} not in {self.memory.bounds}"
+            fault = MemoryRangeError
+        elif opcode is Opcode.STORE:
+            message = f"store to {operand}"
+            fault = SegmentationFault
+        else:
+            message = f"load from {operand}"
+            fault = SegmentationFault
+        return Finding(address, mode, opcode, operand, fault, message, False)
+
+    def successors(
+        self, address: int, opcode: Opcode, operand: int | None
+    ) -> list[int]:
+        """Addresses that may execute after the instruction at address."""
+        npc = address + opcode.length
+        match opcode:
+            case Opcode.END | Opcode.RET | Opcode.IRETURN | Opcode.INVALID:
+                return []
+            case Opcode.JUMP:
+                return [operand]
+            case Opcode.JUMPEQ | Opcode.JUMPNE | Opcode.CALL:
+                return [operand, npc]
+        return [npc]
+
+    def entries(self) -> list[tuple[int, Mode]]:
+        """The addresses execution starts from and the mode of each.
+
+        The INTERRUPT handler is entered from INTERRUPT instructions.
+        """
+        entries = [(ProgramLoad.USER.value, Mode.USER)]
+        if self.timer:
+            entries.append((ProgramLoad.TIMER.value, Mode.SYSTEM))
+        return entries
+
+    def returns(self, address: int, code: set[int]) -> bool:
+        """True if the handler at address always returns without writing code.
+
+        The handler must run straight to IRETURN, following JUMP, without
+        faulting, writing a word in code or disturbing the frame holding
+        the interrupted SP and PC.
+        """
+        frame = sp = StackBase.SYSTEM.value - 2
+        seen = set()
+        while address not in seen:
+            seen.add(address)
+            try:
+                decoded = self.fetch(address, Mode.SYSTEM)
+            except InvalidOpcodeError:
+                return False
+            if decoded is None:
+                return False
+            opcode, operand = decoded
+            if self.check(address, Mode.SYSTEM, opcode, operand) is not None:
+                return False
+            match opcode:
+                case Opcode.IRETURN:
+                    return sp == frame
+                case Opcode.JUMP:
+                    address = operand
+                    continue
+                case Opcode.STORE if operand in code:
+                    return False
+                case Opcode.PUSH:
+                    sp -= 1
+                    if sp in code:
+                        return False
+                case Opcode.POP:
+                    sp += 1
+                    if sp > frame:
+                        return False
+                case Opcode.PUT if operand not in (1, 2):
+                    return False
+                case (
+                    Opcode.LOADI
+                    | Opcode.LOADX
+                    | Opcode.LOADY
+                    | Opcode.LOADSPX
+                    | Opcode.COPYTOSP
+                ):
+                    return False
+                case _ if opcode.is_cti or opcode is Opcode.END:
+                    return False
+            address += opcode.length
+        return False
+
+    def certain_path(self, code: set[int] = frozenset()) -> set[int]:
+        """USER addresses executed by every run that does not fault first.
+
+        Code holds the addresses of the words of reachable instructions,
+        see `returns`.
+        """
+        path = set()
+        if self.timer and not self.returns(ProgramLoad.TIMER.value, code):
+            return path
+
+        address = ProgramLoad.USER.value
+        sp = StackBase.USER.value
+        while address not in path:
+            try:
+                decoded = self.fetch(address, Mode.USER)
+            except InvalidOpcodeError:
+                decoded = Opcode.INVALID, None
+            if decoded is None:
+                break
+            path.add(address)
+            opcode, operand = decoded
+            match opcode:
+                case Opcode.JUMP:
+                    address = operand
+                    continue
+                case Opcode.INTERRUPT:
+                    if not self.returns(ProgramLoad.INTERRUPT.value, code):
+                        break
+                case Opcode.STORE if operand in code:
+                    break
+                case Opcode.PUSH:
+                    sp -= 1
+                    if sp in code:
+                        break
+                case Opcode.POP:
+                    sp += 1
+                case Opcode.COPYTOSP:
+                    break
+                case _ if opcode.is_cti or opcode in (Opcode.END, Opcode.INVALID):
+                    break
+            address += opcode.length
+        return path
+
+    def verify(self) -> Verification:
+        """Walk the reachable code and check each constant address."""
+        reachable: dict[int, Mode] = {}
+        findings: list[Finding] = []
+        code: set[int] = set()
+
+        visited: set[tuple[int, Mode]] = set()
+        pending = self.entries()
+        while pending:
+            address, mode = pending.pop()
+            if (address, mode) in visited:
+                continue
+            visited.add((address, mode))
+
+            try:
+                decoded = self.fetch(address, mode)
+            except InvalidOpcodeError:
+                decoded = Opcode.INVALID, None
+            if decoded is None:
+                continue
+            reachable[address] = mode
+            opcode, operand = decoded
+            code.update(range(address, address + opcode.length))
+            successors = self.successors(address, opcode, operand)
+            if opcode is Opcode.INTERRUPT:
+                pending.append((ProgramLoad.INTERRUPT.value, Mode.SYSTEM))
+
+            finding = self.check(address, mode, opcode, operand)
+            if finding is not None:
+                if opcode in UNAVOIDABLE:
+                    successors = []
+                else:
+                    successors.remove(operand)
+                findings.append(finding)
+
+            pending.extend((successor, mode) for successor in successors)
+
+        certain = self.certain_path(code)
+        findings = [
+            finding._replace(certain=True)
+            if finding.opcode in UNAVOIDABLE
+            and finding.mode is Mode.USER
+            and finding.address in certain
+            else finding
+            for finding in findings
+        ]
+
+        findings.sort(key=lambda finding: (not finding.certain, finding.address))
+        return Verification(reachable, findings)
+
+
+def verify(
+    memory: Memory, user_space: range = USER_SPACE, timer: bool = True
+) -> Verification:
+    """Verify the constant addresses in the code reachable in memory."""
+    return Verifier(memory, user_space, timer).verify()
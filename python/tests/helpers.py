@@ -0,0 +1,43 @@
+""" Helpers Shared by the Tests
+"""
+
+from io import StringIO
+
+from simplecpu.cpu import CPU
+from simplecpu.loader import Loader
+from simplecpu.memory import Memory
+
+from .samples import samples
+
+
+def load(name: str, cls: type[Memory] = Memory) -> Memory:
+    memory = cls()
+    Loader(StringIO(samples[name][0])).initialize(memory)
+    return memory
+
+
+def program(*words: int) -> Memory:
+    return Memory(initializer=list(words) + [0] * (2000 - len(words)))
+
+
+def registers(cpu: CPU) -> tuple:
+    return (
+        cpu.pc,
+        cpu.sp,
+        cpu.ir,
+        cpu.ac,
+        cpu.x,
+        cpu.y,
+        cpu.mode,
+        cpu.interrupts_enabled,
+        cpu.cycles,
+        cpu.operand,
+    )
+
+
+def run(function) -> type | None:
+    try:
+        function()
+    except Exception as error:
+        return type(error)
+    return None
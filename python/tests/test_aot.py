@@ -0,0 +1,101 @@
+"""
+"""
+
+
+import pytest
+
+from simplecpu import aot
+from simplecpu.constants import HaltReason, Mode
+from simplecpu.cpu import CPU
+from simplecpu.exceptions import *
+from simplecpu.memory import Memory
+from simplecpu.opcode import Opcode
+
+from .helpers import load, registers, run
+
+
+@pytest.fixture(autouse=True)
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("SIMPLECPU_CACHE", str(tmp_path / "cache"))
+    return tmp_path / "cache"
+
+
+def test_aot_compile_image(cache) -> None:
+    memory = load("sample1")
+
+    path = aot.compile_image(memory)
+
+    assert path.parent == cache
+    assert path == aot.module_path(memory)
+    assert list((cache / "__pycache__").glob(f"{path.stem}.*.pyc"))
+
+    module = aot.load(memory)
+
+    assert module.DIGEST == aot.digest(memory)
+    assert module.NWORDS == memory.nwords
+    assert (0, Mode.USER.value, 4, 7, "block_00000000_user") in module.BLOCKS
+
+
+def test_aot_load_not_compiled() -> None:
+    memory = load("sample1")
+    aot.compile_image(load("program1"))
+
+    assert aot.load(memory) is None
+    with pytest.raises(ValueError):
+        aot.CompiledEngine(CPU(memory))
+
+
+def test_aot_digest_depends_on_contents() -> None:
+    memory = load("sample1")
+    digest = aot.digest(memory)
+
+    memory.write(1999, 1)
+
+    assert aot.digest(memory) != digest
+
+
+def test_aot_leaders() -> None:
+
+    leaders = aot.leaders(load("sample1"))
+
+    assert (0, Mode.USER) in leaders
+    assert (3, Mode.USER) in leaders
+    assert (7, Mode.USER) in leaders
+    assert (12, Mode.USER) in leaders
+
+
+@pytest.mark.parametrize("name", ["program1", "sample1", "sample2", "sample3"])
+@pytest.mark.parametrize("timer_interval", [0, 7, 30])
+def test_compiled_engine_matches_interpreter(name, timer_interval, capsys) -> None:
+
+    reference = CPU(load(name), timer_interval=timer_interval)
+    expected = run(lambda: reference.run(max_cycles=5000))
+    expected_output = capsys.readouterr().out
+
+    aot.compile_image(load(name))
+    cpu = CPU(load(name), timer_interval=timer_interval)
+    engine = aot.CompiledEngine(cpu)
+    compiled = dict(engine.blocks)
+    assert run(lambda: engine.run(max_cycles=5000)) == expected
+
+    assert capsys.readouterr().out == expected_output
+    assert registers(cpu) == registers(reference)
+    assert compiled
+
+
+def test_compiled_engine_self_modifying_block() -> None:
+    # STORE rewrites the operand of the LOADV in the same block.
+    program = [
+        Opcode.LOADV.value, 0xFF,
+        Opcode.STORE.value, 5,
+        Opcode.LOADV.value, 0,
+        Opcode.END.value,
+    ]  # fmt: skip
+    memory = Memory(initializer=program + [0] * (2000 - len(program)))
+    aot.compile_image(memory)
+
+    cpu = CPU(memory)
+    engine = aot.CompiledEngine(cpu)
+
+    assert engine.run()[:2] == (HaltReason.END, 4)
+    assert cpu.ac == 0xFF
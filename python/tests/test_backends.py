@@ -0,0 +1,71 @@
+"""
+"""
+
+import pytest
+
+from simplecpu.backends import BACKENDS, MmapBackend, SharedBackend
+from simplecpu.cpu import CPU
+from simplecpu.memory import Memory
+
+from .test_memory import *
+
+
+@pytest.fixture(autouse=True, params=list(BACKENDS))
+def backend(request, monkeypatch) -> str:
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    monkeypatch.setattr(Memory, "default_backend", request.param)
+    return request.param
+
+
+def test_backend_selected(backend: str) -> None:
+
+    memory = Memory(100)
+
+    assert memory.backend.name == backend
+    assert memory.view(0, 100).format == "i"
+    assert isinstance(memory.read(0), int)
+    memory.close()
+
+
+def test_backend_runs_program(backend: str) -> None:
+    memory = Memory(initializer=[1, 72, 9, 2, 50] + [0] * 1995)  # print H
+
+    result = CPU(memory).run()
+
+    assert result.cycles == 3
+
+
+def test_backend_instance_initializer(backend: str) -> None:
+
+    memory = Memory(4, initializer=[1, 2, 3, 4], backend=MmapBackend(4))
+
+    assert list(memory.words) == [1, 2, 3, 4]
+    assert memory.backend.name == "mmap"
+
+
+def test_unknown_backend(backend: str) -> None:
+
+    with pytest.raises(ValueError):
+        Memory(backend="punchcards")
+
+
+def test_numpy_backend_shares_array(backend: str) -> None:
+    np = pytest.importorskip("numpy")
+    memory = Memory(10, backend="numpy")
+
+    memory.write(3, 7)
+
+    assert memory.backend.array.dtype == np.int32
+    assert memory.backend.array[3] == 7
+
+
+def test_shared_backend_attach(backend: str) -> None:
+    memory = Memory(10, backend="shared")
+    attached = Memory(10, backend=SharedBackend(10, block=memory.backend.block))
+
+    attached.write(3, 7)
+
+    assert memory.read(3) == 7
+    attached.close()
+    memory.close()
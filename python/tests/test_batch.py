@@ -0,0 +1,147 @@
+"""
+"""
+
+import json
+import os
+from io import StringIO
+
+import pytest
+
+from simplecpu import batch
+from simplecpu.batch import JobResult, read_manifest, run_batch, run_job
+from simplecpu.loader import Loader
+from simplecpu.memory import Memory
+
+from .samples import samples
+
+
+@pytest.fixture
+def objects(tmp_path) -> dict:
+    paths = {}
+    for name in ["program1", "sample1", "sample2"]:
+        memory = Memory()
+        Loader(StringIO(samples[name][0])).initialize(memory)
+        paths[name] = tmp_path / f"{name}.o"
+        memory.save(paths[name])
+    return paths
+
+
+def test_run_job_end(objects) -> None:
+
+    result = run_job(objects["program1"])
+
+    assert result.status == "end"
+    assert result.exit_code == 0
+    assert result.cycles == 9
+    assert result.output == "HI\n"
+    assert result.exception is None
+
+
+def test_run_job_fault(objects) -> None:
+
+    result = run_job(objects["sample2"])
+
+    assert result.status == "fault"
+    assert result.exit_code == 1
+    assert result.exception == "SegmentationFault"
+    assert result.cycles == 30
+
+
+@pytest.mark.parametrize("verify", [False, True])
+@pytest.mark.parametrize("name", ["program1", "sample2"])
+def test_run_job_closes_memory(objects, monkeypatch, name, verify) -> None:
+    memories = []
+    load_program = batch.load_program
+
+    def opened(path) -> Memory:
+        memories.append(load_program(path))
+        return memories[-1]
+
+    monkeypatch.setattr(batch, "load_program", opened)
+
+    run_job(objects[name], verify=verify)
+
+    [memory] = memories
+    assert memory.backend.mapping.closed
+
+
+def test_run_job_max_cycles(objects) -> None:
+
+    result = run_job(objects["sample1"], max_cycles=10)
+
+    assert result.status == "cycles"
+    assert result.cycles == 10
+
+
+def test_run_job_timeout(tmp_path) -> None:
+    memory = Memory(initializer=[20, 0] + [0] * 1998)  # jump 0
+    memory.save(tmp_path / "loop.o")
+
+    result = run_job(tmp_path / "loop.o", timeout=0.01)
+
+    assert result.status == "timeout"
+    assert result.cycles > 0
+
+
+def test_run_job_missing_file(tmp_path) -> None:
+
+    result = run_job(tmp_path / "missing.o")
+
+    assert result.status == "fault"
+    assert result.exception == "FileNotFoundError"
+
+
+def test_run_batch(objects) -> None:
+
+    results = list(run_batch(objects.values(), workers=2))
+
+    assert sorted(result.path for result in results) == sorted(
+        str(path) for path in objects.values()
+    )
+
+    for result in results:
+        assert isinstance(result, JobResult)
+        assert json.loads(result.to_json())["path"] == result.path
+
+
+def test_read_manifest(objects, tmp_path) -> None:
+    manifest = tmp_path / "manifest.txt"
+    manifest.write_text("# programs\nprogram1.o\n\nsample1.o\n")
+
+    assert read_manifest(manifest) == [objects["program1"], objects["sample1"]]
+
+
+def test_run_job_verify_rejects(objects) -> None:
+
+    result = run_job(objects["sample2"], verify=True)
+
+    assert result.status == "rejected"
+    assert result.exit_code == 1
+    assert result.cycles == 0
+    assert result.exception == "SegmentationFault"
+
+
+def test_run_job_verify_runs_safe_program(objects) -> None:
+
+    result = run_job(objects["program1"], verify=True)
+
+    assert result.status == "end"
+    assert result.output == "HI\n"
+
+
+def die(*args) -> None:
+    os._exit(1)
+
+
+def test_run_batch_broken_pool(objects, monkeypatch) -> None:
+    monkeypatch.setattr(batch, "run_job", die)
+
+    results = list(run_batch(objects.values(), workers=1))
+
+    assert sorted(result.path for result in results) == sorted(
+        str(path) for path in objects.values()
+    )
+    for result in results:
+        assert result.status == "fault"
+        assert result.exit_code == 1
+        assert result.exception == "BrokenProcessPool"
@@ -6,7 +6,7 @@ import string
 import pytest
 
 from simplecpu.cpu import CPU
-from simplecpu.constants import Mode, ProgramLoad, StackBase
+from simplecpu.constants import HaltReason, Mode, ProgramLoad, StackBase, Trace
 from simplecpu.exceptions import *
 from simplecpu.instruction import Instruction
 from simplecpu.memory import Memory
@@ -782,3 +782,314 @@ def test_cpu_microcode_end(cpu) -> None:
 
     with pytest.raises(StopIteration):
         cpu.step()
+
+
+def test_cpu_dispatch_table(cpu) -> None:
+
+    for opcode in Opcode:
+        assert cpu.dispatch[opcode.value] == getattr(cpu, opcode.name)
+
+    assert cpu.dispatch[31] == cpu.invalid
+
+
+def test_cpu_dispatch_subclass_override(memory) -> None:
+    class DoubleLoad(CPU):
+        def loadv(self) -> None:
+            self.ac = self.operand * 2
+
+    cpu = DoubleLoad(memory)
+    cpu.memory.words[0] = Opcode.LOADV.value
+    cpu.memory.words[1] = 21
+
+    cpu.step()  # loadv
+
+    assert cpu.ac == 42
+
+
+def test_cpu_dispatch_missing_microcode(memory) -> None:
+    class Broken(CPU):
+        @property
+        def loadv(self):
+            raise AttributeError("loadv")
+
+    with pytest.raises(MachineCheck):
+        Broken(memory)
+
+
+def test_cpu_run_method(cpu) -> None:
+    cpu.memory.words[0] = Opcode.INCX.value
+    cpu.memory.words[1] = Opcode.END.value
+
+    result = cpu.run()
+
+    assert result.reason == HaltReason.END
+    assert result.cycles == 2
+    assert cpu.cycles == 2
+    assert cpu.pc == 1
+    assert cpu.ir == Opcode.END
+    assert cpu.x == 1
+
+
+def test_cpu_run_method_max_cycles(cpu) -> None:
+    cpu.memory.words[0] = Opcode.INCX.value
+    cpu.memory.words[1] = Opcode.JUMP.value
+    cpu.memory.words[2] = 0
+
+    result = cpu.run(max_cycles=11)
+
+    assert result.reason == HaltReason.CYCLES
+    assert result.cycles == 11
+    assert cpu.pc == 1
+    assert cpu.x == 6
+
+    result = cpu.run(max_cycles=1)
+
+    assert result.cycles == 12
+    assert cpu.pc == 0
+
+
+def test_cpu_run_method_fault(cpu) -> None:
+    cpu.memory.words[0] = Opcode.INCX.value
+    cpu.memory.words[1] = Opcode.LOADA.value
+    cpu.memory.words[2] = ProgramLoad.TIMER.value
+
+    with pytest.raises(SegmentationFault):
+        cpu.run()
+
+    assert cpu.cycles == 1
+    assert cpu.pc == 1
+    assert cpu.ir == Opcode.LOADA
+
+
+def test_cpu_execute_method_fault(cpu) -> None:
+    cpu.memory.words[0] = Opcode.INCX.value
+    cpu.memory.words[1] = Opcode.LOADA.value
+    cpu.memory.words[2] = ProgramLoad.TIMER.value
+
+    result = cpu.execute()
+
+    assert result.reason == HaltReason.FAULT
+    assert result.cycles == 1
+    assert result.pc == 1
+    assert result.fault == "SegmentationFault"
+    assert result.detail == "load from 1000"
+    assert cpu.cycles == 1
+    assert cpu.pc == 1
+    assert cpu.ir == Opcode.LOADA
+
+    error = result.error()
+
+    assert isinstance(error, SegmentationFault)
+    assert str(error) == "SegmentationFault: load from 1000"
+
+    with pytest.raises(SegmentationFault):
+        result.raise_fault()
+
+
+def test_cpu_execute_method_end(cpu) -> None:
+    cpu.memory.words[0] = Opcode.INCX.value
+    cpu.memory.words[1] = Opcode.END.value
+
+    result = cpu.execute()
+
+    assert result == (HaltReason.END, 2, 1, None, None)
+    assert result.error() is None
+    assert result.raise_fault() is result
+    assert cpu.halted == False
+
+
+@pytest.mark.parametrize(
+    "debug, trace, expected",
+    [
+        (False, None, Trace.OFF),
+        (True, None, Trace.FULL),
+        (False, Trace.REGISTERS, Trace.REGISTERS),
+        (True, Trace.INSTRUCTIONS, Trace.INSTRUCTIONS),
+    ],
+)
+def test_cpu_trace_level(debug, trace, expected, memory) -> None:
+
+    cpu = CPU(memory, debug=debug, trace=trace)
+
+    assert cpu.trace_level == expected
+    assert cpu.trace == getattr(cpu, f"_trace_{expected.name.lower()}")
+
+
+def test_cpu_trace_off_does_not_dump(cpu, monkeypatch) -> None:
+    cpu.memory.words[0] = Opcode.INCX.value
+
+    def dump(*args, **kwds) -> None:
+        raise AssertionError("dump called")
+
+    monkeypatch.setattr(cpu, "dump", dump)
+
+    cpu.step()
+
+    assert cpu.x == 1
+
+
+def test_cpu_trace_off_is_untraced(memory) -> None:
+
+    cpu = CPU(memory)
+
+    assert "_step" not in vars(cpu)
+    assert cpu.interrupt.__func__ is CPU.interrupt
+    assert cpu.ireturn.__func__ is CPU.ireturn
+    assert cpu.put.__func__ is CPU.put
+    assert cpu.memory.traced == False
+
+
+@pytest.mark.parametrize("trace", [Trace.INSTRUCTIONS, Trace.FULL])
+def test_cpu_trace_on_is_traced(trace, memory) -> None:
+
+    cpu = CPU(memory, trace=trace)
+
+    assert cpu._step == cpu._step_traced
+    assert cpu.interrupt == cpu._interrupt_traced
+    assert cpu.ireturn == cpu._ireturn_traced
+    assert cpu.put == cpu._put_traced
+    assert cpu.dispatch[Opcode.INTERRUPT.value] == cpu._interrupt_traced
+    assert cpu.memory.traced == False
+
+
+def test_cpu_trace_full_logs_memory_of_this_cpu(memory, monkeypatch) -> None:
+    from simplecpu.memory import logger
+
+    logged = []
+    monkeypatch.setattr(logger, "read", lambda message: logged.append(message))
+    monkeypatch.setattr(logger, "write", lambda message: logged.append(message))
+    memory.words[0] = Opcode.LOADA.value
+    memory.words[1] = 10
+    memory.words[10] = 42
+
+    traced = CPU(memory, trace=Trace.FULL)
+    traced.trace = traced._trace_instructions
+    traced.step()
+
+    assert traced.ac == 42
+    assert "address=10 value=42" in logged
+
+    logged.clear()
+    untraced = CPU(memory)
+    untraced.step()
+    memory.read(10)
+
+    assert untraced.ac == 42
+    assert logged == []
+
+
+def test_cpu_trace_full_log_unchanged(memory) -> None:
+    from loguru import logger
+
+    # store 20, push, jump 0: the second store is fetched from the
+    # predecoder but is logged like it was before instructions were cached.
+    memory.write_block(0, [7, 20, 27, 20, 0])
+    cpu = CPU(memory, trace=Trace.FULL)
+
+    logged = []
+    logger.enable("simplecpu")
+    sink = logger.add(
+        lambda message: logged.append(
+            (message.record["level"].name, message.record["message"])
+        ),
+        level="TRACE",
+    )
+    try:
+        for _ in range(4):
+            cpu.step()
+    finally:
+        logger.remove(sink)
+        logger.disable("simplecpu")
+
+    assert [record for record in logged if record[0] != "MEMORY"] == [
+        ('READ', 'address=0 value=7'),
+        ('READ', 'address=1 value=20'),
+        ('INSTRUCTION', '00000000        store 00000020 ; Store AC to address'),
+        ('REGISTERS', '[ m] USER     [ti] 00000000 [t?] False    [i?] True'),
+        ('REGISTERS', '[pc] 00000000 [ir] 00000007 [sp] 00000999 [sb] 00000999'),
+        ('REGISTERS', '[ac] 00000000 [ x] 00000000 [ y] 00000000 [cy] 00000000'),
+        ('WRITE', 'address=20 value=0'),
+        ('READ', 'address=2 value=27'),
+        ('INSTRUCTION', '00000002         push          ; Push AC on to stack.'),
+        ('REGISTERS', '[ m] USER     [ti] 00000000 [t?] False    [i?] True'),
+        ('REGISTERS', '[pc] 00000002 [ir] 00000027 [sp] 00000999 [sb] 00000999'),
+        ('REGISTERS', '[ac] 00000000 [ x] 00000000 [ y] 00000000 [cy] 00000001'),
+        ('WRITE', 'address=998 value=0'),
+        ('READ', 'address=3 value=20'),
+        ('READ', 'address=4 value=0'),
+        ('INSTRUCTION', '00000003         jump 00000000 ; Unconditional jump to address'),
+        ('REGISTERS', '[ m] USER     [ti] 00000000 [t?] False    [i?] True'),
+        ('REGISTERS', '[pc] 00000003 [ir] 00000020 [sp] 00000998 [sb] 00000999'),
+        ('REGISTERS', '[ac] 00000000 [ x] 00000000 [ y] 00000000 [cy] 00000002'),
+        ('READ', 'address=998 value=0'),
+        ('STACK', '[stack 00000998] [00000000]'),
+        ('READ', 'address=0 value=7'),
+        ('READ', 'address=1 value=20'),
+        ('INSTRUCTION', '00000000        store 00000020 ; Store AC to address'),
+        ('REGISTERS', '[ m] USER     [ti] 00000000 [t?] False    [i?] True'),
+        ('REGISTERS', '[pc] 00000000 [ir] 00000007 [sp] 00000998 [sb] 00000999'),
+        ('REGISTERS', '[ac] 00000000 [ x] 00000000 [ y] 00000000 [cy] 00000003'),
+        ('READ', 'address=998 value=0'),
+        ('STACK', '[stack 00000998] [00000000]'),
+        ('WRITE', 'address=20 value=0'),
+    ]
+
+
+@pytest.mark.parametrize("mode", [Mode.USER, Mode.SYSTEM])
+def test_cpu_mode_switches_context(mode, cpu) -> None:
+
+    cpu.mode = mode
+
+    assert cpu.mode is mode
+    assert cpu.stack_base == StackBase.for_mode(mode).value
+    assert cpu._load == cpu.contexts[mode].load
+    assert cpu._store == cpu.contexts[mode].store
+
+
+def test_cpu_load_store_override_survives_mode_switch(memory) -> None:
+    class Watched(CPU):
+        def _load(self, address: int) -> int:
+            self.accesses.append(("load", address))
+            return super()._load(address)
+
+        def _store(self, address: int, value: int) -> None:
+            self.accesses.append(("store", address))
+            super()._store(address, value)
+
+    cpu = Watched(memory)
+    cpu.accesses = []
+    cpu.memory.words[0] = Opcode.INTERRUPT.value
+    cpu.memory.words[1] = Opcode.LOADA.value
+    cpu.memory.words[2] = 10
+    cpu.memory.words[1500] = Opcode.IRETURN.value
+
+    cpu.step()  # interrupt
+    cpu.step()  # ireturn
+    cpu.accesses.clear()
+    cpu.step()  # loada
+
+    assert cpu.mode == Mode.USER
+    assert cpu.accesses == [("load", 1), ("load", 2), ("load", 10)]
+
+    with pytest.raises(SegmentationFault):
+        cpu._store(1000, 1)
+
+    assert cpu.accesses[-1] == ("store", 1000)
+
+
+def test_cpu_interrupt_and_ireturn_switch_context(cpu) -> None:
+    system = ProgramLoad.INTERRUPT.value
+
+    cpu.interrupt()
+
+    assert cpu.mode is Mode.SYSTEM
+    cpu._store(system, 1)
+    assert cpu._load(system) == 1
+
+    cpu.ireturn()
+
+    assert cpu.mode is Mode.USER
+    with pytest.raises(SegmentationFault):
+        cpu._load(system)
+    with pytest.raises(SegmentationFault):
+        cpu._store(system, 1)
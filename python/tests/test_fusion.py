@@ -0,0 +1,140 @@
+"""
+"""
+
+
+import pytest
+
+from simplecpu.constants import HaltReason
+from simplecpu.cpu import CPU
+from simplecpu.exceptions import *
+from simplecpu.memory import Memory
+from simplecpu.opcode import Opcode
+from simplecpu.predecode import Predecoder
+
+from .helpers import load, program, registers, run
+
+
+def unfused(memory: Memory, timer_interval: int = 0) -> CPU:
+    cpu = CPU(memory, timer_interval=timer_interval)
+    cpu.predecoder = Predecoder(cpu, fusion=False)
+    return cpu
+
+
+@pytest.mark.parametrize("name", ["program1", "sample1", "sample2", "sample3"])
+@pytest.mark.parametrize("timer_interval", [0, 1, 2, 3, 7, 30])
+@pytest.mark.parametrize("max_cycles", [5, 16, 5000])
+def test_fusion_matches_unfused(name, timer_interval, max_cycles, capsys) -> None:
+
+    reference = unfused(load(name), timer_interval)
+    expected = run(lambda: reference.run(max_cycles=max_cycles))
+    expected_output = capsys.readouterr().out
+
+    cpu = CPU(load(name), timer_interval=timer_interval)
+    assert run(lambda: cpu.run(max_cycles=max_cycles)) == expected
+
+    assert capsys.readouterr().out == expected_output
+    assert registers(cpu) == registers(reference)
+    assert cpu.memory == reference.memory
+
+
+@pytest.mark.parametrize(
+    "words, fused",
+    [
+        ([Opcode.LOADV.value, 7, Opcode.PUSH.value], Opcode.PUSH),
+        ([Opcode.LOADV.value, 0, Opcode.COPYTOX.value], Opcode.COPYTOX),
+        ([Opcode.LOADV.value, 65, Opcode.PUT.value, 2], Opcode.PUT),
+        ([Opcode.INCX.value, Opcode.JUMP.value, 3, Opcode.END.value], Opcode.JUMP),
+        ([Opcode.COPYFROMX.value, Opcode.JUMPNE.value, 0], Opcode.JUMPNE),
+        ([Opcode.LOADV.value, 7, Opcode.COPYTOY.value], None),
+    ],
+)
+def test_fusion_pairs(words, fused, capsys) -> None:
+    cpu = CPU(program(*words, Opcode.END.value))
+
+    result = cpu.run()
+
+    assert result.reason == HaltReason.END
+    entry = cpu.predecoder.entries[0]
+    if fused is None:
+        assert entry.fused is None
+    else:
+        assert entry.fused.opcode == fused
+        assert entry.fused.length == 1 + fused.length + (words[0] == Opcode.LOADV)
+
+
+def test_fusion_pop_ret() -> None:
+    words = [
+        Opcode.CALL.value, 4,
+        Opcode.END.value, 0,
+        Opcode.LOADV.value, 9,
+        Opcode.PUSH.value,
+        Opcode.POP.value,
+        Opcode.RET.value,
+    ]  # fmt: skip
+    cpu = CPU(program(*words))
+
+    assert cpu.run()[:2] == (HaltReason.END, 6)
+    assert cpu.ac == 9
+    assert cpu.predecoder.entries[7].fused.opcode == Opcode.RET
+
+
+@pytest.mark.parametrize(
+    "words",
+    [
+        # PUSH faults after LOADV retires
+        [
+            Opcode.LOADV.value, 0,
+            Opcode.COPYTOSP.value,
+            Opcode.LOADV.value, 5,
+            Opcode.PUSH.value,
+        ],  # fmt: skip
+        # POP faults before RET
+        [Opcode.POP.value, Opcode.RET.value],
+        # PUT faults on a bad port
+        [Opcode.LOADV.value, 65, Opcode.PUT.value, 3],
+    ],
+)
+def test_fusion_faults_match_unfused(words) -> None:
+    reference = unfused(program(*words))
+    cpu = CPU(program(*words))
+
+    assert run(cpu.run) == run(reference.run) is not None
+    assert registers(cpu) == registers(reference)
+
+
+def test_fusion_overwritten_second_instruction() -> None:
+    cpu = CPU(program(Opcode.LOADV.value, 7, Opcode.PUSH.value, Opcode.END.value))
+    cpu.run()
+
+    assert cpu.predecoder.entries[0].fused is not None
+
+    cpu.memory.write(2, Opcode.COPYTOX.value)
+
+    assert cpu.predecoder.entries[0] is None
+
+    cpu.reset()
+    cpu.run()
+
+    assert cpu.x == 7
+    assert cpu.predecoder.entries[0].fused.opcode == Opcode.COPYTOX
+
+
+def test_fusion_skips_replaced_microcode() -> None:
+    cpu = CPU(program(Opcode.LOADV.value, 7, Opcode.PUSH.value, Opcode.END.value))
+    cpu.push = lambda: None
+    cpu.build_dispatch()
+
+    cpu.run()
+
+    assert cpu.predecoder.entries[0].fused is None
+    assert cpu.sp == 999
+
+
+def test_fusion_not_used_by_step() -> None:
+    cpu = CPU(program(Opcode.LOADV.value, 7, Opcode.PUSH.value, Opcode.END.value))
+
+    cpu.step()
+
+    assert cpu.predecoder.entries[0].fused is None
+    assert cpu.cycles == 1
+    assert cpu.pc == 2
@@ -0,0 +1,85 @@
+"""
+"""
+
+from io import StringIO
+
+import pytest
+
+from simplecpu.constants import HaltReason
+from simplecpu.cpu import CPU
+from simplecpu.exceptions import *
+from simplecpu.loader import Loader
+from simplecpu.memory import Memory
+
+from .samples import samples
+
+
+def load(source: str, memory: Memory = None) -> Memory:
+    memory = memory or Memory()
+    Loader(StringIO(source)).initialize(memory)
+    return memory
+
+
+def test_loader_segments() -> None:
+    source = """
+    1   // load 7
+    7
+
+    // a comment on its own line
+    .1000
+    -3  // a negative value
+    +4
+    .1500 // system call
+    50
+    """
+
+    memory = load(source)
+
+    assert list(memory.words[0:3]) == [1, 7, 0]
+    assert list(memory.words[1000:1003]) == [-3, 4, 0]
+    assert memory.words[1500] == 50
+    assert sum(1 for word in memory.words if word) == 5
+
+
+def test_loader_comment_without_slashes() -> None:
+
+    memory = load("10abc\n20 load\n.1000stack\n30+1\n")
+
+    assert list(memory.words[0:3]) == [10, 20, 0]
+    assert list(memory.words[1000:1002]) == [30, 0]
+
+
+def test_loader_comment_lines_take_no_address() -> None:
+
+    memory = load(samples["sample3"][0])
+
+    assert CPU(memory).run().reason == HaltReason.END
+
+
+@pytest.mark.parametrize(
+    "source, lineno",
+    [
+        ("1\nload 7\n", 2),
+        ("1\n\n\nx7\n", 4),
+        (".x\n", 1),
+        ("1\n99999999999\n", 2),
+        ("1\n.1999\n1\n2\n", 3),
+        (".-1\n1\n", 2),
+    ],
+)
+def test_loader_errors_report_line(source: str, lineno: int) -> None:
+
+    with pytest.raises(SourceFormatError, match=f"line {lineno}:"):
+        load(source)
+
+
+def test_loader_invalidates_watched_addresses() -> None:
+    memory = Memory()
+    addresses = []
+    memory.watch(addresses.append)
+    memory.mark(1)
+    memory.mark(5)
+
+    load("1\n2\n3\n", memory)
+
+    assert addresses == [1]
@@ -0,0 +1,44 @@
+"""
+"""
+
+import json
+
+from typer.testing import CliRunner
+
+from simplecpu.__main__ import cli
+
+from .helpers import load
+
+runner = CliRunner()
+
+
+def batch(*args: str) -> dict:
+    result = runner.invoke(cli, ["batch", "--workers", "1", *args])
+    assert result.exit_code == 0, result.output
+    results = [json.loads(line) for line in result.output.splitlines()]
+    return {result["path"]: result for result in results}
+
+
+def test_batch_command(tmp_path) -> None:
+    paths = []
+    for name in ["program1", "sample2"]:
+        paths.append(str(tmp_path / f"{name}.o"))
+        load(name).save(paths[-1])
+
+    results = batch("--timer-interval", "0", *paths)
+
+    assert results[paths[0]]["status"] == "end"
+    assert results[paths[0]]["output"] == "HI\n"
+    assert results[paths[1]]["status"] == "fault"
+    assert results[paths[1]]["exception"] == "SegmentationFault"
+
+
+def test_batch_command_verify(tmp_path) -> None:
+    path = str(tmp_path / "sample2.o")
+    load("sample2").save(path)
+
+    results = batch("--timer-interval", "0", "--verify", path)
+
+    assert results[path]["status"] == "rejected"
+    assert results[path]["cycles"] == 0
+    assert results[path]["exception"] == "SegmentationFault"
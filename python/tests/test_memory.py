@@ -1,10 +1,13 @@
 """
 """
 
+from array import array
+
 import pytest
 
 from simplecpu.memory import Memory, MemoryRangeError
 from simplecpu.constants import NWORDS, ProgramLoad
+from simplecpu.exceptions import ObjectFormatError
 
 MAX_UNSIGNED_INT = 0x7FFFFFFF
 
@@ -114,3 +117,156 @@ def test_memory_init_bogus_initializer(nwords, initializer) -> None:
 
     with pytest.raises(ValueError):
         memory = Memory(nwords, initializer=initializer)
+
+
+@pytest.mark.parametrize("mapped", [False, True])
+def test_memory_from_file(tmp_path, mapped: bool) -> None:
+    path = tmp_path / "image.o"
+    original = Memory(100, initializer=list(range(100)))
+    original.save(path)
+
+    memory = Memory.from_file(path, mapped=mapped)
+
+    assert memory == original
+    assert memory.nwords == 100
+    assert memory.read(99) == 99
+    assert bytes(memory) == path.read_bytes()
+
+
+def test_memory_from_file_mapped_copy_on_write(tmp_path) -> None:
+    path = tmp_path / "image.o"
+    Memory(100).save(path)
+    contents = path.read_bytes()
+
+    memory = Memory.from_file(path, mapped=True)
+    memory.write(10, 42)
+
+    assert isinstance(memory.words, memoryview)
+    assert memory.read(10) == 42
+    assert path.read_bytes() == contents
+    assert Memory.from_file(path, mapped=True).read(10) == 0
+
+
+@pytest.mark.parametrize("mapped", [False, True])
+@pytest.mark.parametrize("contents", [b"", b"\x00\x00\x00\x00" * 4])
+def test_memory_from_file_bad_magic(tmp_path, mapped: bool, contents: bytes) -> None:
+    path = tmp_path / "image.o"
+    path.write_bytes(contents)
+
+    with pytest.raises(ObjectFormatError):
+        Memory.from_file(path, mapped=mapped)
+
+
+@pytest.mark.parametrize("mapped", [False, True])
+@pytest.mark.parametrize("partial", [1, 3])
+def test_memory_from_file_partial_word(tmp_path, mapped: bool, partial: int) -> None:
+    path = tmp_path / "image.o"
+    Memory(100).save(path)
+    path.write_bytes(path.read_bytes() + b"\x01" * partial)
+
+    with pytest.raises(ObjectFormatError):
+        Memory.from_file(path, mapped=mapped)
+
+
+def test_memory_from_file_mapped_backend(tmp_path) -> None:
+    path = tmp_path / "image.o"
+    Memory(100).save(path)
+
+    with pytest.raises(ValueError):
+        Memory.from_file(path, mapped=True, backend="numpy")
+
+
+def test_memory_bounds_cached() -> None:
+    memory = Memory()
+
+    assert memory.bounds is memory.bounds
+
+
+def test_memory_blocks() -> None:
+    memory = Memory(100)
+
+    memory.write_block(10, [1, 2, 3])
+    memory.fill(20, 5, 7)
+    memory.copy(10, 11, 3)
+
+    assert list(memory.read_block(9, 6)) == [0, 1, 1, 2, 3, 0]
+    assert list(memory.read_block(19, 7)) == [0, 7, 7, 7, 7, 7, 0]
+    assert memory.read_block(0, 0) == array("i")
+
+
+def test_memory_view() -> None:
+    memory = Memory(100, initializer=list(range(100)))
+
+    view = memory.view(90, 10)
+    view[0] = -1
+
+    assert view.tolist() == [-1] + list(range(91, 100))
+    assert memory.read(90) == -1
+    view.release()
+
+
+@pytest.mark.parametrize("address, nwords", [(-1, 1), (0, -1), (99, 2), (100, 0)])
+def test_memory_blocks_bounds(address: int, nwords: int) -> None:
+    memory = Memory(100)
+
+    if nwords == 0 and address == 100:
+        memory.read_block(address, nwords)
+        return
+
+    for operation in [
+        lambda: memory.read_block(address, nwords),
+        lambda: memory.view(address, nwords),
+        lambda: memory.fill(address, nwords, 0),
+        lambda: memory.copy(0, address, nwords),
+        lambda: memory.copy(address, 0, nwords),
+    ]:
+        with pytest.raises(MemoryRangeError):
+            operation()
+
+
+def test_memory_write_block_invalidates() -> None:
+    memory = Memory(100)
+    addresses = []
+    memory.watch(addresses.append)
+    memory.mark(5)
+    memory.mark(50)
+
+    memory.write_block(0, [1] * 10)
+    memory.fill(40, 20, 2)
+
+    assert addresses == [5, 50]
+
+
+def test_memory_untraced_does_not_log(monkeypatch) -> None:
+    from simplecpu.memory import logger
+
+    def log(*args, **kwds) -> None:
+        raise AssertionError("logged")
+
+    monkeypatch.setattr(logger, "read", log)
+    monkeypatch.setattr(logger, "write", log)
+
+    memory = Memory()
+    memory.write(0, 42)
+
+    assert memory.read(0) == 42
+    assert memory.traced == False
+
+
+def test_memory_traced_logs(monkeypatch) -> None:
+    from simplecpu.memory import logger
+
+    logged = []
+    monkeypatch.setattr(logger, "read", lambda message: logged.append(message))
+    monkeypatch.setattr(logger, "write", lambda message: logged.append(message))
+
+    memory = Memory(trace=True)
+    memory.write(0, 42)
+
+    assert memory.read(0) == 42
+    assert logged == ["address=0 value=42", "address=0 value=42"]
+
+    memory.set_trace(False)
+    memory.read(0)
+
+    assert len(logged) == 2
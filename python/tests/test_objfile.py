@@ -0,0 +1,118 @@
+"""
+"""
+
+import struct
+import zlib
+from io import BytesIO
+
+import pytest
+
+from simplecpu.exceptions import ObjectFormatError
+from simplecpu.memory import Memory
+from simplecpu.objfile import HEADER, dumps, read_header, read_segments, segments
+from simplecpu.paged import PagedMemory
+
+from .helpers import load
+
+
+@pytest.mark.parametrize(
+    "words, expected",
+    [
+        ([], []),
+        ([0, 0, 0], []),
+        ([1, 2, 3], [(0, 3)]),
+        ([0, 1, 0, 0, 2], [(1, 4)]),
+        ([1, 0, 0, 0, 0, 2], [(0, 1), (5, 1)]),
+        ([0] * 10 + [7] + [0] * 10, [(10, 1)]),
+    ],
+)
+def test_segments(words: list[int], expected: list[tuple[int, int]]) -> None:
+
+    assert segments(words) == expected
+
+
+@pytest.mark.parametrize("name", ["program1", "sample1", "sample3", "sample4"])
+@pytest.mark.parametrize("version, compress", [(1, False), (2, False), (2, True)])
+@pytest.mark.parametrize("mapped", [False, True])
+def test_save_and_load(tmp_path, name, version, compress, mapped) -> None:
+    path = tmp_path / f"{name}.o"
+    memory = load(name)
+
+    memory.save(path, version=version, compress=compress)
+
+    assert Memory.from_file(path, mapped=mapped) == memory
+    assert PagedMemory.from_file(path) == memory
+
+
+@pytest.mark.parametrize("name", ["program1", "sample4"])
+def test_v2_is_smaller(tmp_path, name) -> None:
+    memory = load(name)
+
+    v1 = bytes(memory)
+    v2 = dumps(memory.words)
+
+    assert len(v2) < len(v1) // 4
+    assert len(dumps(memory.words, compress=True)) < len(v2)
+
+
+def test_v2_little_endian() -> None:
+    memory = Memory(10, initializer=[0, 0x01020304] + [0] * 8)
+
+    data = dumps(memory.words)
+    header = read_header(BytesIO(data))
+
+    assert header.version == 2
+    assert header.nwords == 10
+    assert header.nsegments == 1
+    assert data[HEADER.size :] == struct.pack("<II", 1, 1) + b"\x04\x03\x02\x01"
+
+
+def test_v2_streaming(tmp_path) -> None:
+    memory = load("sample1")
+    file = BytesIO(dumps(memory.words, compress=True))
+    words = Memory().words
+
+    read_segments(file, read_header(file), words)
+
+    assert words == memory.words
+
+
+def corrupt_version(data: bytes) -> bytes:
+    return data[:4] + struct.pack("<H", 3) + data[6:]
+
+
+def corrupt_nwords(data: bytes) -> bytes:
+    return data[:12] + struct.pack("<I", 0) + data[16:]
+
+
+def corrupt_segment(data: bytes) -> bytes:
+    return data[: HEADER.size] + struct.pack("<II", 1999, 2) + data[HEADER.size + 8 :]
+
+
+@pytest.mark.parametrize(
+    "mangle",
+    [
+        lambda data: data[:10],
+        lambda data: data[:-1],
+        corrupt_version,
+        corrupt_nwords,
+        corrupt_segment,
+    ],
+)
+@pytest.mark.parametrize("compress", [False, True])
+def test_v2_bad_objects(tmp_path, mangle, compress) -> None:
+    path = tmp_path / "bad.o"
+    data = dumps(load("program1").words)
+    if compress and mangle is not corrupt_version:
+        data = data[: HEADER.size] + zlib.compress(data[HEADER.size :])
+        data = data[:4] + struct.pack("<HH", 2, 1) + data[8:]
+    path.write_bytes(mangle(data))
+
+    with pytest.raises(ObjectFormatError):
+        Memory.from_file(path)
+
+
+def test_save_unknown_version(tmp_path) -> None:
+
+    with pytest.raises(ValueError):
+        Memory().save(tmp_path / "bad.o", version=3)
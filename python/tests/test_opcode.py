@@ -4,7 +4,7 @@
 
 import pytest
 
-from simplecpu.opcode import Opcode
+from simplecpu.opcode import DECODE_TABLE, ILLEGAL, Opcode, decode
 
 from simplecpu.exceptions import InvalidOpcodeError
 
@@ -134,3 +134,31 @@ def test_opcode_does_not_have_operand(opcode: Opcode) -> None:
 
     assert not opcode.has_operand
     assert opcode.operand_name is None
+
+
+def test_opcode_decode_table() -> None:
+
+    assert len(DECODE_TABLE) == Opcode.END.value + 1
+
+    for value, opcode in enumerate(DECODE_TABLE):
+        if opcode is ILLEGAL:
+            continue
+        assert opcode.value == value
+
+    assert sum(opcode is not ILLEGAL for opcode in DECODE_TABLE) == len(Opcode)
+
+
+@pytest.mark.parametrize("opcode", list(Opcode))
+def test_opcode_decode_found(opcode: Opcode) -> None:
+
+    assert decode(opcode.value) is opcode
+    assert opcode.length == (2 if opcode.has_operand else 1)
+
+
+@pytest.mark.parametrize(
+    "opcode", [-10, -5, -1] + list(range(31, 50)) + list(range(51, 60))
+)
+def test_opcode_decode_not_found(opcode: int) -> None:
+
+    with pytest.raises(InvalidOpcodeError):
+        decode(opcode)
@@ -0,0 +1,155 @@
+"""
+"""
+
+from array import array
+
+import pytest
+
+from simplecpu.constants import NWORDS
+from simplecpu.cpu import CPU
+from simplecpu.exceptions import *
+from simplecpu.memory import Memory
+from simplecpu.paged import PAGE_SIZE, PagedMemory
+
+from .helpers import load
+
+
+@pytest.mark.parametrize("nwords", [1, 100, NWORDS, PAGE_SIZE * 3])
+def test_paged_memory_matches_memory(nwords: int) -> None:
+    initializer = list(range(nwords))
+
+    memory = PagedMemory(nwords, initializer=initializer)
+
+    assert memory == Memory(nwords, initializer=initializer)
+    assert len(memory) == nwords
+    assert memory.npages == -(-nwords // PAGE_SIZE)
+    assert bytes(memory) == bytes(Memory(nwords, initializer=initializer))
+    for address in memory.bounds:
+        assert memory.read(address) == initializer[address]
+
+
+def test_paged_memory_zero_pages_shared() -> None:
+
+    memory = PagedMemory()
+
+    assert memory.shared == memory.npages
+    memory.write(0, 1)
+    assert memory.shared == memory.npages - 1
+    assert memory.read(0) == 1
+    assert memory.read(PAGE_SIZE) == 0
+
+
+@pytest.mark.parametrize("address", [-1, NWORDS])
+def test_paged_memory_bounds(address: int) -> None:
+    memory = PagedMemory()
+
+    with pytest.raises(MemoryRangeError):
+        memory.read(address)
+
+    with pytest.raises(MemoryRangeError):
+        memory.write(address, 0)
+
+
+def test_paged_memory_fork_copy_on_write() -> None:
+    parent = PagedMemory(NWORDS, initializer=list(range(NWORDS)))
+
+    child = parent.fork()
+
+    assert child == parent
+    assert child.shared == child.npages
+    assert all(a is b for a, b in zip(child.pages, parent.pages))
+
+    child.write(PAGE_SIZE + 1, -1)
+
+    assert child.read(PAGE_SIZE + 1) == -1
+    assert parent.read(PAGE_SIZE + 1) == PAGE_SIZE + 1
+    assert child.pages[1] is not parent.pages[1]
+    assert child.shared == child.npages - 1
+    assert parent.shared == parent.npages - 1
+
+
+def test_paged_memory_release_unshares() -> None:
+    parent = PagedMemory()
+    child = parent.fork()
+    child.write(0, 1)
+
+    del child
+
+    assert parent.pages[0].refs == parent.npages
+
+
+def test_paged_memory_words() -> None:
+    memory = PagedMemory(100)
+
+    memory.words[99] = 5
+    memory.words[-2] = 4
+
+    assert memory.words[99] == 5
+    assert list(memory.words[97:]) == [0, 4, 5]
+
+    memory.words[:] = Memory(100, initializer=list(range(100))).words
+
+    assert memory.read(42) == 42
+
+    with pytest.raises(IndexError):
+        memory.words[100]
+
+
+@pytest.mark.parametrize("name", ["program1", "sample1", "sample2", "sample4"])
+def test_paged_memory_cpu_matches(name: str, capsys) -> None:
+    reference = CPU(load(name), timer_interval=30)
+    paged = CPU(load(name, PagedMemory).fork(), timer_interval=30)
+
+    for cpu in (reference, paged):
+        try:
+            cpu.run(max_cycles=2000)
+        except Exception as error:
+            cpu.error = type(error)
+
+    assert getattr(paged, "error", None) == getattr(reference, "error", None)
+    assert paged.cycles == reference.cycles
+    assert paged.memory == reference.memory
+
+
+def test_paged_memory_write_block_copies_covered_pages() -> None:
+    parent = PagedMemory()
+    child = parent.fork()
+
+    child.write_block(PAGE_SIZE - 1, [1, 2])
+
+    assert child.shared == child.npages - 2
+    assert list(child.read_block(PAGE_SIZE - 2, 4)) == [0, 1, 2, 0]
+    assert parent.read_block(PAGE_SIZE - 2, 4) == array("i", [0] * 4)
+
+
+def test_paged_memory_view() -> None:
+    memory = PagedMemory(PAGE_SIZE * 4, list(range(PAGE_SIZE * 4)))
+    child = memory.fork()
+
+    view = child.view(PAGE_SIZE + 2, 4)
+
+    assert list(view) == [PAGE_SIZE + 2, PAGE_SIZE + 3, PAGE_SIZE + 4, PAGE_SIZE + 5]
+
+    view[0] = -1
+    view.release()
+
+    assert child.read(PAGE_SIZE + 2) == -1
+    assert memory.read(PAGE_SIZE + 2) == PAGE_SIZE + 2
+
+    with pytest.raises(TypeError):
+        memory.view(PAGE_SIZE - 2, 4)
+
+    with pytest.raises(MemoryRangeError):
+        memory.view(PAGE_SIZE * 4 - 2, 4)
+
+
+@pytest.mark.parametrize(
+    "address, nwords", [(0, 0), (3, 5), (PAGE_SIZE - 1, 2), (5, PAGE_SIZE * 2 + 7)]
+)
+def test_paged_memory_read_block(address: int, nwords: int) -> None:
+    initializer = list(range(PAGE_SIZE * 4))
+    memory = PagedMemory(len(initializer), initializer)
+
+    block = memory.read_block(address, nwords)
+
+    assert block == array("i", initializer[address : address + nwords])
@@ -0,0 +1,154 @@
+"""
+"""
+
+import pytest
+
+from simplecpu.constants import Mode, ProgramLoad
+from simplecpu.cpu import CPU
+from simplecpu.exceptions import *
+from simplecpu.memory import Memory
+from simplecpu.opcode import Opcode
+from simplecpu.predecode import Predecoded
+
+
+@pytest.fixture()
+def cpu() -> CPU:
+    return CPU(Memory())
+
+
+def test_predecoder_fetch_caches_entry(cpu) -> None:
+    cpu.memory.words[0] = Opcode.LOADV.value
+    cpu.memory.words[1] = 0xFF
+
+    entry = cpu.predecoder.fetch(0)
+
+    assert isinstance(entry, Predecoded)
+    assert entry.opcode == Opcode.LOADV
+    assert entry.operand == 0xFF
+    assert entry.length == 2
+    assert not entry.is_cti
+    assert cpu.predecoder.fetch(0) is entry
+
+
+@pytest.mark.parametrize("offset", [0, 1])
+def test_predecoder_write_invalidates_entry(offset, cpu) -> None:
+    cpu.memory.words[0] = Opcode.LOADV.value
+    cpu.memory.words[1] = 0xFF
+
+    entry = cpu.predecoder.fetch(0)
+
+    cpu.memory.write(offset, Opcode.LOADV.value if offset else Opcode.PUT.value)
+
+    assert cpu.predecoder.entries[0] is None
+    assert cpu.predecoder.fetch(0) != entry
+
+
+def test_predecoder_self_modifying_program(cpu) -> None:
+    # STORE rewrites the operand of the LOADV at address 4.
+    program = [Opcode.LOADV.value, 0xFF, Opcode.STORE.value, 5, Opcode.LOADV.value, 0]
+
+    for address, value in enumerate(program):
+        cpu.memory.words[address] = value
+
+    cpu.predecoder.fetch(4)
+
+    for _ in range(3):
+        cpu.step()
+
+    assert cpu.ir == Opcode.LOADV
+    assert cpu.operand == 0xFF
+    assert cpu.ac == 0xFF
+
+
+def test_predecoder_user_mode_fetch_from_system_entry(cpu) -> None:
+    address = ProgramLoad.INTERRUPT.value
+    cpu.memory.words[address] = Opcode.INCX.value
+
+    cpu.mode = Mode.SYSTEM
+    cpu.predecoder.fetch(address)
+    cpu.mode = Mode.USER
+
+    with pytest.raises(SegmentationFault):
+        cpu.predecoder.fetch(address)
+
+
+def test_predecoder_invalid_opcode_not_cached(cpu) -> None:
+    cpu.memory.words[0] = 31
+
+    with pytest.raises(InvalidOpcodeError):
+        cpu.predecoder.fetch(0)
+
+    assert cpu.predecoder.entries[0] is None
+
+
+@pytest.mark.parametrize("word", [31, 1000])
+def test_predecoder_invalid_opcode_loads_ir(word, cpu) -> None:
+    cpu.memory.words[0] = Opcode.INCX.value
+    cpu.memory.words[1] = word
+
+    cpu.step()  # incx
+
+    with pytest.raises(InvalidOpcodeError):
+        cpu.step()
+
+    assert cpu.ir == word
+    assert cpu.pc == 1
+
+    cpu.reset()
+    result = cpu.execute()
+
+    assert result.fault == "InvalidOpcodeError"
+    assert cpu.ir == word
+
+
+@pytest.mark.parametrize(
+    "mode, last, fault",
+    [(Mode.USER, 999, SegmentationFault), (Mode.SYSTEM, 1999, MemoryRangeError)],
+)
+def test_predecoder_operand_fault_loads_ir(mode, last, fault, cpu) -> None:
+    cpu.memory.words[last - 1] = Opcode.COPYTOX.value
+    cpu.memory.words[last] = Opcode.LOADV.value  # operand past the last word
+    cpu.mode = mode
+    cpu.pc = last - 1
+
+    cpu.step()  # copytox
+
+    with pytest.raises(fault):
+        cpu.step()
+
+    assert cpu.ir == Opcode.LOADV.value
+    assert cpu.pc == last
+
+    cpu.pc = last - 1
+    result = cpu.execute()
+
+    assert result.fault == fault.__name__
+    assert cpu.ir == Opcode.LOADV.value
+
+
+@pytest.mark.parametrize(
+    "opcode, operand, verified",
+    [
+        (Opcode.LOADA, 10, True),
+        (Opcode.STORE, 10, True),
+        (Opcode.LOADA, 1500, False),
+        (Opcode.STORE, 1500, False),
+        (Opcode.LOADX, 10, False),
+    ],
+)
+def test_predecoder_verified_handler(opcode, operand, verified, cpu) -> None:
+    cpu.memory.words[0] = opcode.value
+    cpu.memory.words[1] = operand
+
+    entry = cpu.predecoder.fetch(0)
+
+    assert (entry.handler == cpu.verified.get(opcode.value)) == verified
+
+
+def test_predecoder_verified_handler_respects_replaced_microcode(cpu) -> None:
+    cpu.memory.words[0] = Opcode.LOADA.value
+    cpu.memory.words[1] = 10
+    cpu.loada = lambda: None
+    cpu.build_dispatch()
+
+    assert cpu.predecoder.fetch(0).handler == cpu.loada
@@ -0,0 +1,195 @@
+"""
+"""
+
+import multiprocessing
+
+import pytest
+
+from simplecpu.constants import HaltReason
+from simplecpu.cpu import CPU
+from simplecpu.exceptions import *
+from simplecpu.memory import Memory
+from simplecpu.opcode import Opcode
+from simplecpu.remote import RemoteMemory, serve_unix
+from simplecpu.tiered import TieredEngine
+from simplecpu.translate import BlockEngine
+
+from .helpers import load, run
+
+
+@pytest.fixture(params=[{}, {"prefetch": 0, "combine": 0, "cache": False}])
+def remote(request):
+    memory = RemoteMemory.spawn(Memory(100, list(range(100))), **request.param)
+    yield memory
+    memory.close()
+
+
+def test_remote_memory_read_write(remote) -> None:
+
+    assert remote.nwords == 100
+    assert remote.read(42) == 42
+
+    remote.write(42, -1)
+
+    assert remote.read(42) == -1
+    assert remote.words[42] == -1
+
+
+@pytest.mark.parametrize("address", [-1, 100])
+def test_remote_memory_bounds(remote, address: int) -> None:
+
+    with pytest.raises(MemoryRangeError):
+        remote.read(address)
+
+    with pytest.raises(MemoryRangeError):
+        remote.write(address, 0)
+
+
+@pytest.mark.parametrize("value", [2**31, -(2**31) - 1])
+def test_remote_memory_value_range(remote, value: int) -> None:
+
+    with pytest.raises(OverflowError):
+        Memory(100).write(42, value)
+
+    with pytest.raises(OverflowError):
+        remote.write(42, value)
+
+    with pytest.raises(OverflowError):
+        remote.words[42] = value
+
+    assert remote.read(42) == 42
+    assert remote.image()[42] == 42
+
+
+def test_remote_memory_server_reports_errors(remote) -> None:
+    remote.pending.append(("write", 42, 2**31))
+
+    with pytest.raises(OverflowError):
+        remote.request([("info",)])
+
+    assert remote.request([("info",)]) == [100]
+    assert remote.image()[42] == 42
+
+
+def test_remote_memory_write_invalidates(remote) -> None:
+    addresses = []
+    remote.watch(addresses.append)
+    remote.mark(3)
+
+    remote.write(3, 0)
+
+    assert addresses == [3]
+
+
+def test_remote_memory_prefetch() -> None:
+    remote = RemoteMemory.spawn(Memory(100, list(range(100))), prefetch=7)
+
+    values = [remote.read(address) for address in range(16)]
+
+    assert values == list(range(16))
+    assert remote.stats.round_trips == 1 + 2  # info + two reads of 8 words
+    assert remote.stats.hits == 14
+    remote.close()
+
+
+def test_remote_memory_write_combining() -> None:
+    remote = RemoteMemory.spawn(Memory(100), combine=4)
+
+    for address in range(10):
+        remote.write(address, address)
+
+    assert remote.stats.messages == 1 + 2
+    assert list(remote.words[:10]) == list(range(10))
+    remote.close()
+
+
+def test_remote_memory_fused_fetch() -> None:
+    remote = RemoteMemory.spawn(load("program1"), prefetch=1, cache=True)
+    cpu = CPU(remote)
+
+    cpu.step()
+
+    assert remote.stats.reads == 2
+    assert remote.stats.round_trips == 1 + 1
+    remote.close()
+
+
+@pytest.mark.parametrize("name", ["program1", "sample1", "sample3"])
+@pytest.mark.parametrize("timer_interval", [0, 30])
+def test_remote_memory_cpu_matches(name: str, timer_interval: int, capsys) -> None:
+
+    reference = CPU(load(name), timer_interval=timer_interval)
+    expected = run(lambda: reference.run(max_cycles=5000))
+    expected_output = capsys.readouterr().out
+
+    remote = RemoteMemory.spawn(load(name))
+    cpu = CPU(remote, timer_interval=timer_interval)
+    result = run(lambda: cpu.run(max_cycles=5000))
+    remote.close()
+
+    assert result == expected
+    assert cpu.cycles == reference.cycles
+    assert capsys.readouterr().out == expected_output
+
+
+@pytest.mark.parametrize("engine", [BlockEngine, TieredEngine])
+def test_remote_memory_engine_stores(engine, remote) -> None:
+    program = [
+        Opcode.LOADV.value, 7,
+        Opcode.STORE.value, 20,
+        Opcode.LOADA.value, 20,
+        Opcode.END.value,
+    ]  # fmt: skip
+    remote.write_block(0, program)
+
+    cpu = CPU(remote)
+    result = engine(cpu).run()
+
+    assert result.reason == HaltReason.END
+    assert cpu.ac == 7
+    assert remote.read(20) == 7
+
+
+@pytest.mark.parametrize("engine", [BlockEngine, TieredEngine])
+@pytest.mark.parametrize("name", ["program1", "sample1", "sample3"])
+def test_remote_memory_engine_matches(engine, name: str, capsys) -> None:
+
+    reference = CPU(load(name), timer_interval=30)
+    expected = reference.execute(max_cycles=5000)
+    expected_output = capsys.readouterr().out
+
+    remote = RemoteMemory.spawn(load(name))
+    cpu = CPU(remote, timer_interval=30)
+    result = engine(cpu).execute(max_cycles=5000)
+    image = remote.words[:]
+    remote.close()
+
+    assert result == expected
+    assert capsys.readouterr().out == expected_output
+    assert image == reference.memory.words
+
+
+def test_remote_memory_unix_socket(tmp_path) -> None:
+    address = str(tmp_path / "memory.sock")
+    ready = multiprocessing.Event()
+    server = multiprocessing.Process(
+        target=serve_unix, args=(load("program1"), address, ready)
+    )
+    server.start()
+    ready.wait(10)
+
+    remote = RemoteMemory.connect(address)
+    result = CPU(remote).run()
+    remote.close()
+    server.join()
+
+    assert result.reason == HaltReason.END
+
+
+def test_remote_memory_blocks(remote) -> None:
+
+    remote.write_block(10, [7, 8, 9])
+
+    assert list(remote.read_block(9, 5)) == [9, 7, 8, 9, 13]
+    assert remote.read(11) == 8
+    assert list(remote.words[10:13]) == [7, 8, 9]
@@ -0,0 +1,73 @@
+"""
+"""
+
+import pytest
+
+from simplecpu.cpu import CPU
+from simplecpu.memory import Memory
+from simplecpu.opcode import Opcode
+from simplecpu.scheduler import Event, Scheduler
+
+
+@pytest.mark.parametrize("period", [1, 3, 100])
+def test_event_periodic(period) -> None:
+
+    event = Event("periodic", lambda: None, period=period)
+
+    assert not event.due(0)
+    assert event.countdown(0) == period
+
+    for cycles in range(1, period * 3):
+        assert event.due(cycles) == (cycles % period == 0)
+        assert 1 <= event.countdown(cycles) <= period
+        assert event.due(cycles + event.countdown(cycles))
+
+
+def test_scheduler_poll_and_countdown() -> None:
+    fired = []
+
+    scheduler = Scheduler()
+
+    assert not scheduler
+    assert scheduler.countdown(0) is None
+
+    scheduler.schedule(Event("a", lambda: fired.append("a"), period=4))
+    scheduler.schedule(Event("b", lambda: fired.append("b"), deadline=6))
+
+    assert scheduler.countdown(0) == 4
+    assert scheduler.countdown(4) == 2
+
+    for cycles in range(0, 13):
+        scheduler.poll(cycles)
+
+    assert fired == ["a", "b", "a", "a"]
+    assert "b" not in scheduler.events
+
+
+def test_cpu_timer_interval_schedules_timer() -> None:
+    cpu = CPU(Memory(), timer_interval=10)
+
+    assert cpu.scheduler.events["timer"].period == 10
+
+    cpu.timer_interval = 0
+
+    assert not cpu.scheduler
+
+
+@pytest.mark.parametrize("timer_interval", [1, 2, 5])
+def test_cpu_timer_counts_in_system_mode(timer_interval) -> None:
+    memory = Memory()
+    memory.words[0] = Opcode.JUMP.value
+    memory.words[1] = 0
+    for address in range(1000, 1010):
+        memory.words[address] = Opcode.INCX.value
+    memory.words[1010] = Opcode.IRETURN.value
+
+    reference = CPU(memory, timer_interval=timer_interval)
+    for _ in range(40):
+        reference.step()
+
+    fast = CPU(Memory(initializer=list(memory.words)), timer_interval=timer_interval)
+    fast.run(max_cycles=40)
+
+    assert (fast.pc, fast.x, fast.mode) == (reference.pc, reference.x, reference.mode)
@@ -0,0 +1,94 @@
+"""
+"""
+
+import os
+
+import pytest
+
+from simplecpu import shared as shared_module
+from simplecpu.constants import HaltReason
+from simplecpu.cpu import CPU
+from simplecpu.exceptions import *
+from simplecpu.memory import Memory
+from simplecpu.shared import SharedMemory, run_shared
+
+from .helpers import load
+
+
+@pytest.fixture
+def shared():
+    memory = SharedMemory(100, initializer=list(range(100)))
+    yield memory
+    memory.close()
+
+
+def test_shared_memory_words(shared) -> None:
+
+    assert shared.words[99] == 99
+    assert shared.read(42) == 42
+    assert shared == Memory(100, initializer=list(range(100)))
+
+
+def test_shared_memory_attach(shared) -> None:
+
+    attached = SharedMemory.attach(shared.name, shared.nwords)
+    try:
+        assert not attached.owner
+        assert attached.words[7] == 7
+        attached.write(7, -1)
+        assert shared.words[7] == -1
+    finally:
+        attached.close()
+
+
+def test_shared_memory_write_invalidates(shared) -> None:
+    addresses = []
+    shared.watch(addresses.append)
+    shared.mark(3)
+
+    shared.write(3, 0)
+
+    assert addresses == [3]
+
+
+def test_shared_memory_bytes(shared) -> None:
+
+    assert bytes(shared) == bytes(Memory(100, initializer=list(range(100))))
+
+
+@pytest.mark.parametrize("name", ["program1", "sample1"])
+def test_run_shared_matches_cpu(name: str, capsys) -> None:
+    memory = load(name)
+
+    cpu = CPU(load(name))
+    expected = cpu.run(max_cycles=5000)
+    expected_output = capsys.readouterr().out
+
+    result = run_shared(memory, max_cycles=5000)
+
+    assert result == expected
+    assert capsys.readouterr().out == expected_output
+
+
+def test_run_shared_end() -> None:
+
+    result = run_shared(load("program1"))
+
+    assert result.reason == HaltReason.END
+
+
+def test_run_shared_fault() -> None:
+
+    with pytest.raises(SegmentationFault):
+        run_shared(load("sample2"))
+
+
+def die(*args) -> None:
+    os._exit(1)
+
+
+def test_run_shared_server_dies(monkeypatch) -> None:
+    monkeypatch.setattr(shared_module, "memory_server", die)
+
+    with pytest.raises(EOFError):
+        run_shared(load("program1"))
@@ -0,0 +1,120 @@
+"""
+"""
+
+import random
+
+import pytest
+
+from simplecpu.constants import Mode
+from simplecpu.cpu import CPU
+from simplecpu.exceptions import *
+from simplecpu.memory import Memory
+from simplecpu.snapshot import Snapshot
+
+from .helpers import load
+
+
+def run(cpu: CPU, max_cycles: int) -> object:
+    random.seed(42)
+    try:
+        return cpu.run(max_cycles=max_cycles)
+    except Exception as error:
+        return type(error)
+
+
+def test_snapshot_captures_registers() -> None:
+    cpu = CPU(load("sample1"), timer_interval=30)
+    cpu.run(max_cycles=40)
+
+    snapshot = cpu.snapshot()
+
+    assert snapshot.pc == cpu.pc
+    assert snapshot.sp == cpu.sp
+    assert snapshot.mode == cpu.mode
+    assert snapshot.cycles == 40
+    assert snapshot.timer_interval == 30
+    assert snapshot.words == cpu.memory.words
+    assert snapshot.words is not cpu.memory.words
+
+
+@pytest.mark.parametrize("name", ["sample1", "sample2", "sample4"])
+@pytest.mark.parametrize("timer_interval", [0, 30])
+def test_restore_replays_identically(name: str, timer_interval: int, capsys) -> None:
+    cpu = CPU(load(name), timer_interval=timer_interval)
+    cpu.run(max_cycles=25)
+    snapshot = cpu.snapshot()
+    capsys.readouterr()
+
+    first = run(cpu, 500)
+    first_output = capsys.readouterr().out
+    first_state = cpu.snapshot()
+
+    cpu.restore(snapshot)
+    second = run(cpu, 500)
+
+    assert second == first
+    assert capsys.readouterr().out == first_output
+    assert cpu.snapshot() == first_state
+
+
+def test_restore_into_new_cpu() -> None:
+    cpu = CPU(load("sample1"), timer_interval=30)
+    cpu.run(max_cycles=100)
+    snapshot = cpu.snapshot()
+
+    other = CPU(Memory())
+    other.restore(snapshot)
+
+    assert other.snapshot() == snapshot
+    assert other.memory == cpu.memory
+
+
+def test_restore_invalidates_decoded_instructions() -> None:
+    cpu = CPU(Memory(initializer=[27, 50] + [0] * 1998))  # push; end
+    snapshot = cpu.snapshot()
+    cpu.memory.write(0, 1)  # loadv 50
+    cpu.memory.write(1, 50)
+    cpu.step()
+
+    cpu.restore(snapshot)
+    cpu.step()
+
+    assert cpu.sp == snapshot.sp - 1
+
+
+def test_restore_size_mismatch() -> None:
+
+    with pytest.raises(ValueError):
+        CPU(Memory(100)).restore(CPU(Memory()).snapshot())
+
+
+@pytest.mark.parametrize("mode", [Mode.USER, Mode.SYSTEM])
+@pytest.mark.parametrize("operand", [None, 0, -7])
+def test_snapshot_bytes_round_trip(tmp_path, mode: Mode, operand) -> None:
+    cpu = CPU(load("sample1"), timer_interval=30)
+    cpu.run(max_cycles=10)
+    cpu.mode = mode
+    cpu.operand = operand
+    cpu.interrupts_enabled = False
+    snapshot = cpu.snapshot()
+
+    snapshot.save(tmp_path / "snapshot")
+
+    assert Snapshot.from_bytes(bytes(snapshot)) == snapshot
+    assert Snapshot.from_file(tmp_path / "snapshot") == snapshot
+    assert bytes(snapshot).endswith(bytes(cpu.memory)[4:])
+
+
+@pytest.mark.parametrize(
+    "buffer",
+    [
+        b"",
+        bytes(Memory()),
+        bytes(CPU().snapshot())[:20],
+        bytes(CPU().snapshot())[:-1],
+    ],
+)
+def test_snapshot_bad_bytes(buffer: bytes) -> None:
+
+    with pytest.raises(ObjectFormatError):
+        Snapshot.from_bytes(buffer)
@@ -0,0 +1,109 @@
+"""
+"""
+
+
+import pytest
+
+from simplecpu.constants import HaltReason, Mode
+from simplecpu.cpu import CPU
+from simplecpu.exceptions import *
+from simplecpu.opcode import Opcode
+from simplecpu.tiered import TieredEngine
+
+from .helpers import load, program, registers, run
+
+LOOP = [
+    Opcode.LOADV.value, 0,
+    Opcode.COPYTOX.value,
+    Opcode.INCX.value,
+    Opcode.JUMP.value, 3,
+]  # fmt: skip
+
+
+@pytest.mark.parametrize("name", ["program1", "sample1", "sample2", "sample3"])
+@pytest.mark.parametrize("timer_interval", [0, 7, 30])
+@pytest.mark.parametrize("threshold", [1, 3])
+def test_tiered_engine_matches_interpreter(
+    name, timer_interval, threshold, capsys
+) -> None:
+
+    reference = CPU(load(name), timer_interval=timer_interval)
+    expected = run(lambda: reference.run(max_cycles=5000))
+    expected_output = capsys.readouterr().out
+
+    cpu = CPU(load(name), timer_interval=timer_interval)
+    engine = TieredEngine(cpu, threshold)
+    assert run(lambda: engine.run(max_cycles=5000)) == expected
+
+    assert capsys.readouterr().out == expected_output
+    assert registers(cpu) == registers(reference)
+    assert engine.stats.interpreted + engine.stats.translated == cpu.cycles
+
+
+def test_tiered_engine_short_program_stays_interpreted(capsys) -> None:
+    cpu = CPU(load("program1"))
+    engine = TieredEngine(cpu)
+
+    assert engine.run()[:2] == (HaltReason.END, 9)
+
+    assert engine.blocks == {}
+    assert engine.stats.interpreted == 9
+    assert engine.stats.translated == 0
+    assert engine.stats.promotions == 0
+
+
+def test_tiered_engine_promotes_hot_loop() -> None:
+    cpu = CPU(program(*LOOP))
+    engine = TieredEngine(cpu, threshold=3)
+
+    engine.run(max_cycles=100)
+
+    assert engine.counters[3, Mode.USER] == 3
+    assert engine.regions == {(3, Mode.USER): range(3, 6)}
+    assert engine.stats.promotions == 1
+    [event] = engine.stats.events
+    assert event.kind == "promote"
+    assert event.region == range(3, 6)
+    assert engine.stats.interpreted == 2 + 3 * 2
+    assert engine.stats.translated == 100 - engine.stats.interpreted
+    assert cpu.x == 49
+
+
+def test_tiered_engine_demotes_overwritten_loop() -> None:
+    cpu = CPU(program(*LOOP))
+    engine = TieredEngine(cpu, threshold=3)
+    engine.run(max_cycles=100)
+
+    cpu.memory.write(3, Opcode.DECX.value)
+
+    assert engine.regions == {}
+    assert (3, Mode.USER) not in engine.counters
+    assert engine.stats.demotions == 1
+    assert engine.stats.events[-1].kind == "demote"
+    assert not any(engine.hot[Mode.USER])
+
+    x = cpu.x
+    engine.run(max_cycles=10)
+
+    assert cpu.x == x - 5
+    assert engine.stats.promotions == 2
+    assert engine.stats.events[-1].kind == "promote"
+
+
+def test_tiered_engine_fault_in_promoted_loop() -> None:
+    words = [
+        Opcode.LOADV.value, 0,
+        Opcode.COPYTOX.value,
+        Opcode.LOADX.value, 995,
+        Opcode.INCX.value,
+        Opcode.JUMP.value, 3,
+    ]  # fmt: skip
+    reference = CPU(program(*words))
+    expected = run(reference.run)
+
+    cpu = CPU(program(*words))
+    engine = TieredEngine(cpu, threshold=2)
+
+    assert run(engine.run) == expected == SegmentationFault
+    assert registers(cpu) == registers(reference)
+    assert engine.stats.promotions == 1
@@ -0,0 +1,156 @@
+"""
+"""
+
+
+import pytest
+
+from simplecpu.constants import HaltReason, Mode
+from simplecpu.cpu import CPU
+from simplecpu.exceptions import *
+from simplecpu.memory import Memory
+from simplecpu.opcode import Opcode
+from simplecpu.translate import BlockEngine
+
+from .helpers import load, registers, run
+
+
+@pytest.mark.parametrize("name", ["program1", "sample1", "sample2", "sample4"])
+@pytest.mark.parametrize("timer_interval", [0, 7, 30])
+def test_block_engine_matches_interpreter(name, timer_interval, capsys) -> None:
+
+    reference = CPU(load(name), timer_interval=timer_interval)
+    translated = CPU(load(name), timer_interval=timer_interval)
+
+    expected_exception = run(reference.start)
+    expected_output = capsys.readouterr().out
+
+    assert run(BlockEngine(translated).run) == expected_exception
+    assert capsys.readouterr().out == expected_output
+    assert registers(translated) == registers(reference)
+    assert translated.memory == reference.memory
+
+    fast = CPU(load(name), timer_interval=timer_interval)
+
+    assert run(fast.run) == expected_exception
+    assert capsys.readouterr().out == expected_output
+    assert registers(fast) == registers(reference)
+    assert fast.memory == reference.memory
+
+
+@pytest.mark.parametrize("timer_interval", [0, 7])
+def test_block_engine_execute_returns_fault(timer_interval) -> None:
+    reference = CPU(load("sample2"), timer_interval=timer_interval)
+    expected = reference.execute()
+
+    cpu = CPU(load("sample2"), timer_interval=timer_interval)
+    result = BlockEngine(cpu).execute()
+
+    assert expected.reason == HaltReason.FAULT
+    assert result == expected
+    assert registers(cpu) == registers(reference)
+
+
+@pytest.mark.parametrize("max_cycles", [1, 5, 50])
+def test_block_engine_max_cycles(max_cycles) -> None:
+    reference = CPU(load("sample1"))
+    reference.run(max_cycles=max_cycles)
+
+    cpu = CPU(load("sample1"))
+    result = BlockEngine(cpu).run(max_cycles=max_cycles)
+
+    assert result.reason == HaltReason.CYCLES
+    assert result.cycles == max_cycles
+    assert registers(cpu) == registers(reference)
+
+
+def test_block_engine_caches_blocks() -> None:
+    cpu = CPU(load("sample1"))
+    engine = BlockEngine(cpu)
+
+    engine.run()
+
+    assert (0, Mode.USER, None) in engine.blocks
+    block = engine.blocks[(0, Mode.USER, None)]
+    assert block.count == 4
+    assert block.length == 7
+
+
+def test_block_engine_self_modifying_block() -> None:
+    # STORE rewrites the operand of the LOADV in the same block.
+    program = [
+        Opcode.LOADV.value, 0xFF,
+        Opcode.STORE.value, 5,
+        Opcode.LOADV.value, 0,
+        Opcode.END.value,
+    ]  # fmt: skip
+    cpu = CPU(Memory(initializer=program + [0] * (2000 - len(program))))
+
+    BlockEngine(cpu).run()
+
+    assert cpu.ac == 0xFF
+    assert cpu.cycles == 4
+
+
+def test_block_engine_drops_overwritten_blocks() -> None:
+    cpu = CPU(load("program1"))
+    engine = BlockEngine(cpu)
+
+    engine.run()
+
+    assert (0, Mode.USER, None) in engine.blocks
+
+    cpu.memory.write(1, 66)
+
+    assert (0, Mode.USER, None) not in engine.blocks
+
+
+def test_block_engine_splits_blocks_at_timer(capsys) -> None:
+    reference = CPU(load("sample1"), timer_interval=3)
+    reference.start()
+
+    cpu = CPU(load("sample1"), timer_interval=3)
+    engine = BlockEngine(cpu)
+    engine.run()
+
+    split = {key: block for key, block in engine.blocks.items() if key[2]}
+
+    assert split
+    assert all(block.count <= budget for (_, _, budget), block in split.items())
+    assert registers(cpu) == registers(reference)
+
+
+@pytest.mark.parametrize("max_cycles", [None, 997])
+def test_block_engine_split_blocks_are_bounded(max_cycles) -> None:
+    cpu = CPU(load("sample1"), timer_interval=7)
+    engine = BlockEngine(cpu)
+
+    for _ in range(50):
+        cpu.reset()
+        cpu.timer_interval = 7
+        engine.execute(max_cycles=max_cycles)
+
+    split = [key for key in engine.blocks if key[2]]
+
+    assert split
+    assert all(limit & (limit - 1) == 0 for (_, _, limit) in split)
+    for address in {address for address, _, _ in split}:
+        assert sum(key[0] == address for key in split) <= 8
+
+
+def test_block_translator_folds_constant_address_checks() -> None:
+    program = [
+        Opcode.LOADA.value, 10,
+        Opcode.STORE.value, 11,
+        Opcode.LOADA.value, 1500,
+        Opcode.END.value,
+    ]  # fmt: skip
+    cpu = CPU(Memory(initializer=program + [0] * (2000 - len(program))))
+    engine = BlockEngine(cpu)
+
+    block = engine.translator.translate(0, Mode.USER)
+
+    assert "ac = words[10]" in block.source
+    assert block.source.count("cpu._load") == 1
+    assert "cpu._store" not in block.source
+    assert run(engine.run) is SegmentationFault
+    assert cpu.pc == 4
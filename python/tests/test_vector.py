@@ -0,0 +1,129 @@
+"""
+"""
+
+import random
+from io import StringIO
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from simplecpu.constants import HaltReason
+from simplecpu.cpu import CPU
+from simplecpu.exceptions import SegmentationFault
+from simplecpu.loader import Loader
+from simplecpu.memory import Memory
+from simplecpu.vector import VectorCPU
+
+from .samples import samples
+
+program_a_source = """
+8   // Get
+14  // CopyToX
+8   // Get
+16  // CopyToY
+8   // Get
+10  // AddX
+11  // AddY
+9   // Put 1
+1
+50  // End
+"""
+
+
+def load(source: str) -> Memory:
+    memory = Memory()
+    Loader(StringIO(source)).initialize(memory)
+    return memory
+
+
+def reference(source: str, timer_interval: int, seed: int, capsys) -> tuple:
+    random.seed(seed)
+    cpu = CPU(load(source), timer_interval=timer_interval)
+    result = cpu.execute()
+    return result, capsys.readouterr().out, cpu
+
+
+@pytest.mark.parametrize("name", sorted(samples))
+def test_vector_cpu_matches_cpu(name, capsys) -> None:
+    source = samples[name][0]
+    intervals = [0, 7, 30, 100]
+
+    vector = VectorCPU(load(source), len(intervals), timer_interval=intervals)
+    results = vector.run(max_cycles=5000)
+
+    for lane, (interval, result) in enumerate(zip(intervals, results)):
+        random.seed(lane)
+        cpu = CPU(load(source), timer_interval=interval)
+        expected = cpu.execute(max_cycles=5000)
+        output = capsys.readouterr().out
+
+        assert result[:5] == expected
+        assert result.output == output
+        assert str(result.error()) == str(expected.error())
+        assert vector.pc[lane] == cpu.pc
+        assert vector.ir[lane] == cpu.ir
+        assert vector.sp[lane] == cpu.sp
+        assert vector.ac[lane] == cpu.ac
+        assert list(vector.words[lane]) == list(cpu.memory.words)
+
+
+def test_vector_cpu_random_streams(capsys) -> None:
+    seeds = [3, 1, 4, 1, 5, 9, 2, 6]
+
+    vector = VectorCPU(load(program_a_source), len(seeds), seeds=seeds)
+    results = vector.run()
+
+    for seed, result in zip(seeds, results):
+        expected, output, _ = reference(program_a_source, 0, seed, capsys)
+        assert result.reason == HaltReason.END
+        assert result.output == output
+        assert result.cycles == expected.cycles
+
+
+def test_vector_cpu_fault_result() -> None:
+
+    [result] = VectorCPU(load(samples["sample2"][0]), 1).run()
+
+    assert result.reason == HaltReason.FAULT
+    assert result.fault == "SegmentationFault"
+    assert result.detail == "load from 1000"
+    assert result.pc == 24
+    assert isinstance(result.error(), SegmentationFault)
+
+
+@pytest.mark.parametrize(
+    "words",
+    [
+        [14, 31],  # copytox, invalid opcode
+        [14, 1000],
+        [14, -1],
+        [14, 20, 999] + [0] * 996 + [1],  # loadv with its operand at 1000
+    ],
+)
+def test_vector_cpu_fault_loads_ir(words) -> None:
+    image = words + [0] * (2000 - len(words))
+    cpu = CPU(Memory(initializer=image))
+    expected = cpu.execute()
+
+    vector = VectorCPU(Memory(initializer=image), 1)
+    [result] = vector.run()
+
+    assert result[:5] == expected
+    assert vector.ir[0] == cpu.ir
+
+
+def test_vector_cpu_max_cycles() -> None:
+
+    vector = VectorCPU(load(samples["sample1"][0]), 2)
+    results = vector.run(max_cycles=10)
+
+    assert all(result.reason == HaltReason.CYCLES for result in results)
+    assert all(result.cycles == 10 for result in results)
+
+
+@pytest.mark.parametrize("lanes", [0, -1])
+def test_vector_cpu_bogus_lanes(lanes) -> None:
+
+    with pytest.raises(ValueError):
+        VectorCPU(Memory(), lanes)
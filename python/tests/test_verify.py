@@ -0,0 +1,212 @@
+"""
+"""
+
+
+import pytest
+
+from simplecpu.constants import HaltReason, Mode
+from simplecpu.cpu import CPU
+from simplecpu.exceptions import *
+from simplecpu.opcode import Opcode
+from simplecpu.verify import verify
+
+from .helpers import load, program
+
+
+@pytest.mark.parametrize("name", ["program1", "sample1", "sample3", "sample4"])
+def test_verify_samples_have_no_faults(name) -> None:
+
+    verification = verify(load(name), timer=False)
+
+    assert verification.findings == []
+    assert verification.faults == []
+
+
+def test_verify_sample2_certain_fault() -> None:
+
+    verification = verify(load("sample2"))
+
+    [fault] = verification.faults
+    assert fault.address == 24
+    assert fault.mode == Mode.USER
+    assert fault.opcode == Opcode.LOADA
+    assert fault.operand == 1000
+    assert fault.fault is SegmentationFault
+    assert fault.message == "load from 1000"
+
+
+def test_verify_certain_fault_matches_cpu() -> None:
+    memory = load("sample2")
+    [fault] = verify(memory).faults
+    cpu = CPU(memory)
+
+    with pytest.raises(fault.fault, match=fault.message):
+        cpu.run()
+
+    assert cpu.pc == fault.address
+
+
+def test_verify_accessible_addresses() -> None:
+    memory = program(
+        Opcode.LOADA.value, 10,
+        Opcode.STORE.value, 11,
+        Opcode.JUMPEQ.value, 8,
+        Opcode.CALL.value, 9,
+        Opcode.END.value,
+        Opcode.RET.value,
+    )  # fmt: skip
+
+    verification = verify(memory, timer=False)
+
+    assert set(verification.reachable) == {0, 2, 4, 6, 8, 9}
+    assert verification.findings == []
+
+
+@pytest.mark.parametrize(
+    "opcode, fault, message",
+    [
+        (Opcode.LOADA, SegmentationFault, "load from 1500"),
+        (Opcode.STORE, SegmentationFault, "store to 1500"),
+        (Opcode.JUMP, SegmentationFault, "load from 1500"),
+        (Opcode.CALL, SegmentationFault, "load from 1500"),
+    ],
+)
+def test_verify_unavoidable_user_faults(opcode, fault, message) -> None:
+
+    verification = verify(program(opcode.value, 1500, Opcode.END.value), timer=False)
+
+    [finding] = verification.faults
+    assert finding.opcode == opcode
+    assert finding.fault is fault
+    assert finding.message == message
+
+
+@pytest.mark.parametrize("opcode", [Opcode.JUMPEQ, Opcode.JUMPNE])
+def test_verify_conditional_branch_is_possible_fault(opcode) -> None:
+
+    verification = verify(program(opcode.value, 1500, Opcode.END.value), timer=False)
+
+    [finding] = verification.findings
+    assert not finding.certain
+    assert verification.faults == []
+    assert 2 in verification.reachable
+
+
+def test_verify_fault_after_branch_is_not_certain() -> None:
+    memory = program(
+        Opcode.JUMPEQ.value, 4,
+        Opcode.END.value, 0,
+        Opcode.STORE.value, 5000,
+        Opcode.END.value,
+    )  # fmt: skip
+
+    [finding] = verify(memory, timer=False).findings
+
+    assert finding.address == 4
+    assert not finding.certain
+
+
+def test_verify_system_fault_is_memory_range_error() -> None:
+    memory = program(Opcode.INTERRUPT.value, Opcode.END.value)
+    memory.write_block(1500, [Opcode.LOADA.value, 5000, Opcode.IRETURN.value])
+
+    [finding] = verify(memory, timer=False).findings
+
+    assert finding.address == 1500
+    assert finding.mode == Mode.SYSTEM
+    assert finding.fault is MemoryRangeError
+    assert not finding.certain
+
+
+def test_verify_timer_handler() -> None:
+    memory = program(Opcode.END.value)
+
+    assert verify(memory, timer=False).findings == []
+
+    [finding] = verify(memory, timer=True).findings
+
+    assert finding.address == 1000
+    assert finding.fault is InvalidOpcodeError
+
+
+def test_verify_invalid_opcode_on_certain_path() -> None:
+
+    [finding] = verify(program(Opcode.LOADV.value, 1, 49), timer=False).faults
+
+    assert finding.address == 2
+    assert finding.fault is InvalidOpcodeError
+
+
+def test_verify_store_into_path_is_not_certain() -> None:
+    memory = program(
+        Opcode.LOADV.value, Opcode.END.value,
+        Opcode.STORE.value, 4,
+        Opcode.LOADA.value, 2000,
+        Opcode.END.value,
+    )  # fmt: skip
+
+    [finding] = verify(memory, timer=False).findings
+
+    assert finding.address == 4
+    assert not finding.certain
+    assert CPU(memory).execute()[:2] == (HaltReason.END, 3)
+
+
+def test_verify_push_into_path_is_not_certain() -> None:
+    memory = program(
+        Opcode.LOADV.value, 0,
+        Opcode.COPYTOSP.value,
+        Opcode.LOADA.value, 2000,
+        Opcode.END.value,
+    )  # fmt: skip
+
+    assert verify(memory, timer=False).faults == []
+
+
+@pytest.mark.parametrize(
+    "handler, certain",
+    [
+        ([Opcode.IRETURN.value], True),
+        (
+            [
+                Opcode.LOADV.value, 1,
+                Opcode.PUSH.value,
+                Opcode.POP.value,
+                Opcode.IRETURN.value,
+            ],
+            True,
+        ),
+        (
+            [
+                Opcode.LOADV.value, Opcode.END.value,
+                Opcode.STORE.value, 2,
+                Opcode.IRETURN.value,
+            ],
+            False,
+        ),
+        ([Opcode.END.value], False),
+        ([Opcode.POP.value, Opcode.IRETURN.value], False),
+    ],  # fmt: skip
+)
+def test_verify_interrupt_handler_must_return(handler, certain) -> None:
+    memory = program(
+        Opcode.INTERRUPT.value,
+        Opcode.LOADA.value, 2000,
+        Opcode.END.value,
+    )  # fmt: skip
+    memory.write_block(1500, handler)
+
+    verification = verify(memory, timer=False)
+
+    assert [finding.address for finding in verification.faults] == [1] * certain
+
+
+def test_verify_timer_handler_must_return() -> None:
+    memory = program(Opcode.LOADA.value, 2000, Opcode.END.value)
+
+    assert verify(memory, timer=False).faults != []
+    assert verify(memory, timer=True).faults == []
+
+    memory.write(1000, Opcode.IRETURN.value)
+
+    assert verify(memory, timer=True).faults != []